@@ -0,0 +1,43 @@
+"""
+benchmarks/cascade.py
+Recall loss vs speed-up of the LBP prefilter cascade against exhaustive engine search.
+
+Usage: python benchmarks/cascade.py [--gallery DIR] [--probes DIR] [--engine hog]
+Without --probes, a sample of gallery prints is used as probes.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.config import FINGERPRINT_DATASET_PATH
+from biometrics.cascade import CascadeGallery
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gallery", default=FINGERPRINT_DATASET_PATH)
+    parser.add_argument("--probes", default=None)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--fractions", default="0.01,0.02,0.05,0.1,0.25")
+    args = parser.parse_args()
+
+    cascade = CascadeGallery.build(args.gallery, engine=args.engine)
+    if args.probes:
+        probes = [os.path.join(args.probes, f) for f in sorted(os.listdir(args.probes)) if f.lower().endswith(".bmp")]
+    else:
+        probes = list(cascade.full.paths)
+    rng = np.random.default_rng(0)
+    probes = list(rng.choice(probes, size=min(args.samples, len(probes)), replace=False))
+    fractions = [float(f) for f in args.fractions.split(",")]
+    print(f"Gallery: {args.gallery} ({len(cascade.full)} prints, engine={cascade.full.engine.name}, {len(probes)} probes)")
+    print(f"{'keep':>6} {'candidates':>10} {'rank-1 recall':>13} {'speed-up':>9}")
+    for row in cascade.tradeoff(probes, fractions):
+        print(f"{row['keep_fraction']:>6.0%} {row['candidates']:>10} {row['recall']:>13.1%} {row['speedup']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+benchmarks/face_knn.py
+CV accuracy, latency and model size of face KNN variants (PCA size x neighbour backend).
+
+Usage: python benchmarks/face_knn.py [--features results/features/<key>.npz] [--neighbors 3]
+--features takes a matrix saved by biometrics.featurecache (e.g. after a facefingerdev.py
+run). Without it, synthetic 2048-d clustered features stand in for ResNet50 embeddings.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.evaluation import cross_validate_timed, select_cheapest, summarize
+from biometrics.neighbors import ProjectedKNN, BACKENDS
+
+
+def _synthetic(classes=400, per_class=6, dims=2048):
+    rng = np.random.default_rng(0)
+    centres = np.maximum(rng.normal(0, 1, (classes, dims)), 0)
+    X = np.vstack([np.maximum(c + rng.normal(0, 1.2, (per_class, dims)), 0) for c in centres])
+    return X.astype(np.float32), np.repeat(np.arange(classes).astype(str), per_class)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--features", default=None)
+    parser.add_argument("--neighbors", type=int, default=3)
+    parser.add_argument("--components", default="256,128,64")
+    args = parser.parse_args()
+
+    if args.features:
+        with np.load(args.features) as data:
+            X, y = data["features"].astype(np.float32), data["labels"]
+    else:
+        X, y = _synthetic()
+    labels, counts = np.unique(y, return_counts=True)
+    keep = np.isin(y, labels[counts >= 3])
+    X, y = X[keep], y[keep]
+    cv = StratifiedKFold(n_splits=3)
+
+    candidates = {"sklearn default": KNeighborsClassifier(n_neighbors=args.neighbors)}
+    for n_components in [None] + [int(c) for c in args.components.split(",")]:
+        for backend in BACKENDS:
+            candidates[f"{backend} pca{n_components or 0}"] = ProjectedKNN(args.neighbors, n_components, backend=backend)
+    print(f"Features: {args.features or 'synthetic'} ({len(X)} samples, {X.shape[1]} dims, {len(np.unique(y))} classes)")
+    print(f"{'variant':>18} {'accuracy':>9} {'fit s':>7} {'ms/sample':>10} {'model MB':>9}")
+    results = {}
+    for name, model in candidates.items():
+        results[name] = cross_validate_timed(model, X, y, cv, name=name)
+        summary = summarize(results[name])
+        print(f"{name:>18} {summary['accuracy']:>9.4f} {summary['fit_seconds']:>7.2f} "
+              f"{summary['latency_ms']:>10.4f} {summary['model_mb']:>9.2f}")
+    print(f"Selected: {select_cheapest(results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+benchmarks/fingerprint_engines.py
+Head-to-head HOG/cosine vs BRIEF/Hamming fingerprint engines on the same gallery.
+
+Usage: python benchmarks/fingerprint_engines.py [--gallery DIR] [--probes N]
+Probes are drawn from the gallery itself and their own template is excluded, so
+rank-1 means "best other print". Labels are the filename prefix before '_'.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.config import FINGERPRINT_DATASET_PATH
+from biometrics.gallery import FingerprintGallery
+
+
+def _label(path):
+    return os.path.splitext(os.path.basename(path))[0].split('_')[0]
+
+
+def _rank1(gallery, probe_paths):
+    """Best non-self match per probe path and the mean time to score one probe."""
+    index = {path: i for i, path in enumerate(gallery.paths)}
+    matches, elapsed = [], 0.0
+    for path in probe_paths:
+        i = index[path]
+        start = time.perf_counter()
+        scores = gallery.scores(gallery.templates[i])
+        elapsed += time.perf_counter() - start
+        scores[i] = -np.inf
+        matches.append(gallery.paths[int(np.argmax(scores))])
+    return matches, elapsed / max(len(probe_paths), 1)
+
+
+def _template_bytes(gallery):
+    return sum(t.nbytes for t in gallery.templates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gallery", default=FINGERPRINT_DATASET_PATH)
+    parser.add_argument("--probes", type=int, default=100)
+    args = parser.parse_args()
+
+    galleries, results = {}, {}
+    for engine in ("hog", "brief"):
+        start = time.perf_counter()
+        galleries[engine] = FingerprintGallery.build(args.gallery, engine=engine)
+        build_time = time.perf_counter() - start
+        results[engine] = {"build": build_time}
+    common = set(galleries["hog"].paths) & set(galleries["brief"].paths)
+    if any(len(gallery) != len(common) for gallery in galleries.values()):
+        # Both engines must search the same candidates with the same probes for agreement to mean anything
+        for gallery in galleries.values():
+            for path in set(gallery.paths) - common:
+                gallery.remove(path)
+        print(f"Engines failed on different images; comparing on {len(common)} shared prints")
+    size = len(common)
+    probe_paths = list(np.random.default_rng(0).choice(sorted(common), size=min(args.probes, size), replace=False))
+
+    for engine, gallery in galleries.items():
+        matches, per_probe = _rank1(gallery, probe_paths)
+        correct = sum(_label(m) == _label(path) for m, path in zip(matches, probe_paths))
+        results[engine].update(matches=matches, per_probe=per_probe, accuracy=correct / len(probe_paths),
+                               memory=_template_bytes(gallery))
+
+    agreement = np.mean([a == b for a, b in zip(results["hog"]["matches"], results["brief"]["matches"])])
+    print(f"Gallery: {args.gallery} ({size} prints, {len(probe_paths)} probes)")
+    print(f"{'engine':>6} {'build s':>8} {'ms/probe':>9} {'cmp/s':>10} {'MB':>7} {'rank-1':>7}")
+    for engine, r in results.items():
+        rate = size / r["per_probe"] if r["per_probe"] else float("inf")
+        print(f"{engine:>6} {r['build']:>8.2f} {r['per_probe'] * 1000:>9.2f} {rate:>10.0f} "
+              f"{r['memory'] / 1e6:>7.2f} {r['accuracy']:>7.1%}")
+    print(f"Rank-1 agreement (brief vs hog): {agreement:.1%}")
+
+
+if __name__ == "__main__":
+    main()
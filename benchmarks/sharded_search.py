@@ -0,0 +1,60 @@
+"""
+benchmarks/sharded_search.py
+Probe latency of scatter-gather search over local shard processes vs one in-process gallery.
+
+Usage: python benchmarks/sharded_search.py [--gallery DIR] [--engine hog] [--shards 1,2,4]
+Results are checked for rank-1 agreement with the single gallery.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.config import FINGERPRINT_DATASET_PATH
+from biometrics.gallery import FingerprintGallery
+from biometrics.shards import ShardCoordinator, start_local_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gallery", default=FINGERPRINT_DATASET_PATH)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--shards", default="1,2,4")
+    args = parser.parse_args()
+
+    gallery = FingerprintGallery.build(args.gallery, engine=args.engine)
+    rng = np.random.default_rng(0)
+    paths = list(rng.choice(gallery.paths, size=min(args.samples, len(gallery)), replace=False))
+    probes = [gallery.engine.extract(p) for p in paths]
+
+    start = time.perf_counter()
+    expected = [gallery.search(p, top_k=1)[0][0] for p in probes]
+    local_ms = (time.perf_counter() - start) / len(probes) * 1000
+    print(f"Gallery: {args.gallery} ({len(gallery)} prints, engine={gallery.engine.name}, {len(probes)} probes)")
+    print(f"{'shards':>6} {'ms/probe':>9} {'rank-1 agree':>12}")
+    print(f"{'local':>6} {local_ms:>9.2f} {'100.0%':>12}")
+    for count in (int(s) for s in args.shards.split(",")):
+        with tempfile.TemporaryDirectory() as workdir:
+            urls, procs = start_local_shards(gallery, count, workdir)
+            coordinator = ShardCoordinator(urls, engine=gallery.engine.name, timeout=30)
+            try:
+                start = time.perf_counter()
+                got = [coordinator.search(p, top_k=1)[0][0][0] for p in probes]
+                ms = (time.perf_counter() - start) / len(probes) * 1000
+            finally:
+                coordinator.close()
+                for proc in procs:
+                    proc.terminate()
+                    proc.wait()
+                    proc.stdout.close()
+        agree = np.mean([a == b for a, b in zip(got, expected)])
+        print(f"{count:>6} {ms:>9.2f} {agree:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+benchmarks/template_compression.py
+Scoring speed, memory and rank-1 agreement of PCA / random-projection HOG templates.
+
+Usage: python benchmarks/template_compression.py [--gallery DIR] [--dims 64,128,256]
+Agreement is measured against the uncompressed HOG gallery with gallery prints as
+probes (their own template excluded).
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.config import FINGERPRINT_DATASET_PATH
+from biometrics.gallery import FingerprintGallery
+
+
+def _rank1(gallery, raw_probes, probe_indices):
+    matches, elapsed = [], 0.0
+    for raw, i in zip(raw_probes, probe_indices):
+        start = time.perf_counter()
+        scores = gallery.scores(raw)
+        elapsed += time.perf_counter() - start
+        scores[i] = -np.inf
+        matches.append(int(np.argmax(scores)))
+    return matches, elapsed / max(len(probe_indices), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--gallery", default=FINGERPRINT_DATASET_PATH)
+    parser.add_argument("--dims", default="64,128,256")
+    parser.add_argument("--probes", type=int, default=100)
+    args = parser.parse_args()
+
+    base = FingerprintGallery.build(args.gallery, engine="hog")
+    raw = base.matrix()
+    probe_indices = list(np.random.default_rng(0).choice(len(base), size=min(args.probes, len(base)), replace=False))
+    raw_probes = [raw[i] for i in probe_indices]
+    reference, base_time = _rank1(base, raw_probes, probe_indices)
+
+    print(f"Gallery: {args.gallery} ({len(base)} prints, {raw.shape[1]} HOG dims, {len(probe_indices)} probes)")
+    print(f"{'variant':>12} {'dims':>5} {'fit s':>6} {'ms/probe':>9} {'speed-up':>9} {'MB':>7} {'agree':>7}")
+    print(f"{'raw':>12} {raw.shape[1]:>5} {'-':>6} {base_time * 1000:>9.3f} {'1.0x':>9} {raw.nbytes / 1e6:>7.2f} {'100.0%':>7}")
+    for method in ("pca", "random"):
+        for dims in (int(d) for d in args.dims.split(",")):
+            gallery = copy.copy(base)
+            gallery.projection = None
+            start = time.perf_counter()
+            gallery.compress(method, n_components=dims)
+            fit_time = time.perf_counter() - start
+            matches, per_probe = _rank1(gallery, raw_probes, probe_indices)
+            agreement = np.mean([a == b for a, b in zip(matches, reference)])
+            stored = gallery.matrix().nbytes
+            print(f"{method:>12} {gallery.matrix().shape[1]:>5} {fit_time:>6.2f} {per_probe * 1000:>9.3f} "
+                  f"{base_time / per_probe:>8.1f}x {stored / 1e6:>7.2f} {agreement:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
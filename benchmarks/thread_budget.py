@@ -0,0 +1,72 @@
+"""
+benchmarks/thread_budget.py
+Compare thread splits for a matching-style workload (OpenCV resize, HOG, BLAS scoring).
+
+Usage: python benchmarks/thread_budget.py [--items 256] [--cores N]
+Each row runs the same batch through parallel_map with `workers` executor threads
+and `threads_per_worker` threads handed to OpenCV/BLAS/TensorFlow.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import cv2
+from skimage.feature import hog
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biometrics.budget import plan_thread_budget, apply_thread_budget
+from biometrics.parallel import parallel_map
+
+_GALLERY = None
+
+
+def _work(seed):
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, size=(256, 256), dtype=np.uint8)
+    image = cv2.GaussianBlur(cv2.resize(image, (128, 128)), (5, 5), 0)
+    features = hog(image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(2, 2), feature_vector=True)
+    return float(np.max(_GALLERY @ features))
+
+
+def _splits(cores):
+    workers = 1
+    while workers <= cores:
+        yield workers
+        workers *= 2
+
+
+def main():
+    global _GALLERY
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=256)
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    _GALLERY = np.random.default_rng(0).standard_normal((2000, 8100))
+    items = list(range(args.items))
+    print(f"{'workers':>8} {'thr/worker':>10} {'seconds':>8} {'items/s':>8}")
+    best = None
+    for workers in _splits(args.cores):
+        budget = apply_thread_budget(plan_thread_budget(cores=args.cores, workers=workers))
+        start = time.perf_counter()
+        parallel_map(_work, items, max_workers=budget["workers"])
+        elapsed = time.perf_counter() - start
+        rate = len(items) / elapsed
+        print(f"{budget['workers']:>8} {budget['threads_per_worker']:>10} {elapsed:>8.2f} {rate:>8.1f}")
+        if best is None or rate > best[1]:
+            best = (budget, rate)
+    # Oversubscribed reference: every worker's libraries claim the whole machine.
+    oversubscribed = {**plan_thread_budget(cores=args.cores, workers=args.cores), "opencv": args.cores,
+                      "blas": args.cores, "tf_intra_op": args.cores}
+    apply_thread_budget(oversubscribed)
+    start = time.perf_counter()
+    parallel_map(_work, items, max_workers=args.cores)
+    elapsed = time.perf_counter() - start
+    print(f"{'unbudgeted':>19} {elapsed:>8.2f} {len(items) / elapsed:>8.1f}")
+    print(f"Best split: {best[0]['workers']} workers x {best[0]['threads_per_worker']} threads "
+          f"(set BIOMETRICS_WORKERS={best[0]['workers']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+biometrics/budget.py
+Central CPU thread budget shared by the matching executors, TensorFlow, OpenCV and BLAS.
+
+Every parallel_map worker calls into libraries that keep their own thread pools.
+Left alone, each of them sizes itself to the whole machine and a 16-core host ends
+up with hundreds of runnable threads. The budget splits the cores once:
+``workers`` executor threads, each allowed ``threads_per_worker`` library threads.
+
+Entry points call apply_thread_budget() at process start, before any library pool
+has started. Thread-count env vars the user already set are left alone.
+"""
+import os
+import sys
+import threading
+import logging
+from typing import Dict, Optional, Set
+from .config import THREAD_BUDGET_CORES, THREAD_BUDGET_WORKERS
+
+_applied_budget: Optional[Dict[str, int]] = None
+_budget_lock = threading.Lock()
+_blas_limiter = None
+# Thread-count env vars written by a budget rather than by the user
+_budget_env: Set[str] = set()
+
+
+def plan_thread_budget(cores: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    """Split the available cores between executor workers and per-worker library threads."""
+    cores = max(1, cores or THREAD_BUDGET_CORES or os.cpu_count() or 1)
+    workers = max(1, min(workers or THREAD_BUDGET_WORKERS, cores))
+    threads_per_worker = max(1, cores // workers)
+    return {
+        "cores": cores,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "tf_intra_op": threads_per_worker,
+        "tf_inter_op": 1,
+        "opencv": threads_per_worker,
+        "blas": threads_per_worker,
+    }
+
+
+def _default_env(values: Dict[str, int]) -> bool:
+    """Set each env var unless the user did; True if the budget owns all of them.
+
+    Vars an earlier budget set are ours to update, so a later apply_thread_budget(budget) still takes effect.
+    """
+    owned = True
+    for var, value in values.items():
+        if var in _budget_env or var not in os.environ:
+            os.environ[var] = str(value)
+            _budget_env.add(var)
+        else:
+            owned = False
+    return owned
+
+
+def _configure_tensorflow(budget: Dict[str, int]):
+    # The env vars cover a TensorFlow that has not been imported yet; an already
+    # imported one is configured directly, which only works before its first op.
+    if not _default_env({"TF_NUM_INTRAOP_THREADS": budget["tf_intra_op"], "TF_NUM_INTEROP_THREADS": budget["tf_inter_op"]}):
+        return
+    tf = sys.modules.get("tensorflow")
+    if tf is None:
+        return
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(budget["tf_intra_op"])
+        tf.config.threading.set_inter_op_parallelism_threads(budget["tf_inter_op"])
+    except (RuntimeError, AttributeError) as e:
+        logging.warning(f"TensorFlow thread budget not applied: {e}")
+
+
+def _configure_opencv(budget: Dict[str, int]):
+    try:
+        import cv2
+    except ImportError:
+        return
+    # cv2 treats 0 as "run sequentially", 1 would still start a pool.
+    cv2.setNumThreads(0 if budget["opencv"] <= 1 else budget["opencv"])
+
+
+def _configure_blas(budget: Dict[str, int]):
+    global _blas_limiter
+    if not _default_env({var: budget["blas"] for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")}):
+        return
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logging.warning("threadpoolctl not installed; BLAS threads limited through env vars only")
+        return
+    _blas_limiter = threadpool_limits(limits=budget["blas"])
+
+
+def apply_thread_budget(budget: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Apply a thread budget to every library pool; repeated calls keep the first budget unless one is passed."""
+    global _applied_budget
+    with _budget_lock:
+        if budget is None and _applied_budget is not None:
+            return _applied_budget
+        budget = budget or plan_thread_budget()
+        _configure_tensorflow(budget)
+        _configure_opencv(budget)
+        _configure_blas(budget)
+        _applied_budget = budget
+        logging.info(f"Thread budget applied: {budget}")
+        return budget
+
+
+def get_thread_budget() -> Dict[str, int]:
+    """Return the applied budget, or the planned default when no entry point applied one."""
+    if _applied_budget is not None:
+        return _applied_budget
+    return plan_thread_budget()
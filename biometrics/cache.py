@@ -0,0 +1,164 @@
+"""
+biometrics/cache.py
+Content-addressed cache of match results with an in-memory LRU tier and a disk tier.
+
+A key is derived from the SHA-256 of the probe bytes, the engine parameters and the
+version id of the gallery searched. Directory galleries are versioned by the dataset
+catalog's digest of their listing (name, size, mtime), FingerprintGallery by a hash chain updated on every
+add/remove, so any change to the gallery yields new keys and stale results are never
+served; old entries simply age out of the LRU. The disk tier is bounded in bytes
+too: a put that takes it past the bound deletes the least recently used pickles
+(by mtime, which disk hits refresh) until it is back under 90% of it.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from .catalog import get_catalog
+from .config import RESULT_CACHE_SIZE, RESULT_CACHE_DIR, RESULT_CACHE_DISK_BYTES, CATALOG_RESCAN_SECONDS
+from .metrics import REGISTRY
+
+CACHE_LOOKUPS = REGISTRY.counter("biometrics_result_cache_total", "Result cache lookups by tier and outcome")
+CACHE_DISK_EVICTIONS = REGISTRY.counter("biometrics_result_cache_disk_evictions_total", "Entries deleted from the result cache disk tier")
+_MISSING = object()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def directory_version(path: str, extensions: Iterable[str], max_age: float = CATALOG_RESCAN_SECONDS) -> str:
+    """Version id of a folder gallery; changes whenever a matching file is added, removed or rewritten.
+
+    Read from the dataset catalog, which is rescanned when its last scan of path is older than max_age.
+    """
+    return get_catalog().version(path, extensions=tuple(extensions), max_age=max_age)
+
+
+def prune_directory(directory: str, max_bytes: int, suffix: str) -> Tuple[int, int]:
+    """Delete the least recently modified files ending in suffix under directory until they
+    total at most max_bytes; returns (bytes left, files deleted). In-flight .tmp files are skipped.
+    """
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(suffix) and ".tmp" not in name:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total, deleted
+
+
+def result_key(probe_digest: str, params: Dict[str, Any], gallery_version: str) -> str:
+    payload = json.dumps({"probe": probe_digest, "params": params, "gallery": gallery_version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU of results backed by pickles under disk_dir (None disables the disk tier)."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, disk_dir: Optional[str] = RESULT_CACHE_DIR,
+                 max_disk_bytes: int = RESULT_CACHE_DISK_BYTES):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        # Bytes in the disk tier, measured on the first put and re-measured whenever it is pruned
+        self._disk_bytes: Optional[int] = None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _remember(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                CACHE_LOOKUPS.inc(tier="memory", outcome="hit")
+                return value
+        CACHE_LOOKUPS.inc(tier="memory", outcome="miss")
+        if not self.disk_dir:
+            return default
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            CACHE_LOOKUPS.inc(tier="disk", outcome="miss")
+            return default
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"Discarding unreadable cache entry {key}: {e}")
+            CACHE_LOOKUPS.inc(tier="disk", outcome="miss")
+            return default
+        CACHE_LOOKUPS.inc(tier="disk", outcome="hit")
+        with self._lock:
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._remember(key, value)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = pickle.dumps(value)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = prune_directory(self.disk_dir, self.max_disk_bytes, ".pkl")[0]
+            else:
+                self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._disk_bytes, deleted = prune_directory(self.disk_dir, int(self.max_disk_bytes * 0.9), ".pkl")
+                CACHE_DISK_EVICTIONS.inc(deleted)
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._entries.clear()
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    if name.endswith(".pkl"):
+                        os.remove(os.path.join(root, name))
+            self._disk_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,131 @@
+"""
+biometrics/cascade.py
+Two-stage cascade search: compact texture features prune the gallery, the full engine ranks survivors.
+
+Stage one compares the 10-value LBP/corner vector of the probe against every print
+(an L1 distance over a small matrix). Only the closest keep_fraction of the gallery
+reaches stage two, where the configured engine (HOG cosine by default) scores them.
+"""
+import logging
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import CASCADE_KEEP_FRACTION, CASCADE_MIN_CANDIDATES
+from .gallery import FingerprintGallery
+from .parallel import parallel_map
+from .texture import compact_features_from_path, COMPACT_WIDTH, MAX_CORNERS
+from .metrics import STAGE_SECONDS, REGISTRY
+from .tracing import span
+
+PREFILTER_CANDIDATES = REGISTRY.histogram("biometrics_cascade_candidates", "Gallery prints surviving the cascade prefilter",
+                                          buckets=(1, 10, 50, 100, 500, 1000, 5000))
+
+
+def _compact_template(path):
+    try:
+        return compact_features_from_path(path)
+    except Exception as e:
+        logging.error(f"Skipping {path}: {e}")
+        return None
+
+
+def _best_path(results: List[Tuple[str, float]]) -> Optional[str]:
+    return results[0][0] if results else None
+
+
+def _normalise(compact: np.ndarray) -> np.ndarray:
+    # The histogram already sums to 1; bring the corner count onto the same scale.
+    scaled = np.array(compact, dtype=np.float32)
+    scaled[..., -1] /= MAX_CORNERS
+    return scaled
+
+
+class CascadeGallery:
+    """FingerprintGallery with a compact-feature prefilter in front of it."""
+
+    def __init__(self, full: FingerprintGallery, compact: np.ndarray,
+                 keep_fraction: float = CASCADE_KEEP_FRACTION, min_candidates: int = CASCADE_MIN_CANDIDATES):
+        if len(compact) != len(full):
+            raise ValueError("Compact features must align with the full gallery")
+        self.full = full
+        self.compact = _normalise(compact)
+        self.keep_fraction = keep_fraction
+        self.min_candidates = min_candidates
+
+    def __len__(self) -> int:
+        return len(self.full)
+
+    @classmethod
+    def build(cls, dataset_path: str, engine: Optional[str] = None, parallel: bool = True, max_workers: int = 4, **kwargs) -> "CascadeGallery":
+        full = FingerprintGallery.build(dataset_path, engine=engine, parallel=parallel, max_workers=max_workers)
+        with span("gallery.build", engine="compact", size=len(full)):
+            if parallel:
+                compact = parallel_map(_compact_template, full.paths, max_workers=max_workers)
+            else:
+                compact = [_compact_template(p) for p in full.paths]
+        # Prints the compact extractor rejected get non-finite rows, which the prefilter drops.
+        compact = [c if c is not None else np.full(COMPACT_WIDTH, np.inf) for c in compact]
+        compact = np.vstack(compact) if compact else np.zeros((0, COMPACT_WIDTH))
+        return cls(full, compact, **kwargs)
+
+    def candidate_count(self, keep_fraction: Optional[float] = None) -> int:
+        keep_fraction = self.keep_fraction if keep_fraction is None else keep_fraction
+        return min(len(self.full), max(self.min_candidates, int(np.ceil(keep_fraction * len(self.full)))))
+
+    def prefilter(self, probe_compact: np.ndarray, keep_fraction: Optional[float] = None) -> np.ndarray:
+        """Indices of the gallery prints closest to the probe in compact-feature space.
+
+        Prints without compact features (non-finite distance) never take a candidate slot.
+        """
+        with STAGE_SECONDS.time(stage="prefilter", modality="fingerprint"), span("cascade.prefilter"):
+            distances = np.abs(self.compact - _normalise(probe_compact)).sum(axis=1)
+            finite = np.flatnonzero(np.isfinite(distances))
+            keep = min(self.candidate_count(keep_fraction), len(finite))
+            if keep < len(finite):
+                finite = finite[np.argpartition(distances[finite], keep - 1)[:keep]]
+        PREFILTER_CANDIDATES.observe(len(finite))
+        return finite
+
+    def search(self, probe: np.ndarray, probe_compact: np.ndarray, top_k: int = 5, keep_fraction: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Top-k (path, score) pairs scored by the full engine over prefilter survivors only."""
+        with STAGE_SECONDS.time(stage="cascade", modality="fingerprint"):
+            candidates = self.prefilter(probe_compact, keep_fraction)
+            if not len(candidates):
+                return []
+            with STAGE_SECONDS.time(stage="score", modality="fingerprint"), span("gallery.score", engine=self.full.engine.name, size=len(candidates)):
+                scores = np.asarray(self.full.engine.score_many(self.full.prepare(probe), self.full.matrix()[candidates]))
+            order = np.argsort(-scores)[:top_k]
+            return [(self.full.paths[candidates[i]], float(scores[i])) for i in order]
+
+    def search_image(self, image_path: str, top_k: int = 5, keep_fraction: Optional[float] = None) -> List[Tuple[str, float]]:
+        return self.search(self.full.engine.extract(image_path), compact_features_from_path(image_path), top_k, keep_fraction)
+
+    def tradeoff(self, probe_paths: Iterable[str], keep_fractions: Iterable[float] = (0.01, 0.02, 0.05, 0.1, 0.25)) -> List[Dict[str, float]]:
+        """Rank-1 recall against the exhaustive search and the scoring speed-up for each keep fraction.
+
+        Recall is the share of probes whose exhaustive best match survives the prefilter
+        and is still ranked first; a search that returns nothing counts as a miss.
+        """
+        probes = []
+        for path in probe_paths:
+            try:
+                probes.append((self.full.engine.extract(path), compact_features_from_path(path)))
+            except ValueError as e:
+                logging.error(f"Skipping probe {path}: {e}")
+        if not probes:
+            return []
+        start = time.perf_counter()
+        exhaustive = [_best_path(self.full.search(full, top_k=1)) for full, _ in probes]
+        exhaustive_time = time.perf_counter() - start
+        rows = []
+        for fraction in keep_fractions:
+            start = time.perf_counter()
+            found = [_best_path(self.search(full, compact, top_k=1, keep_fraction=fraction)) for full, compact in probes]
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "keep_fraction": fraction,
+                "candidates": self.candidate_count(fraction),
+                "recall": float(np.mean([a is not None and a == b for a, b in zip(found, exhaustive)])),
+                "speedup": exhaustive_time / elapsed if elapsed else float("inf"),
+            })
+        return rows
@@ -0,0 +1,226 @@
+"""
+biometrics/catalog.py
+SQLite catalog of dataset files (path, label, size, mtime, content hash) shared by all loaders.
+
+scan() walks a dataset root with os.scandir and only touches rows whose size or mtime
+changed, so rescanning an unchanged dataset costs one stat per file and no reads.
+Content hashes are computed when digest() first asks for one (or during scans with
+hash_files=True). Labels follow the two dataset layouts already in use:
+  classes - images in one sub-folder per class, label = folder name
+  flat    - images directly in the root named '<label>_<n>.ext', label = prefix
+items() rescans and then answers from the catalog. Request-path callers pass max_age
+to reuse a scan this catalog made less than max_age seconds ago. Rows of roots that
+no longer exist are deleted when a catalog first connects and when a scan finds its
+root missing.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from .config import CATALOG_DB
+from .metrics import REGISTRY
+
+CATALOG_CHANGES = REGISTRY.counter("biometrics_catalog_changes_total", "Catalog rows by scan outcome (added, updated, removed)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    label TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (root, path)
+);
+"""
+
+
+def flat_label(name: str) -> str:
+    """Label of a flat-layout file: the part of the name before the first '_'."""
+    return os.path.splitext(name)[0].split('_')[0]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _walk(root: str) -> Iterable[Tuple[str, str, int, int]]:
+    """(relative path, label, size, mtime_ns) for top-level files and files one class folder down."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stat = entry.stat()
+                yield entry.name, flat_label(entry.name), stat.st_size, stat.st_mtime_ns
+            elif entry.is_dir():
+                with os.scandir(entry.path) as class_entries:
+                    for sub in class_entries:
+                        if sub.is_file():
+                            stat = sub.stat()
+                            yield f"{entry.name}/{sub.name}", entry.name, stat.st_size, stat.st_mtime_ns
+
+
+class DatasetCatalog:
+    """Incrementally maintained file index; safe to share between threads."""
+
+    def __init__(self, db_path: str = CATALOG_DB, hash_files: bool = False):
+        self.db_path = db_path
+        self.hash_files = hash_files
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all
+        self._connections: List[sqlite3.Connection] = []
+        self._write_lock = threading.Lock()
+        self._pruned = False
+        # Monotonic time of this catalog's last scan of each root, for max_age
+        self._scanned: Dict[str, float] = {}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            with self._write_lock:
+                self._connections.append(conn)
+            if not self._pruned:
+                self._pruned = True
+                self.prune_missing_roots()
+        return conn
+
+    def close(self):
+        """Close every thread's connection; call once no other thread is using the catalog."""
+        with self._write_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def prune_missing_roots(self) -> int:
+        """Delete the rows of roots that are no longer directories; returns the number of roots dropped."""
+        conn = self._conn()
+        missing = [root for (root,) in conn.execute("SELECT DISTINCT root FROM files") if not os.path.isdir(root)]
+        if missing:
+            with self._write_lock, conn:
+                conn.executemany("DELETE FROM files WHERE root = ?", [(root,) for root in missing])
+            logging.info(f"Catalog: dropped {len(missing)} missing roots")
+        return len(missing)
+
+    def scan(self, root: str) -> Dict[str, int]:
+        """Bring the catalog rows for root up to date; returns counts per outcome."""
+        root = os.path.abspath(root)
+        start = time.time()
+        conn = self._conn()
+        if not os.path.isdir(root):
+            with self._write_lock, conn:
+                conn.execute("DELETE FROM files WHERE root = ?", (root,))
+            raise FileNotFoundError(f"Dataset folder not found: {root}")
+        self._scanned[root] = time.monotonic()
+        with self._write_lock:
+            known = {path: (size, mtime) for path, size, mtime in
+                     conn.execute("SELECT path, size, mtime_ns FROM files WHERE root = ?", (root,))}
+            upserts, seen = [], set()
+            counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            for path, label, size, mtime in _walk(root):
+                seen.add(path)
+                previous = known.get(path)
+                if previous == (size, mtime):
+                    counts["unchanged"] += 1
+                    continue
+                counts["added" if previous is None else "updated"] += 1
+                digest = _sha256(os.path.join(root, path)) if self.hash_files else None
+                upserts.append((root, path, label, size, mtime, digest))
+            removed = [(root, path) for path in known.keys() - seen]
+            counts["removed"] = len(removed)
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", upserts)
+                conn.executemany("DELETE FROM files WHERE root = ? AND path = ?", removed)
+        for outcome in ("added", "updated", "removed"):
+            if counts[outcome]:
+                CATALOG_CHANGES.inc(counts[outcome], outcome=outcome)
+        if upserts or removed:
+            logging.info(f"Catalog {root}: {counts} in {time.time() - start:.2f}s")
+        return counts
+
+    def refresh(self, root: str, max_age: float = 0.0) -> bool:
+        """Scan root unless this catalog scanned it less than max_age seconds ago; returns whether it did."""
+        last = self._scanned.get(os.path.abspath(root))
+        if last is not None and time.monotonic() - last < max_age:
+            return False
+        self.scan(root)
+        return True
+
+    def items(self, root: str, extensions: Optional[Tuple[str, ...]] = None, layout: str = "auto",
+              rescan: bool = True, max_age: float = 0.0) -> List[Tuple[str, str]]:
+        """(path, label) of root's images sorted by path; paths are joined onto root as given.
+
+        layout is "flat" (files directly in root), "classes" (files in class folders) or
+        "auto" (classes when root has any class folder, flat otherwise). With rescan, root
+        is scanned first unless it was scanned less than max_age seconds ago.
+        """
+        if rescan:
+            self.refresh(root, max_age)
+        rows = self._conn().execute("SELECT path, label FROM files WHERE root = ? ORDER BY path", (os.path.abspath(root),)).fetchall()
+        if layout == "auto":
+            layout = "classes" if any("/" in path for path, _ in rows) else "flat"
+        nested = layout == "classes"
+        return [(os.path.join(root, *path.split("/")), label) for path, label in rows
+                if ("/" in path) == nested and (extensions is None or path.lower().endswith(extensions))]
+
+    def files(self, root: str, extensions: Optional[Tuple[str, ...]] = None, layout: str = "flat",
+              max_age: float = 0.0) -> List[str]:
+        return [path for path, _ in self.items(root, extensions, layout, max_age=max_age)]
+
+    def version(self, root: str, rescan: bool = True, extensions: Optional[Tuple[str, ...]] = None,
+                max_age: float = 0.0) -> str:
+        """Digest of root's catalog rows (optionally only those with the given extensions); changes
+        whenever such a file is added, removed, relabelled or rewritten (size or mtime)."""
+        if rescan:
+            self.refresh(root, max_age)
+        digest = hashlib.sha256()
+        for row in self._conn().execute("SELECT path, label, size, mtime_ns FROM files WHERE root = ? ORDER BY path",
+                                        (os.path.abspath(root),)):
+            if extensions is None or row[0].lower().endswith(extensions):
+                digest.update("\0".join(map(str, row)).encode() + b"\n")
+        return digest.hexdigest()
+
+    def digest(self, path: str) -> Optional[str]:
+        """Content hash of a catalogued file (absolute path), hashed and stored on first request."""
+        root, name = os.path.split(os.path.abspath(path))
+        conn = self._conn()
+        row = conn.execute("SELECT sha256, size, mtime_ns FROM files WHERE root = ? AND path = ?", (root, name)).fetchone()
+        if row is None:
+            parent, cls = os.path.split(root)
+            root, name = parent, f"{cls}/{name}"
+            row = conn.execute("SELECT sha256, size, mtime_ns FROM files WHERE root = ? AND path = ?", (root, name)).fetchone()
+        if row is None:
+            return None
+        sha256, size, mtime_ns = row
+        if sha256 is None:
+            sha256 = _sha256(os.path.join(root, *name.split("/")))
+            with self._write_lock, conn:
+                # Only if the row still describes the file that was hashed
+                conn.execute("UPDATE files SET sha256 = ? WHERE root = ? AND path = ? AND size = ? AND mtime_ns = ?",
+                             (sha256, root, name, size, mtime_ns))
+        return sha256
+
+
+_catalog: Optional[DatasetCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> DatasetCatalog:
+    """Process-wide catalog at CATALOG_DB."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = DatasetCatalog(CATALOG_DB)
+        return _catalog
@@ -0,0 +1,122 @@
+"""
+biometrics/checkpoint.py
+Resumable feature extraction: completed chunks are saved to disk as they finish.
+
+A build splits its (path, label) items into fixed-size chunks. Each finished chunk is
+written to <checkpoint_dir>/chunk_<n>.npz and recorded in manifest.json together with
+a digest of the items it covers (path, label, and the file's size and mtime) and the
+extractor tag. Re-running the same build skips every chunk whose digest still matches,
+so a crash near the end costs one chunk, and adding or rewriting images only
+re-extracts the chunks that changed. Items that are not files on disk (images inside
+a pack) are digested by path and label only; their container's version belongs in the tag.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+from .config import CHECKPOINT_CHUNK_SIZE
+from .metrics import REGISTRY
+
+CHECKPOINT_CHUNKS = REGISTRY.counter("biometrics_checkpoint_chunks_total", "Build chunks by outcome (extracted, resumed)")
+
+Item = Tuple[str, str]
+
+
+class CheckpointedBuild:
+    """Chunked, resumable run of extract(path) over (path, label) items."""
+
+    def __init__(self, checkpoint_dir: str, tag: str = "", chunk_size: int = CHECKPOINT_CHUNK_SIZE):
+        self.checkpoint_dir = checkpoint_dir
+        self.tag = tag
+        self.chunk_size = chunk_size
+        self.manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"chunks": {}}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable checkpoint manifest {self.manifest_path}: {e}")
+            return {"chunks": {}}
+
+    def _save_manifest(self, manifest: dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _digest(self, chunk: Sequence[Item]) -> str:
+        digest = hashlib.sha256(self.tag.encode())
+        for path, label in chunk:
+            try:
+                stat = os.stat(path)
+                state = f"{stat.st_size}\0{stat.st_mtime_ns}"
+            except OSError:
+                state = ""
+            digest.update(f"\0{path}\0{label}\0{state}".encode())
+        return digest.hexdigest()
+
+    def _chunk_file(self, index: int) -> str:
+        return os.path.join(self.checkpoint_dir, f"chunk_{index:05d}.npz")
+
+    def _save_chunk(self, index: int, features: List[np.ndarray], labels: List[str], paths: List[str]):
+        tmp_path = self._chunk_file(index) + ".tmp.npz"
+        matrix = np.vstack(features) if features else np.zeros((0, 0))
+        np.savez(tmp_path, features=matrix, labels=np.array(labels, dtype=str), paths=np.array(paths, dtype=str))
+        os.replace(tmp_path, self._chunk_file(index))
+
+    def _load_chunk(self, index: int) -> Tuple[List[np.ndarray], List[str], List[str]]:
+        with np.load(self._chunk_file(index), allow_pickle=False) as data:
+            return list(data["features"]), [str(l) for l in data["labels"]], [str(p) for p in data["paths"]]
+
+    def run(self, items: Sequence[Item], extract: Callable[[str], Optional[np.ndarray]],
+            progress: Optional[Callable[[int, int, float, float], None]] = None,
+            mapper: Optional[Callable[[Callable, List[str]], List[Optional[np.ndarray]]]] = None) -> Tuple[List[np.ndarray], List[str], List[str]]:
+        """Extract features for items, resuming from saved chunks.
+
+        Items whose extract returns None are skipped. mapper(extract, paths) may run a
+        chunk's extractions concurrently (e.g. parallel_map). progress(done, total, rate,
+        eta_seconds) is called after each chunk. Returns (features, labels, paths) in item order.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        features, labels, paths = [], [], []
+        start = time.time()
+        extracted = 0
+        for index, chunk in enumerate(chunks):
+            digest = self._digest(chunk)
+            entry = manifest["chunks"].get(str(index))
+            if entry and entry["digest"] == digest and os.path.exists(self._chunk_file(index)):
+                CHECKPOINT_CHUNKS.inc(outcome="resumed")
+                chunk_result = self._load_chunk(index)
+            else:
+                chunk_paths = [path for path, _ in chunk]
+                chunk_features = mapper(extract, chunk_paths) if mapper else [extract(p) for p in chunk_paths]
+                chunk_result = ([], [], [])
+                for (path, label), feature in zip(chunk, chunk_features):
+                    if feature is not None:
+                        chunk_result[0].append(feature)
+                        chunk_result[1].append(label)
+                        chunk_result[2].append(path)
+                self._save_chunk(index, *chunk_result)
+                manifest["chunks"][str(index)] = {"digest": digest, "count": len(chunk_result[0])}
+                self._save_manifest(manifest)
+                CHECKPOINT_CHUNKS.inc(outcome="extracted")
+                extracted += len(chunk)
+            features.extend(chunk_result[0])
+            labels.extend(chunk_result[1])
+            paths.extend(chunk_result[2])
+            done = min((index + 1) * self.chunk_size, len(items))
+            elapsed = time.time() - start
+            rate = extracted / elapsed if elapsed > 0 else 0.0
+            eta = (len(items) - done) / rate if rate > 0 else 0.0
+            logging.info(f"Checkpoint {index + 1}/{len(chunks)}: {done}/{len(items)} images, {rate:.1f} img/s, ETA {eta:.0f}s")
+            if progress:
+                progress(done, len(items), rate, eta)
+        return features, labels, paths
@@ -15,15 +15,85 @@ RESULTS_DIR = os.path.join(BASE_DIR, "results")
 FACEOM_RESULTS_DIR = os.path.join(RESULTS_DIR, "faceom")
 FINGERPRINT_RESULTS_FILE = os.path.join(RESULTS_DIR, "fingerprint_results.txt")
 FACIAL_RESULTS_FILE = os.path.join(RESULTS_DIR, "facial_results.txt")
+METRICS_FILE = os.path.join(RESULTS_DIR, "metrics.json")
+# Seconds a recorded run may wait before the snapshot is written (0 writes on every run)
+METRICS_SAVE_SECONDS = float(os.getenv("BIOMETRICS_METRICS_SAVE_SECONDS", "10"))
 
 # Model files
 KNN_MODEL_PATH = os.path.join(RESULTS_DIR, "knn_model.pkl")
 SVM_MODEL_PATH = os.path.join(RESULTS_DIR, "svm_fingerprint_model.pkl")
+# Winning classifier configurations of the model search (see biometrics/tuning.py); delete to search again
+FACE_MODEL_CONFIG = os.path.join(RESULTS_DIR, "face_model.json")
+FINGERPRINT_MODEL_CONFIG = os.path.join(RESULTS_DIR, "fingerprint_model.json")
+# Feature stores the saved models were trained on; enrollment appends to them (see biometrics/enrollment.py)
+FACE_STORE_DIR = os.path.join(RESULTS_DIR, "stores", "face")
+FINGERPRINT_STORE_DIR = os.path.join(RESULTS_DIR, "stores", "fingerprint")
+
+# Fingerprint matching engine: "hog" (HOG + cosine) or "brief" (binary descriptors + Hamming)
+FINGERPRINT_ENGINE = os.getenv("BIOMETRICS_FINGERPRINT_ENGINE", "hog")
+
+# Cascade search: share of the gallery passed from the compact prefilter to the full engine
+CASCADE_KEEP_FRACTION = float(os.getenv("BIOMETRICS_CASCADE_KEEP_FRACTION", "0.05"))
+CASCADE_MIN_CANDIDATES = 10
+
+# Minutiae geometric-hashing index (see biometrics/minutiae.py)
+MINUTIAE_NEIGHBOURS = 6      # nearest neighbours joined into triangles per minutia
+MINUTIAE_LENGTH_BIN = 10     # triangle side quantisation, pixels
+MINUTIAE_ANGLE_BINS = 8      # relative orientation quantisation over [0, pi)
+
+# Probes scoring below this quality (0..1, see biometrics/quality.py) are rejected before matching
+FINGERPRINT_QUALITY_FLOOR = float(os.getenv("BIOMETRICS_FINGERPRINT_QUALITY_FLOOR", "0.2"))
+
+# Probe result cache (see biometrics/cache.py); an empty BIOMETRICS_RESULT_CACHE_DIR keeps it in memory
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_DIR = os.getenv("BIOMETRICS_RESULT_CACHE_DIR", os.path.join(RESULTS_DIR, "cache"))
+# Bound of the disk tier; least recently used entries are deleted beyond it
+RESULT_CACHE_DISK_BYTES = int(os.getenv("BIOMETRICS_RESULT_CACHE_DISK_MB", "256")) * 2 ** 20
+
+# Enrolled-template cache (see biometrics/templates.py): hot entries in memory, warm ones
+# memory-mapped from BIOMETRICS_TEMPLATE_CACHE_DIR (unset or empty: no warm tier), at most
+# BIOMETRICS_TEMPLATE_CACHE_DISK_MB on disk
+TEMPLATE_CACHE_SIZE = int(os.getenv("BIOMETRICS_TEMPLATE_CACHE_SIZE", "512"))
+TEMPLATE_CACHE_DIR = os.getenv("BIOMETRICS_TEMPLATE_CACHE_DIR", "")
+TEMPLATE_CACHE_DISK_BYTES = int(os.getenv("BIOMETRICS_TEMPLATE_CACHE_DISK_MB", "256")) * 2 ** 20
+
+# Dataset catalog (see biometrics/catalog.py): SQLite index of dataset files shared by all loaders
+CATALOG_DB = os.getenv("BIOMETRICS_CATALOG_DB", os.path.join(RESULTS_DIR, "catalog.sqlite3"))
+# Request-path loaders (matching, result cache keys) rescan a dataset at most this often, seconds
+CATALOG_RESCAN_SECONDS = float(os.getenv("BIOMETRICS_CATALOG_RESCAN_SECONDS", "5"))
+
+# Staged decode/extract pipeline (see biometrics/pipeline.py)
+PIPELINE_READERS = 2         # threads reading and decoding images ahead of compute
+PIPELINE_QUEUE_SIZE = 32     # bound of each inter-stage queue, in images
+
+# Checkpointed feature/gallery builds (see biometrics/checkpoint.py): images per saved chunk
+CHECKPOINT_CHUNK_SIZE = int(os.getenv("BIOMETRICS_CHECKPOINT_CHUNK_SIZE", "1000"))
+
+# Extracted training features for facefingerdev.py (see biometrics/featurecache.py)
+FEATURE_CACHE_DIR = os.getenv("BIOMETRICS_FEATURE_CACHE_DIR", os.path.join(RESULTS_DIR, "features"))
+
+# Model selection (see biometrics/evaluation.py): mean CV accuracy a faster model may give up
+MODEL_SELECTION_TOLERANCE = 0.01
+
+# Sharded search (see biometrics/shards.py): per-request deadline for shard workers, seconds
+SHARD_TIMEOUT = float(os.getenv("BIOMETRICS_SHARD_TIMEOUT", "2.0"))
+SHARD_HEALTH_TIMEOUT = 1.0
+# Concurrent searches one ShardCoordinator serves without queueing shard calls behind each other
+SHARD_CONCURRENCY = int(os.getenv("BIOMETRICS_SHARD_CONCURRENCY", "8"))
 
 # Other parameters
 MIN_CLASS_SAMPLES = 2
 BATCH_SIZE = 16
 N_JOBS = -1  # For parallelism
+SHARED_EXECUTOR_WORKERS = 4  # Threads behind the async matching APIs
+
+# CPU thread budget (see biometrics/budget.py); 0 means "use os.cpu_count()"
+THREAD_BUDGET_CORES = int(os.getenv("BIOMETRICS_CPU_CORES", "0"))
+THREAD_BUDGET_WORKERS = int(os.getenv("BIOMETRICS_WORKERS", str(SHARED_EXECUTOR_WORKERS)))
 
 # Logging
 LOGGING_LEVEL = "INFO"
+
+# Tracing (see biometrics/tracing.py); empty TRACE_FILE keeps spans in memory only
+TRACE_FILE = os.getenv("BIOMETRICS_TRACE_FILE", "")
+TRACE_BUFFER_SIZE = 10000
@@ -0,0 +1,68 @@
+"""
+biometrics/enrollment.py
+Incremental enrollment: add identities to a trained classifier without a full rebuild.
+
+Training in facefingerdev.py leaves behind a fitted model and the feature store it was
+trained on (biometrics/featurestore.py). Enrolling a new identity appends its features
+to the store as one small segment and updates the model in the cheapest way it allows:
+  partial_fit - models that can absorb new samples and classes (ProjectedKNN), or new
+                samples of known classes (sklearn's SGDClassifier and friends)
+  index       - sklearn KNeighborsClassifier: "fitting" only indexes the stored features;
+                a ball-tree ProjectedKNN also lands here, since its partial_fit rebuilds
+                the tree over every projected row (still without reading the store)
+  refit       - anything else (e.g. SVC) is refitted on the stored features, which still
+                skips re-extracting the whole dataset
+"""
+import logging
+import os
+import pickle
+import time
+from typing import Dict, Sequence
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+from .featurestore import FeatureStore
+from .metrics import REGISTRY
+from .neighbors import ProjectedKNN
+
+ENROLLMENTS = REGISTRY.counter("biometrics_enrollments_total", "Incremental enrollments by model update method")
+
+
+def _updates_in_place(model, y_new: Sequence[str]) -> bool:
+    # sklearn's partial_fit models fix their classes on the first call; ProjectedKNN can add new ones
+    known = set(getattr(model, "classes_", []))
+    return isinstance(model, ProjectedKNN) or (hasattr(model, "partial_fit") and set(y_new) <= known)
+
+
+def enroll(store_dir: str, model_path: str, X_new: np.ndarray, y_new: Sequence[str]) -> Dict[str, float]:
+    """Append features to the store in store_dir and update the pickled model at model_path.
+
+    Models updated in place never read the store; the others load it to refit.
+    """
+    start = time.perf_counter()
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    X_new, y_new = np.asarray(X_new, dtype=np.float32), list(y_new)
+    if _updates_in_place(model, y_new):
+        loaded = time.perf_counter()
+        model.partial_fit(X_new, np.asarray(y_new))
+        method = "index" if getattr(model, "tree_", None) is not None else "partial_fit"
+        updated = time.perf_counter()
+        FeatureStore.append_to(store_dir, X_new, y_new)
+    else:
+        store = FeatureStore.load(store_dir) if os.path.exists(os.path.join(store_dir, "manifest.json")) else FeatureStore()
+        loaded = time.perf_counter()
+        store.extend(X_new, y_new)
+        model.fit(store.X, store.labels)
+        method = "index" if isinstance(model, KNeighborsClassifier) else "refit"
+        updated = time.perf_counter()
+        store.save(store_dir)
+    tmp_path = f"{model_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, model_path)
+    done = time.perf_counter()
+    ENROLLMENTS.inc(method=method)
+    timings = {"load_seconds": loaded - start, "update_seconds": updated - loaded, "save_seconds": done - updated}
+    logging.info(f"Enrolled {len(y_new)} samples of {sorted(set(y_new))} via {method}: "
+                 + ", ".join(f"{key}={value * 1000:.1f}ms" for key, value in timings.items()))
+    return {"method": method, "classes": len(model.classes_), **timings}
@@ -0,0 +1,138 @@
+"""
+biometrics/evaluation.py
+Cross-validation that records what a model costs as well as how accurate it is.
+
+Folds run in parallel through joblib (the machinery behind sklearn's n_jobs). The
+number of fold workers and each worker's BLAS/OpenMP threads come from the thread
+budget, so a parallel CV does not oversubscribe the cores. Each fold records its
+fit and predict wall time, the per-sample inference latency, the pickled size of the
+fitted model and the peak memory allocated while it ran (Python and NumPy
+allocations). Tracing every allocation slows it down, so the timings come from an
+untraced fit and predict and the memory from a second, traced one. select_cheapest then picks the fastest
+candidate whose accuracy is within a tolerance of the best.
+"""
+import logging
+import math
+import pickle
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+import numpy as np
+from joblib import Parallel, delayed, parallel_config
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from .budget import get_thread_budget
+from .config import MODEL_SELECTION_TOLERANCE
+from .metrics import STAGE_SECONDS
+
+FOLD_COLUMNS = ["model", "fold", "accuracy", "fit_seconds", "predict_seconds", "latency_ms", "peak_memory_mb", "model_mb", "train_size", "test_size"]
+
+
+class _ByteCounter:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(memoryview(data).cast("B"))
+        return self.size
+
+
+def model_size(model) -> int:
+    """Bytes a model takes when pickled (as ModelEvaluator.save_model writes it), without buffering the pickle."""
+    counter = _ByteCounter()
+    pickle.dump(model, counter, protocol=pickle.HIGHEST_PROTOCOL)
+    return counter.size
+
+
+def _fit_predict(model, X, y, train: np.ndarray, test: np.ndarray):
+    estimator = clone(model)
+    start = time.perf_counter()
+    estimator.fit(X[train], y[train])
+    fitted = time.perf_counter()
+    predicted = estimator.predict(X[test])
+    return estimator, predicted, fitted - start, time.perf_counter() - fitted
+
+
+def _peak_memory(model, X, y, train: np.ndarray, test: np.ndarray) -> int:
+    """Peak bytes traced by tracemalloc over one more fit and predict of model."""
+    tracing = not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        _fit_predict(model, X, y, train, test)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        if tracing:
+            tracemalloc.stop()
+
+
+def _run_fold(model, X, y, train: np.ndarray, test: np.ndarray, measure_memory: bool = True) -> Dict[str, float]:
+    estimator, predicted, fit_seconds, predict_seconds = _fit_predict(model, X, y, train, test)
+    peak = _peak_memory(model, X, y, train, test) if measure_memory else math.nan
+    return {
+        "accuracy": float(np.mean(predicted == y[test])),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "latency_ms": predict_seconds / len(test) * 1000,
+        "peak_memory_mb": peak / 2 ** 20,
+        "model_mb": model_size(estimator) / 2 ** 20,
+        "train_size": len(train),
+        "test_size": len(test),
+    }
+
+
+def cross_validate_many(models: Dict[str, object], X, y, cv, n_jobs: Optional[int] = None,
+                        measure_memory: bool = True) -> Dict[str, List[Dict[str, float]]]:
+    """cross_validate_timed for several named models, with all their folds in one parallel batch.
+
+    Without measure_memory the traced pass is skipped and peak_memory_mb is NaN.
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    splits = list(cv.split(X, y))
+    jobs = [(name, model, train, test) for name, model in models.items() for train, test in splits]
+    budget = get_thread_budget()
+    n_jobs = max(1, min(n_jobs or budget["workers"], len(jobs)))
+    with parallel_config(backend="loky", inner_max_num_threads=budget["threads_per_worker"]):
+        results = Parallel(n_jobs=n_jobs)(delayed(_run_fold)(model, X, y, train, test, measure_memory) for _, model, train, test in jobs)
+    folds = {name: [] for name in models}
+    for (name, _, _, _), result in zip(jobs, results):
+        STAGE_SECONDS.observe(result["fit_seconds"], stage="fit", modality=name)
+        STAGE_SECONDS.observe(result["predict_seconds"], stage="predict", modality=name)
+        folds[name].append({"model": name, "fold": len(folds[name]), **result})
+    for name, model_folds in folds.items():
+        logging.info(f"{name} CV ({n_jobs} jobs): " + ", ".join(f"{key}={value:.4g}" for key, value in summarize(model_folds).items()))
+    return folds
+
+
+def cross_validate_timed(model, X, y, cv, name: str = "model", n_jobs: Optional[int] = None) -> List[Dict[str, float]]:
+    """One dict per fold of cv.split(X, y) with accuracy and cost columns (see FOLD_COLUMNS).
+
+    n_jobs defaults to the thread budget's worker count, capped by the number of folds.
+    """
+    return cross_validate_many({name: model}, X, y, cv, n_jobs)[name]
+
+
+def default_cv(y) -> StratifiedKFold:
+    """Stratified folds for y: as many as the rarest class allows, between 2 and 3."""
+    min_class_samples = int(np.unique(np.asarray(y), return_counts=True)[1].min())
+    if min_class_samples < 2:
+        raise ValueError("Each class must have at least 2 samples for StratifiedKFold.")
+    return StratifiedKFold(n_splits=max(min(min_class_samples, 3), 2))
+
+
+def summarize(folds: List[Dict[str, float]]) -> Dict[str, float]:
+    """Mean of each numeric fold column; peak memory is the maximum over the folds that measured it."""
+    summary = {column: float(np.mean([fold[column] for fold in folds]))
+               for column in ("accuracy", "fit_seconds", "predict_seconds", "latency_ms", "model_mb")}
+    peaks = [fold["peak_memory_mb"] for fold in folds if not math.isnan(fold["peak_memory_mb"])]
+    summary["peak_memory_mb"] = max(peaks) if peaks else math.nan
+    return summary
+
+
+def select_cheapest(candidates: Dict[str, List[Dict[str, float]]], tolerance: float = MODEL_SELECTION_TOLERANCE) -> str:
+    """Name of the lowest-latency candidate whose mean CV accuracy is within tolerance of the best."""
+    summaries = {name: summarize(folds) for name, folds in candidates.items()}
+    best = max(summary["accuracy"] for summary in summaries.values())
+    eligible = [name for name, summary in summaries.items() if summary["accuracy"] >= best - tolerance]
+    return min(eligible, key=lambda name: (summaries[name]["latency_ms"], summaries[name]["model_mb"]))
@@ -5,13 +5,20 @@ Face recognition processing logic, refactored for modularity and best practices.
 import os
 import numpy as np
 from deepface import DeepFace
-from typing import Callable, Optional, List, Dict, Any
+from typing import Callable, Optional, List, Dict, Any, Tuple
 import time
 import csv
 import logging
-from .config import FACIAL_DATASET_PATH, FACEOM_RESULTS_DIR, FACIAL_RESULTS_FILE, MIN_CLASS_SAMPLES
+from .config import FACIAL_DATASET_PATH, FACEOM_RESULTS_DIR, FACIAL_RESULTS_FILE, MIN_CLASS_SAMPLES, CATALOG_RESCAN_SECONDS
 from .utils import setup_logging
-from .parallel import parallel_map
+from .parallel import parallel_map, parallel_map_async, run_async
+from .metrics import STAGE_SECONDS, COMPARISONS, record_run
+from .tracing import span, traced
+from .cache import RESULT_CACHE, result_key, file_digest, directory_version
+from .singleflight import MATCH_FLIGHTS
+from .catalog import get_catalog
+
+FACE_EXTENSIONS = (".png", ".jpg", ".jpeg")
 
 setup_logging()
 
@@ -19,28 +26,102 @@ setup_logging()
 def _verify_pair(args):
     image_path, img_path = args
     try:
-        result = DeepFace.verify(image_path, img_path)
+        with STAGE_SECONDS.time(stage="score", modality="face"), span("face.verify"):
+            result = DeepFace.verify(image_path, img_path)
         accuracy = (1 - result['distance']) * 100
+        COMPARISONS.inc(modality="face", outcome="ok")
         return img_path, accuracy, None
     except Exception as e:
+        COMPARISONS.inc(modality="face", outcome="error")
         return img_path, None, str(e)
 
-def find_most_similar(image_path: str, dataset_folder: Optional[str] = None, log_callback: Optional[Callable[[str], None]] = None, parallel: bool = True, max_workers: int = 4) -> (Optional[Dict[str, Any]], float):
-    """Perform facial recognition and find the most similar face, optionally in parallel."""
+def _face_tasks(image_path: str, dataset_folder: str) -> List[tuple]:
+    # Matching reuses a recent catalog scan rather than walking the dataset on every request
+    files = get_catalog().files(dataset_folder, FACE_EXTENSIONS, max_age=CATALOG_RESCAN_SECONDS)
+    return [(image_path, img_path) for img_path in files]
+
+
+def _result_cache_key(image_path: str, dataset_folder: str) -> Optional[str]:
+    try:
+        params = {"modality": "face", "dataset": os.path.realpath(dataset_folder)}
+        return result_key(file_digest(image_path), params, directory_version(dataset_folder, FACE_EXTENSIONS))
+    except OSError:
+        return None
+
+
+def _cached_results(cache_key: Optional[str], log_callback: Optional[Callable[[str], None]]) -> Optional[List[tuple]]:
+    results_raw = RESULT_CACHE.get(cache_key) if cache_key else None
+    if results_raw is not None and log_callback:
+        log_callback("Probe and gallery unchanged; using cached scores.")
+    return results_raw
+
+
+def _store_results(cache_key: Optional[str], results_raw: List[Any]):
+    if cache_key and all(r is not None for r in results_raw):
+        RESULT_CACHE.put(cache_key, results_raw)
+
+
+def _scan_faces(image_path: str, dataset_folder: str, parallel: bool, max_workers: int) -> Tuple[List[tuple], List[Any]]:
+    tasks = _face_tasks(image_path, dataset_folder)
+    if parallel:
+        return tasks, parallel_map(_verify_pair, tasks, max_workers=max_workers)
+    return tasks, [_verify_pair(t) for t in tasks]
+
+
+@traced("face.find_most_similar")
+def find_most_similar(image_path: str, dataset_folder: Optional[str] = None, log_callback: Optional[Callable[[str], None]] = None, parallel: bool = True, max_workers: int = 4, use_cache: bool = True) -> (Optional[Dict[str, Any]], float):
+    """Perform facial recognition and find the most similar face, optionally in parallel.
+
+    Scores for a probe already matched against an unchanged dataset folder are served from RESULT_CACHE,
+    and concurrent calls for the same probe and folder share one scan (MATCH_FLIGHTS).
+    """
     if dataset_folder is None:
         dataset_folder = FACIAL_DATASET_PATH
+    start_time = time.time()
+    cache_key = _result_cache_key(image_path, dataset_folder)
+    results_raw = _cached_results(cache_key, log_callback) if use_cache else None
+    if results_raw is not None:
+        tasks = [(image_path, img_path) for img_path, _, _ in results_raw]
+    else:
+        # Concurrent requests for the same probe and gallery share one scan.
+        scan_args = (image_path, dataset_folder, parallel, max_workers)
+        tasks, results_raw = MATCH_FLIGHTS.do(cache_key, _scan_faces, *scan_args) if cache_key else _scan_faces(*scan_args)
+        if use_cache:
+            _store_results(cache_key, results_raw)
+    return _report_face_results(image_path, tasks, results_raw, start_time, log_callback)
+
+
+async def find_most_similar_async(image_path: str, dataset_folder: Optional[str] = None, log_callback: Optional[Callable[[str], None]] = None, use_cache: bool = True) -> (Optional[Dict[str, Any]], float):
+    """Awaitable find_most_similar; each comparison runs on the shared executor.
+
+    Cancelling the awaiting task drops the comparisons that have not started yet.
+    """
+    if dataset_folder is None:
+        dataset_folder = FACIAL_DATASET_PATH
+    start_time = time.time()
+    with span("face.find_most_similar"):
+        cache_key = await run_async(_result_cache_key, image_path, dataset_folder) if use_cache else None
+        results_raw = await run_async(_cached_results, cache_key, log_callback)
+        if results_raw is not None:
+            tasks = [(image_path, img_path) for img_path, _, _ in results_raw]
+        else:
+            tasks = await run_async(_face_tasks, image_path, dataset_folder)
+            results_raw = await parallel_map_async(_verify_pair, tasks)
+            await run_async(_store_results, cache_key, results_raw)
+        return await run_async(_report_face_results, image_path, tasks, results_raw, start_time, log_callback)
+
+
+def _report_face_results(image_path: str, tasks: List[tuple], results_raw: List[Any], start_time: float, log_callback: Optional[Callable[[str], None]]) -> (Optional[Dict[str, Any]], float):
+    with STAGE_SECONDS.time(stage="report", modality="face"), span("face.report"):
+        return _write_face_report(image_path, tasks, results_raw, start_time, log_callback)
+
+
+def _write_face_report(image_path: str, tasks: List[tuple], results_raw: List[Any], start_time: float, log_callback: Optional[Callable[[str], None]]) -> (Optional[Dict[str, Any]], float):
     results = []
     metrics_per_epoch = []
-    start_time = time.time()
     os.makedirs(FACEOM_RESULTS_DIR, exist_ok=True)
     csv_file = os.path.join(FACEOM_RESULTS_DIR, "face_matching_results.csv")
     top_result_file = os.path.join(FACEOM_RESULTS_DIR, "top_result.txt")
-    image_files = [f for f in os.listdir(dataset_folder) if f.lower().endswith((".png", ".jpg", ".jpeg"))]
-    tasks = [(image_path, os.path.join(dataset_folder, img_name)) for img_name in image_files]
-    if parallel:
-        results_raw = parallel_map(_verify_pair, tasks, max_workers=max_workers)
-    else:
-        results_raw = [_verify_pair(t) for t in tasks]
     epoch = 0
     for img_name, accuracy, error in [ (os.path.basename(t[1]), acc, err) for t, (p, acc, err) in zip(tasks, results_raw) ]:
         if error:
@@ -77,10 +158,7 @@ def find_most_similar(image_path: str, dataset_folder: Optional[str] = None, log
     recall_time = elapsed_time
     precision = accuracy / 100
     f1_score = (2 * precision) / (precision + 1) if precision > 0 else 0
-    with open(FACIAL_RESULTS_FILE, "w") as file:
-        file.write(f"Accuracy: {accuracy:.2f}%\n")
-        file.write(f"Recall Time: {recall_time:.2f}s\n")
-        file.write(f"F1-Score: {f1_score:.2f}\n")
+    record_run("face", accuracy, recall_time, f1_score)
     metrics_csv = os.path.join(os.path.dirname(FACIAL_RESULTS_FILE), "facial_metrics_per_epoch.csv")
     with open(metrics_csv, "w", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=["epoch", "accuracy", "precision", "recall", "f1_score"])
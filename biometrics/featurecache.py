@@ -0,0 +1,95 @@
+"""
+biometrics/featurecache.py
+On-disk cache of extracted training features, keyed by dataset state and extractor version.
+
+facefingerdev.py spends nearly all of its time extracting ResNet50 and texture features
+before any classifier runs. A finished extraction is saved as <cache_dir>/<key>.npz,
+where the key is "<slot>-<version>": the slot hashes the extractor id (which carries a
+version to bump whenever the features change) with the dataset path, and the version
+hashes the dataset's catalog version, or the size and mtime of a .pack file. Re-running
+with an unchanged dataset loads the matrix and goes straight to training; any added,
+removed or rewritten image yields a new key, and saving it deletes the older files of
+the same slot so the cache holds one matrix per (extractor, dataset).
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Optional, Sequence, Tuple
+import numpy as np
+from .catalog import get_catalog
+from .config import FEATURE_CACHE_DIR
+from .imagepack import is_pack
+from .metrics import REGISTRY
+
+FEATURE_CACHE_LOOKUPS = REGISTRY.counter("biometrics_feature_cache_total", "Training feature cache lookups by outcome")
+
+Features = Tuple[Sequence[np.ndarray], Sequence[str]]
+
+
+def dataset_version(dataset_path: str) -> str:
+    """Catalog version of a dataset folder, or size/mtime of a .pack file."""
+    if is_pack(dataset_path):
+        stat = os.stat(dataset_path)
+        return f"pack:{stat.st_size}:{stat.st_mtime_ns}"
+    return get_catalog().version(dataset_path)
+
+
+class FeatureCache:
+    """Feature matrices and labels saved per (extractor, dataset version)."""
+
+    def __init__(self, cache_dir: str = FEATURE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def key(self, extractor: str, dataset_path: str) -> str:
+        slot = json.dumps({"extractor": extractor, "dataset": os.path.abspath(dataset_path)}, sort_keys=True)
+        version = dataset_version(dataset_path)
+        return f"{hashlib.sha256(slot.encode()).hexdigest()[:32]}-{hashlib.sha256(version.encode()).hexdigest()[:32]}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key: str) -> Optional[Features]:
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                X, y = data["features"], [str(label) for label in data["labels"]]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable feature cache {self._path(key)}: {e}")
+            return None
+        return X, y
+
+    def save(self, key: str, X: Sequence[np.ndarray], y: Sequence[str]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp.npz"
+        if isinstance(X, np.ndarray):
+            matrix = X
+        else:
+            matrix = np.vstack(X) if len(X) else np.zeros((0, 0))
+        np.savez(tmp_path, features=matrix, labels=np.array(y, dtype=str))
+        os.replace(tmp_path, self._path(key))
+        self._drop_stale(key)
+
+    def _drop_stale(self, key: str):
+        """Delete the saved features of older dataset versions in key's slot."""
+        slot = key.split("-", 1)[0]
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(f"{slot}-") and name.endswith(".npz") and name != f"{key}.npz" and ".tmp" not in name:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    def fetch(self, extractor: str, dataset_path: str, build: Callable[[], Features]) -> Features:
+        """(X, y) for dataset_path from the cache, or from build() (then saved) on a miss."""
+        key = self.key(extractor, dataset_path)
+        cached = self.load(key)
+        if cached is not None:
+            FEATURE_CACHE_LOOKUPS.inc(outcome="hit")
+            logging.info(f"Loaded {len(cached[0])} cached {extractor} features for {dataset_path}; skipping extraction.")
+            return cached
+        FEATURE_CACHE_LOOKUPS.inc(outcome="miss")
+        X, y = build()
+        self.save(key, X, y)
+        return X, y
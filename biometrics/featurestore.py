@@ -0,0 +1,213 @@
+"""
+biometrics/featurestore.py
+Growable float32 feature matrix with integer-coded labels for training sets.
+
+Extracted features used to be collected as Python lists of small arrays plus a list of
+label strings, which filter_classes rebuilt and sklearn then copied into yet another
+array. FeatureStore keeps one preallocated matrix (grown geometrically; untouched
+capacity is never paged in) and an int32 code per row into a label dictionary.
+Filtering compacts rows in place with a boolean mask, so X is handed to sklearn as a
+view without further copies.
+
+save() persists the store as append-only segments: each call writes just the rows
+added since the previous save as a new segment_<n>.npz and lists it in manifest.json,
+so enrolling a few samples into a large store costs a small write. A store that was
+filtered since its last save is rewritten as a single segment.
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+_GROWTH = 1.5
+_COMPACT_BLOCK = 4096
+
+
+class FeatureStore:
+    """Rows of features with a label per row; X and codes are views of the live rows."""
+
+    def __init__(self, width: Optional[int] = None, capacity: int = 1024, dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.size = 0
+        self.classes: List[str] = []
+        self._class_codes: Dict[str, int] = {}
+        self._data = np.empty((capacity, width), self.dtype) if width else None
+        self._codes = np.empty(capacity, np.int32)
+        # Rows already on disk (None once a filter has changed them) and their segment files
+        self._saved_rows: Optional[int] = 0
+        self._segments: List[str] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def width(self) -> int:
+        return self._data.shape[1] if self._data is not None else 0
+
+    @property
+    def X(self) -> np.ndarray:
+        if self._data is None:
+            return np.empty((0, 0), self.dtype)
+        return self._data[:self.size]
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self._codes[:self.size]
+
+    @property
+    def labels(self) -> np.ndarray:
+        """Label string of every row (decoded from the integer codes)."""
+        return np.asarray(self.classes, dtype=str)[self.codes] if self.classes else np.empty(0, dtype=str)
+
+    def code(self, label: str) -> int:
+        code = self._class_codes.get(label)
+        if code is None:
+            code = self._class_codes[label] = len(self.classes)
+            self.classes.append(label)
+        return code
+
+    def _reserve(self, rows: int, width: int):
+        if self._data is None:
+            capacity = max(rows, len(self._codes))
+            self._data = np.empty((capacity, width), self.dtype)
+            if capacity > len(self._codes):
+                self._codes = np.empty(capacity, np.int32)
+        elif width != self.width:
+            raise ValueError(f"Feature width {width} does not match store width {self.width}")
+        needed = self.size + rows
+        if needed <= len(self._data):
+            return
+        capacity = max(needed, int(len(self._data) * _GROWTH) + 1)
+        self._codes = np.resize(self._codes, capacity)
+        try:
+            # realloc in place when nothing else holds a view of the buffer
+            self._data.resize((capacity, self.width), refcheck=True)
+        except ValueError:
+            data = np.empty((capacity, self.width), self.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+
+    def append(self, features: np.ndarray, label: str):
+        features = np.ravel(features)
+        self._reserve(1, len(features))
+        self._data[self.size] = features
+        self._codes[self.size] = self.code(label)
+        self.size += 1
+
+    def extend(self, X: Iterable[np.ndarray], labels: Iterable[str]):
+        """Append rows from a 2-D array or a sequence of 1-D arrays.
+
+        An empty store starts from an exact-size copy of a 2-D array that already has
+        its dtype; the caller's array is never aliased.
+        """
+        if isinstance(X, np.ndarray) and X.ndim == 2:
+            labels = list(labels)
+            if len(labels) != len(X):
+                raise ValueError(f"{len(X)} feature rows but {len(labels)} labels")
+            if not len(X):
+                return
+            if self._data is None and X.dtype == self.dtype:
+                self._data = X.copy()
+                self._codes = np.array([self.code(label) for label in labels], np.int32)
+                self.size = len(X)
+                return
+            self._reserve(len(X), X.shape[1])
+            self._data[self.size:self.size + len(X)] = X
+            self._codes[self.size:self.size + len(X)] = [self.code(label) for label in labels]
+            self.size += len(X)
+            return
+        for features, label in zip(X, labels):
+            self.append(features, label)
+
+    def keep(self, mask: np.ndarray):
+        """Drop rows where mask is False, compacting the survivors in place."""
+        rows = np.flatnonzero(mask[:self.size])
+        dst = 0
+        # Every source row is at or after its destination, so copying in blocks never clobbers unread rows.
+        for start in range(0, len(rows), _COMPACT_BLOCK):
+            block = rows[start:start + _COMPACT_BLOCK]
+            if self._data is not None:
+                self._data[dst:dst + len(block)] = self._data[block]
+            self._codes[dst:dst + len(block)] = self._codes[block]
+            dst += len(block)
+        if dst != self.size:
+            self._saved_rows = None
+        self.size = dst
+
+    def class_counts(self) -> np.ndarray:
+        return np.bincount(self.codes, minlength=len(self.classes))
+
+    def filter_classes(self, min_samples: int) -> int:
+        """Keep only rows whose class has at least min_samples rows; returns the number of rows left."""
+        counts = self.class_counts()
+        self.keep(counts[self.codes] >= min_samples)
+        return self.size
+
+    def save(self, directory: str) -> int:
+        """Write rows added since the last save/load to directory; returns the number of rows written.
+
+        Everything is rewritten when rows were filtered out since, or when directory holds
+        segments this store did not write.
+        """
+        existing = _read_segments(directory)
+        rewrite = self._saved_rows is None or existing != self._segments
+        start = 0 if rewrite else self._saved_rows
+        if start == self.size and not rewrite:
+            return 0
+        self._segments = _write_segment(directory, self.X[start:], self.labels[start:], existing, replace=rewrite)
+        self._saved_rows = self.size
+        return self.size - start
+
+    @staticmethod
+    def append_to(directory: str, X: np.ndarray, labels: Iterable[str]):
+        """Add rows to a saved store as one new segment without loading it."""
+        _write_segment(directory, np.asarray(X), np.array(list(labels), dtype=str), _read_segments(directory), replace=False)
+
+    @classmethod
+    def load(cls, directory: str, dtype=np.float32) -> "FeatureStore":
+        """Store holding every segment listed in directory/manifest.json."""
+        segments = _read_segments(directory, missing_ok=False)
+        parts = []
+        for name in segments:
+            with np.load(os.path.join(directory, name), allow_pickle=False) as data:
+                parts.append((data["features"], [str(label) for label in data["labels"]]))
+        width = next((X.shape[1] for X, _ in parts if len(X)), None)
+        store = cls(width=width, capacity=max(sum(len(X) for X, _ in parts), 1), dtype=dtype)
+        for X, labels in parts:
+            store.extend(X, labels)
+        store._segments, store._saved_rows = segments, store.size
+        return store
+
+
+def _read_segments(directory: str, missing_ok: bool = True) -> List[str]:
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            return json.load(f)["segments"]
+    except FileNotFoundError:
+        if missing_ok:
+            return []
+        raise
+
+
+def _write_segment(directory: str, X: np.ndarray, labels: np.ndarray, existing: List[str], replace: bool) -> List[str]:
+    """Write one segment, then a manifest listing it (alone if replace); returns the new segment list."""
+    os.makedirs(directory, exist_ok=True)
+    name = f"segment_{_next_segment(existing):05d}.npz"
+    tmp_path = os.path.join(directory, name + ".tmp.npz")
+    np.savez(tmp_path, features=X, labels=labels)
+    os.replace(tmp_path, os.path.join(directory, name))
+    segments = [name] if replace else existing + [name]
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump({"segments": segments}, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    for stale in (existing if replace else []):
+        try:
+            os.remove(os.path.join(directory, stale))
+        except FileNotFoundError:
+            pass
+    return segments
+
+
+def _next_segment(segments: List[str]) -> int:
+    return max((int(name[len("segment_"):-len(".npz")]) for name in segments), default=-1) + 1
@@ -12,59 +12,210 @@ import csv
 import logging
 import pandas as pd
 import matplotlib.pyplot as plt
-from typing import Optional, Callable
-from .config import FINGERPRINT_DATASET_PATH, FINGERPRINT_RESULTS_FILE, RESULTS_DIR, MIN_CLASS_SAMPLES
+from typing import Optional, Callable, List, Any, Tuple
+from .config import FINGERPRINT_DATASET_PATH, RESULTS_DIR, MIN_CLASS_SAMPLES, FINGERPRINT_ENGINE, FINGERPRINT_QUALITY_FLOOR, CATALOG_RESCAN_SECONDS
 from .utils import setup_logging
-from .parallel import parallel_map
+from .parallel import parallel_map, parallel_map_async, run_async
+from .metrics import STAGE_SECONDS, COMPARISONS, record_run
+from .tracing import span, traced
+from .binary import BriefEngine
+from .quality import check_probe_quality
+from .cache import RESULT_CACHE, result_key, file_digest, directory_version
+from .singleflight import MATCH_FLIGHTS
+from .templates import TemplateCache
+from .catalog import get_catalog
 
 setup_logging()
 
 
+def decode_fingerprint(image_path: str) -> np.ndarray:
+    """Read a fingerprint image as grayscale."""
+    with STAGE_SECONDS.time(stage="decode", modality="fingerprint"), span("fingerprint.decode"):
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError(f"Unable to load image: {image_path}")
+    return image
+
+
+def hog_features(image: np.ndarray) -> np.ndarray:
+    """HOG features of a decoded grayscale fingerprint."""
+    with STAGE_SECONDS.time(stage="extract", modality="fingerprint"), span("fingerprint.extract"):
+        image = cv2.resize(image, (128, 128))
+        features, _ = hog(image, orientations=9, pixels_per_cell=(8, 8),
+                          cells_per_block=(2, 2), visualize=True, feature_vector=True)
+    return features
+
+
 def extract_features(image_path: str) -> np.ndarray:
     """Extract HOG features from an image."""
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        raise ValueError(f"Unable to load image: {image_path}")
-    image = cv2.resize(image, (128, 128))
-    features, _ = hog(image, orientations=9, pixels_per_cell=(8, 8),
-                      cells_per_block=(2, 2), visualize=True, feature_vector=True)
-    return features
+    return hog_features(decode_fingerprint(image_path))
+
+
+class HogEngine:
+    """HOG features scored by cosine similarity (the original engine)."""
+    name = "hog"
+
+    def decode(self, image_path: str) -> np.ndarray:
+        return decode_fingerprint(image_path)
+
+    def extract_image(self, image: np.ndarray) -> np.ndarray:
+        return hog_features(image)
+
+    def extract(self, image_path: str) -> np.ndarray:
+        return extract_features(image_path)
+
+    def score(self, probe: np.ndarray, template: np.ndarray) -> float:
+        return float(cosine_similarity([probe], [template])[0][0])
+
+    def score_many(self, probe: np.ndarray, templates: List[np.ndarray]) -> np.ndarray:
+        if not len(templates):
+            return np.zeros(0, dtype=np.float32)
+        matrix = templates if isinstance(templates, np.ndarray) else np.vstack(templates)
+        return cosine_similarity([probe], matrix)[0]
+
+
+ENGINES = {"hog": HogEngine(), "brief": BriefEngine()}
+# Enrolled templates are reused across verifications instead of re-extracted per request.
+TEMPLATE_CACHES = {name: TemplateCache(engine) for name, engine in ENGINES.items()}
+
+
+def get_engine(name: Optional[str] = None):
+    """Return the fingerprint engine by name, defaulting to FINGERPRINT_ENGINE."""
+    name = name or FINGERPRINT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown fingerprint engine '{name}'. Choose from: {', '.join(ENGINES)}")
+    return ENGINES[name]
 
 
 def _compare_single(args):
-    input_features, db_path = args
+    input_features, db_path, engine_name = args
     try:
-        db_features = extract_features(db_path)
-        score = cosine_similarity([input_features], [db_features])[0][0]
+        engine = get_engine(engine_name)
+        db_features = TEMPLATE_CACHES[engine.name].get(db_path)
+        with STAGE_SECONDS.time(stage="score", modality="fingerprint"), span("fingerprint.score", engine=engine.name):
+            score = engine.score(input_features, db_features)
+        COMPARISONS.inc(modality="fingerprint", outcome="ok")
         return db_path, score, None
     except Exception as e:
+        COMPARISONS.inc(modality="fingerprint", outcome="error")
         return db_path, None, str(e)
 
-def compare_fingerprints(fingerprint_path: str, dataset_path: Optional[str], log_callback: Optional[Callable[[str], None]], progress_bar=None, parallel: bool = True, max_workers: int = 4):
+def _fingerprint_tasks(fingerprint_path: str, dataset_path: str, engine: Optional[str] = None, quality_floor: Optional[float] = None, probe_quality: Optional[float] = None) -> Tuple[List[tuple], Optional[str]]:
+    """Comparison tasks for a probe, or no tasks and the message rejecting the probe."""
+    try:
+        # Hopeless probes are rejected here, before the gallery is touched.
+        check_probe_quality(fingerprint_path, quality_floor, probe_quality)
+        engine = get_engine(engine)
+        input_features = engine.extract(fingerprint_path)
+    except Exception as e:
+        return [], f"[ERROR] Failed to process input fingerprint: {e}"
+    # Matching reuses a recent catalog scan rather than walking the dataset on every request
+    files = get_catalog().files(dataset_path, (".bmp",), max_age=CATALOG_RESCAN_SECONDS)
+    return [(input_features, path, engine.name) for path in files], None
+
+
+def _announce(tasks: List[tuple], error: Optional[str], log_callback: Optional[Callable[[str], None]]) -> bool:
+    """Tell one caller about its scan; returns False when the probe was rejected."""
+    if error:
+        logging.error(error)
+        if log_callback:
+            log_callback(error)
+        return False
+    if log_callback:
+        log_callback(f"Comparing against {len(tasks)} fingerprints...")
+    return True
+
+
+def _result_cache_key(fingerprint_path: str, dataset_path: str, engine: Optional[str], quality_floor: Optional[float]) -> Optional[str]:
+    try:
+        params = {"modality": "fingerprint", "engine": get_engine(engine).name, "dataset": os.path.realpath(dataset_path),
+                  "quality_floor": FINGERPRINT_QUALITY_FLOOR if quality_floor is None else quality_floor}
+        return result_key(file_digest(fingerprint_path), params, directory_version(dataset_path, (".bmp",)))
+    except (OSError, ValueError):
+        # Unreadable probe or unknown engine: let the normal path report the error.
+        return None
+
+
+def _cached_results(cache_key: Optional[str], log_callback: Optional[Callable[[str], None]]) -> Optional[List[tuple]]:
+    results_raw = RESULT_CACHE.get(cache_key) if cache_key else None
+    if results_raw is not None and log_callback:
+        log_callback("Probe and gallery unchanged; using cached scores.")
+    return results_raw
+
+
+def _store_results(cache_key: Optional[str], results_raw: List[Any]):
+    # Partial scans (a worker died) are not cached.
+    if cache_key and all(r is not None for r in results_raw):
+        RESULT_CACHE.put(cache_key, results_raw)
+
+
+def _scan_fingerprints(fingerprint_path: str, dataset_path: str, engine: Optional[str], quality_floor: Optional[float], parallel: bool, max_workers: int, probe_quality: Optional[float] = None) -> Tuple[List[tuple], List[Any], Optional[str]]:
+    # Shared between coalesced callers, so nothing here logs to a caller; the rejection is returned instead.
+    tasks, error = _fingerprint_tasks(fingerprint_path, dataset_path, engine, quality_floor, probe_quality)
+    if error:
+        return tasks, [], error
+    if parallel:
+        return tasks, parallel_map(_compare_single, tasks, max_workers=max_workers), None
+    return tasks, [_compare_single(t) for t in tasks], None
+
+
+@traced("fingerprint.compare")
+def compare_fingerprints(fingerprint_path: str, dataset_path: Optional[str], log_callback: Optional[Callable[[str], None]], progress_bar=None, parallel: bool = True, max_workers: int = 4, engine: Optional[str] = None, quality_floor: Optional[float] = None, use_cache: bool = True, probe_quality: Optional[float] = None):
+    """Score a probe against every print in dataset_path and report the best match to log_callback.
+
+    probe_quality is the probe's quality_from_path score when the caller already computed it.
+    """
+    if dataset_path is None:
+        dataset_path = FINGERPRINT_DATASET_PATH
+    start_time = time.time()
+    cache_key = _result_cache_key(fingerprint_path, dataset_path, engine, quality_floor)
+    results_raw = _cached_results(cache_key, log_callback) if use_cache else None
+    if results_raw is not None:
+        tasks = [(None, db_path, None) for db_path, _, _ in results_raw]
+    else:
+        # Concurrent requests for the same probe and gallery share one scan.
+        scan_args = (fingerprint_path, dataset_path, engine, quality_floor, parallel, max_workers, probe_quality)
+        tasks, results_raw, error = MATCH_FLIGHTS.do(cache_key, _scan_fingerprints, *scan_args) if cache_key else _scan_fingerprints(*scan_args)
+        if not _announce(tasks, error, log_callback):
+            return
+        if use_cache:
+            _store_results(cache_key, results_raw)
+    _report_fingerprint_results(fingerprint_path, dataset_path, tasks, results_raw, start_time, log_callback, progress_bar)
+
+
+async def compare_fingerprints_async(fingerprint_path: str, dataset_path: Optional[str] = None, log_callback: Optional[Callable[[str], None]] = None, engine: Optional[str] = None, quality_floor: Optional[float] = None, use_cache: bool = True, probe_quality: Optional[float] = None):
+    """Awaitable compare_fingerprints; each comparison runs on the shared executor.
+
+    Cancelling the awaiting task drops the comparisons that have not started yet.
+    """
     if dataset_path is None:
         dataset_path = FINGERPRINT_DATASET_PATH
     start_time = time.time()
+    with span("fingerprint.compare"):
+        cache_key = await run_async(_result_cache_key, fingerprint_path, dataset_path, engine, quality_floor) if use_cache else None
+        results_raw = await run_async(_cached_results, cache_key, log_callback)
+        if results_raw is not None:
+            tasks = [(None, db_path, None) for db_path, _, _ in results_raw]
+        else:
+            tasks, error = await run_async(_fingerprint_tasks, fingerprint_path, dataset_path, engine, quality_floor, probe_quality)
+            if not await run_async(_announce, tasks, error, log_callback):
+                return
+            results_raw = await parallel_map_async(_compare_single, tasks)
+            await run_async(_store_results, cache_key, results_raw)
+        await run_async(_report_fingerprint_results, fingerprint_path, dataset_path, tasks, results_raw, start_time, log_callback, None)
+
+
+def _report_fingerprint_results(fingerprint_path: str, dataset_path: str, tasks: List[tuple], results_raw: List[Any], start_time: float, log_callback: Optional[Callable[[str], None]], progress_bar=None):
+    with STAGE_SECONDS.time(stage="report", modality="fingerprint"), span("fingerprint.report"):
+        _write_fingerprint_report(fingerprint_path, dataset_path, tasks, results_raw, start_time, log_callback, progress_bar)
+
+
+def _write_fingerprint_report(fingerprint_path: str, dataset_path: str, tasks: List[tuple], results_raw: List[Any], start_time: float, log_callback: Optional[Callable[[str], None]], progress_bar=None):
     best_score = -1
     best_match_file = None
     scores = []
     metrics_per_epoch = []
-    try:
-        input_features = extract_features(fingerprint_path)
-    except Exception as e:
-        msg = f"[ERROR] Failed to process input fingerprint: {e}"
-        logging.error(msg)
-        if log_callback:
-            log_callback(msg)
-        return
-    files = [f for f in os.listdir(dataset_path) if f.lower().endswith(".bmp")]
-    total = len(files)
-    if log_callback:
-        log_callback(f"Comparing against {total} fingerprints...")
-    tasks = [(input_features, os.path.join(dataset_path, file)) for file in files]
-    if parallel:
-        results_raw = parallel_map(_compare_single, tasks, max_workers=max_workers)
-    else:
-        results_raw = [_compare_single(t) for t in tasks]
+    total = len(tasks)
     epoch = 0
     for file, score, error in [ (os.path.basename(t[1]), s, err) for t, (p, s, err) in zip(tasks, results_raw) ]:
         if progress_bar:
@@ -104,10 +255,7 @@ def compare_fingerprints(fingerprint_path: str, dataset_path: Optional[str], log
     accuracy = best_score * 100 if best_score > 0 else 0
     recall_time = elapsed_time
     f1_score = (2 * accuracy) / (accuracy + 100) if accuracy > 0 else 0
-    with open(FINGERPRINT_RESULTS_FILE, "w") as file:
-        file.write(f"Accuracy: {accuracy:.2f}%\n")
-        file.write(f"Recall Time: {recall_time:.2f}s\n")
-        file.write(f"F1-Score: {f1_score:.2f}\n")
+    record_run("fingerprint", accuracy, recall_time, f1_score)
     if best_match_file:
         if log_callback:
             log_callback(f"\nBest match: {best_match_file} (Score: {best_score:.4f})")
@@ -0,0 +1,203 @@
+"""
+biometrics/gallery.py
+Precomputed fingerprint gallery: templates are extracted once and searched in memory.
+
+A gallery may carry a projection (see biometrics/projection.py) that compresses its
+templates; probes passed to scores/search are projected the same way, and the
+projection is saved in the same .npz file as the templates.
+
+Every change to the gallery advances its version (a hash chain over adds, removes
+and compression), which keys the probe result cache in search_image.
+"""
+import functools
+import hashlib
+import time
+import logging
+import numpy as np
+from typing import List, Optional, Tuple
+from .fingerprint import get_engine
+from .projection import fit_projection, projection_from_arrays
+from .quality import check_probe_quality
+from .metrics import STAGE_SECONDS
+from .tracing import span
+from .cache import RESULT_CACHE, result_key, file_digest
+from .checkpoint import CheckpointedBuild
+from .pipeline import Pipeline
+from .imagepack import ImagePack, is_pack
+from .catalog import get_catalog
+from .featurecache import dataset_version
+from .config import FINGERPRINT_QUALITY_FLOOR
+
+FINGERPRINT_EXTENSIONS = (".bmp",)
+
+
+def _extract_template(decode, extract_image, item):
+    try:
+        return extract_image(decode(item))
+    except Exception as e:
+        logging.error(f"Skipping {item}: {e}")
+        return None
+
+
+class FingerprintGallery:
+    """Templates for one engine keyed by image path."""
+
+    def __init__(self, engine: Optional[str] = None):
+        self.engine = get_engine(engine)
+        self.paths: List[str] = []
+        self.templates: List[np.ndarray] = []
+        self.projection = None
+        self._matrix: Optional[np.ndarray] = None
+        self.version = hashlib.sha256(f"gallery:{self.engine.name}".encode()).hexdigest()
+
+    def _advance(self, change: bytes):
+        self.version = hashlib.sha256(self.version.encode() + change).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def add(self, path: str, template: np.ndarray):
+        """Add an engine template; it is projected first when the gallery is compressed."""
+        template = self.prepare(template)
+        self.paths.append(path)
+        self.templates.append(template)
+        self._matrix = None
+        self._advance(b"add:" + path.encode() + b"\0" + hashlib.sha256(np.ascontiguousarray(template).tobytes()).digest())
+
+    def remove(self, path: str):
+        """Drop the template enrolled for path; raises KeyError if it is not in the gallery."""
+        try:
+            index = self.paths.index(path)
+        except ValueError:
+            raise KeyError(path) from None
+        del self.paths[index]
+        del self.templates[index]
+        self._matrix = None
+        self._advance(b"remove:" + path.encode())
+
+    def prepare(self, template: np.ndarray) -> np.ndarray:
+        """Bring a raw engine template into the gallery's stored form."""
+        if self.projection is None:
+            return template
+        return self.projection.transform(template)
+
+    def compress(self, method: str = "pca", n_components: int = 256, **kwargs):
+        """Fit a projection on the current templates and store them projected."""
+        matrix = self.matrix()
+        if self.projection is not None:
+            raise ValueError("Gallery is already compressed")
+        if not np.issubdtype(matrix.dtype, np.floating):
+            raise ValueError(f"The {self.engine.name} engine has binary templates; projection needs real-valued ones")
+        self.projection = fit_projection(matrix, method=method, n_components=n_components, **kwargs)
+        self._matrix = self.projection.transform(matrix)
+        self.templates = list(self._matrix)
+        self._advance(f"compress:{method}:{n_components}".encode())
+        logging.info(f"[OK] Gallery compressed with {method} from {matrix.shape[1]} to {self._matrix.shape[1]} dimensions")
+
+    def matrix(self) -> np.ndarray:
+        """Templates stacked into one (n, d) array, rebuilt lazily after changes."""
+        if self._matrix is None:
+            self._matrix = np.vstack(self.templates) if self.templates else np.zeros((0, 0))
+        return self._matrix
+
+    @classmethod
+    def build(cls, dataset_path: str, engine: Optional[str] = None, parallel: bool = True, max_workers: int = 4,
+              checkpoint_dir: Optional[str] = None) -> "FingerprintGallery":
+        """Extract a template for every fingerprint in dataset_path, a folder or an image pack.
+
+        Pack images are already decoded (colour packs are converted to grayscale); their
+        templates keep the paths they had in the packed folder. With checkpoint_dir, finished chunks are saved there and an
+        interrupted build resumes from them.
+        """
+        gallery = cls(engine)
+        tag = f"gallery:{gallery.engine.name}"
+        if is_pack(dataset_path):
+            pack = ImagePack(dataset_path)
+            # The same extensions as a folder build; engines take grayscale, whatever the pack stores
+            items = [name for name in pack.names if name.lower().endswith(FINGERPRINT_EXTENSIONS)]
+            decode, path_of = pack.gray, pack.source_path
+            # Pack members are not files, so a rewritten pack has to change the checkpoint tag
+            tag += f":{dataset_version(dataset_path)}"
+        else:
+            items, decode, path_of = get_catalog().files(dataset_path, FINGERPRINT_EXTENSIONS), gallery.engine.decode, str
+        extract = functools.partial(_extract_template, decode, gallery.engine.extract_image)
+        start = time.time()
+        # Parallel builds overlap image reads with extraction (see biometrics/pipeline.py).
+        pipeline = Pipeline(decode, gallery.engine.extract_image, workers=max_workers, name="gallery.build")
+        with span("gallery.build", engine=gallery.engine.name, size=len(items)):
+            if checkpoint_dir:
+                mapper = (lambda _, batch: pipeline.map(batch)) if parallel else None
+                templates, _, done = CheckpointedBuild(checkpoint_dir, tag=tag).run(
+                    [(item, "") for item in items], extract, mapper=mapper)
+                built = zip(done, templates)
+            elif parallel:
+                built = []
+                pipeline.run(items, lambda item, template: built.append((item, template)))
+            else:
+                built = ((item, extract(item)) for item in items)
+            for item, template in built:
+                if template is not None:
+                    gallery.add(path_of(item), template)
+        logging.info(f"[OK] {gallery.engine.name} gallery of {len(gallery)} templates built in {time.time() - start:.2f}s")
+        return gallery
+
+    def scores(self, probe: np.ndarray) -> np.ndarray:
+        """Similarity of a raw engine probe template to every gallery template, in gallery order."""
+        with STAGE_SECONDS.time(stage="score", modality="fingerprint"), span("gallery.score", engine=self.engine.name, size=len(self)):
+            return np.asarray(self.engine.score_many(self.prepare(probe), self.matrix()))
+
+    def search(self, probe: np.ndarray, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Return the top_k (path, score) pairs, best first."""
+        scores = self.scores(probe)
+        if not len(scores):
+            return []
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.paths[i], float(scores[i])) for i in best]
+
+    def search_image(self, image_path: str, top_k: int = 5, quality_floor: Optional[float] = None, use_cache: bool = True) -> List[Tuple[str, float]]:
+        """Search with an image probe; raises LowQualityError below the quality floor.
+
+        Results are cached by probe content and gallery version, so a repeated probe
+        skips quality check, extraction and scoring until the gallery changes.
+        """
+        # Key on the floor actually applied, so changing the default also invalidates cached results
+        quality_floor = FINGERPRINT_QUALITY_FLOOR if quality_floor is None else quality_floor
+        key = None
+        if use_cache:
+            params = {"engine": self.engine.name, "top_k": top_k, "quality_floor": quality_floor}
+            key = result_key(file_digest(image_path), params, self.version)
+            cached = RESULT_CACHE.get(key)
+            if cached is not None:
+                return cached
+        check_probe_quality(image_path, quality_floor)
+        results = self.search(self.engine.extract(image_path), top_k)
+        if key:
+            RESULT_CACHE.put(key, results)
+        return results
+
+    def save(self, path: str):
+        """Persist templates, paths, engine and projection in one .npz file."""
+        arrays = {"paths": np.array(self.paths), "matrix": self.matrix(), "engine": np.array(self.engine.name),
+                  "version": np.array(self.version)}
+        if self.projection is not None:
+            arrays["projection"] = np.array(self.projection.method)
+            arrays.update({f"projection_{k}": v for k, v in self.projection.to_arrays().items()})
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "FingerprintGallery":
+        with np.load(path, allow_pickle=False) as data:
+            gallery = cls(str(data["engine"]))
+            if "projection" in data:
+                arrays = {k[len("projection_"):]: data[k] for k in data.files if k.startswith("projection_")}
+                gallery.projection = projection_from_arrays(str(data["projection"]), arrays)
+            gallery.paths = [str(p) for p in data["paths"]]
+            gallery._matrix = data["matrix"]
+            gallery.templates = list(gallery._matrix)
+            if "version" in data:
+                gallery.version = str(data["version"])
+            else:
+                gallery._advance(b"load:" + hashlib.sha256(gallery._matrix.tobytes()).digest())
+        return gallery
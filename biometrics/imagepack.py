@@ -0,0 +1,121 @@
+"""
+biometrics/imagepack.py
+Packed image container: many pre-decoded images in one memory-mappable file.
+
+Folder datasets of tens of thousands of small files spend cold scans in listdir/open.
+A pack stores every image already decoded (grayscale unless built with color=True) and
+optionally resized, as raw uint8 arrays at 64-byte aligned offsets, followed by a JSON
+index of (name, label, offset, shape). Layout:
+
+    b"BIOPACK1" | uint64 index offset | image data ... | JSON index
+
+Reading maps the file once; ImagePack.image() returns a zero-copy view.
+Build one with: python -m biometrics.imagepack <folder> <out.pack> [--size 128] [--color]
+"""
+import json
+import logging
+import os
+import struct
+from typing import Dict, List, Optional, Tuple, Union
+import cv2
+import numpy as np
+from .catalog import get_catalog
+
+PACK_MAGIC = b"BIOPACK1"
+PACK_SUFFIX = ".pack"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+_HEADER = struct.Struct("<8sQ")
+_ALIGN = 64
+
+
+def is_pack(path: str) -> bool:
+    return path.lower().endswith(PACK_SUFFIX) and os.path.isfile(path)
+
+
+def folder_items(folder: str) -> List[Tuple[str, str]]:
+    """(relative name, label) for a folder with class sub-folders, or a flat folder of '<label>_*' files."""
+    return [(os.path.relpath(path, folder).replace(os.sep, "/"), label)
+            for path, label in get_catalog().items(folder, IMAGE_EXTENSIONS)]
+
+
+def pack_folder(folder: str, out_path: str, size: Optional[Tuple[int, int]] = None, color: bool = False) -> int:
+    """Decode every image under folder into a pack at out_path; returns the number packed.
+
+    Unreadable images are skipped with a warning. size is (width, height) as for cv2.resize.
+    """
+    flag = cv2.IMREAD_COLOR if color else cv2.IMREAD_GRAYSCALE
+    entries = []
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(PACK_MAGIC, 0))
+        for name, label in folder_items(folder):
+            img = cv2.imread(os.path.join(folder, name), flag)
+            if img is None:
+                logging.warning(f"Could not read image: {os.path.join(folder, name)}")
+                continue
+            if size:
+                img = cv2.resize(img, size)
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            entries.append([name, label, f.tell(), list(img.shape)])
+            f.write(np.ascontiguousarray(img).tobytes())
+        index_offset = f.tell()
+        f.write(json.dumps({"source": os.path.abspath(folder), "color": color, "entries": entries}).encode())
+        f.seek(0)
+        f.write(_HEADER.pack(PACK_MAGIC, index_offset))
+    os.replace(tmp_path, out_path)
+    logging.info(f"[OK] Packed {len(entries)} images from {folder} into {out_path}")
+    return len(entries)
+
+
+class ImagePack:
+    """Read-only, memory-mapped view of a pack file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, index_offset = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{path} is not an image pack")
+        self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        index = json.loads(self._data[index_offset:].tobytes())
+        self.source: str = index["source"]
+        self.color: bool = index["color"]
+        self._entries = index["entries"]
+        self.names: List[str] = [e[0] for e in self._entries]
+        self.labels: List[str] = [e[1] for e in self._entries]
+        self._by_name: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[str, str]]:
+        """(name, label) pairs, in pack order."""
+        return list(zip(self.names, self.labels))
+
+    def image(self, key: Union[int, str]) -> np.ndarray:
+        """Zero-copy view of an image by position or name."""
+        _, _, offset, shape = self._entries[self._by_name[key] if isinstance(key, str) else key]
+        count = int(np.prod(shape))
+        return self._data[offset:offset + count].reshape(shape)
+
+    def gray(self, key: Union[int, str]) -> np.ndarray:
+        """Image as grayscale: the stored view, or a converted copy for packs built with color=True."""
+        img = self.image(key)
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+    def source_path(self, name: str) -> str:
+        """Path the image had in the folder the pack was built from."""
+        return os.path.join(self.source, name)
+
+
+if __name__ == "__main__":
+    import argparse
+    from .utils import setup_logging
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Pack a dataset folder into one memory-mappable file")
+    parser.add_argument("folder")
+    parser.add_argument("out")
+    parser.add_argument("--size", type=int, default=None, help="resize to SIZE x SIZE pixels")
+    parser.add_argument("--color", action="store_true", help="keep BGR colour (default: grayscale)")
+    args = parser.parse_args()
+    pack_folder(args.folder, args.out, (args.size, args.size) if args.size else None, args.color)
@@ -0,0 +1,278 @@
+"""
+biometrics/metrics.py
+In-process metrics registry (counters, gauges, latency histograms) for the matching pipeline.
+
+Matching code records into the module-level REGISTRY; a JSON snapshot is written to
+METRICS_FILE so research scripts can read the numbers back without scraping text files.
+The write happens off the request path: a finished run schedules one save within
+METRICS_SAVE_SECONDS (runs in between share it), and anything pending is saved at exit.
+Both Prometheus text and JSON exports are available.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Set, Tuple, Iterator
+from .config import METRICS_FILE, METRICS_SAVE_SECONDS
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, Any]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _format_le(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, Any] = {}
+
+    def samples(self) -> Dict[LabelKey, Any]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def get(self, default: float = 0.0, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), default)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(set(buckets) | {math.inf}))
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Dict[LabelKey, Any]:
+        with self._lock:
+            return {k: {"counts": list(v["counts"]), "sum": v["sum"], "count": v["count"]} for k, v in self._values.items()}
+
+
+class MetricsRegistry:
+    """Named collection of metrics with Prometheus text and JSON exporters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in metric.samples().items():
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value["counts"]):
+                        cumulative += count
+                        lines.append(f"{metric.name}_bucket{_format_labels(key, {'le': _format_le(bound)})} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(key)} {value['sum']}")
+                    lines.append(f"{metric.name}_count{_format_labels(key)} {value['count']}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot of all metrics."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {}
+        for metric in metrics:
+            entry = {"type": metric.kind, "help": metric.help, "samples": []}
+            if isinstance(metric, Histogram):
+                entry["buckets"] = [_format_le(b) for b in metric.buckets]
+            for key, value in metric.samples().items():
+                entry["samples"].append({"labels": dict(key), "value": value})
+            snapshot[metric.name] = entry
+        return snapshot
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def save(self, path: Optional[str] = None):
+        """Write the JSON snapshot (to METRICS_FILE by default) atomically so readers never see a partial file.
+
+        Samples already in the file whose labels this process has not recorded are
+        kept, so face and fingerprint runs in separate processes share one snapshot.
+        """
+        path = METRICS_FILE if path is None else path
+        snapshot = self.to_dict()
+        for name, entry in load_snapshot(path).items():
+            if name not in snapshot:
+                snapshot[name] = entry
+                continue
+            current = snapshot[name]
+            seen = {_label_key(sample["labels"]) for sample in current["samples"]}
+            current["samples"].extend(s for s in entry["samples"] if _label_key(s["labels"]) not in seen)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Per-writer temp file: concurrent reports in one process must not share it.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram("biometrics_stage_seconds", "Latency of pipeline stages (decode, extract, score, report)")
+COMPARISONS = REGISTRY.counter("biometrics_comparisons_total", "Gallery comparisons by outcome")
+BEST_MATCH_ACCURACY = REGISTRY.gauge("biometrics_best_match_accuracy_percent", "Confidence of the best match in the last run")
+RECALL_TIME = REGISTRY.gauge("biometrics_recall_time_seconds", "Wall time of the last gallery scan")
+F1_SCORE = REGISTRY.gauge("biometrics_f1_score", "F1 score derived from the last best match")
+
+
+_pending_saves: Set[str] = set()
+_pending_lock = threading.Lock()
+_save_timer: Optional[threading.Timer] = None
+
+
+def flush_metrics():
+    """Write the snapshots scheduled by record_run now; also runs at interpreter exit."""
+    global _save_timer
+    with _pending_lock:
+        paths = sorted(_pending_saves)
+        _pending_saves.clear()
+        _save_timer = None
+    for path in paths:
+        REGISTRY.save(path)
+
+
+atexit.register(flush_metrics)
+
+
+def record_run(modality: str, accuracy: float, recall_time: float, f1_score: float, path: Optional[str] = None):
+    """Record the summary of a finished scan and schedule a snapshot save.
+
+    The snapshot goes to path (METRICS_FILE by default; "" skips it) within
+    METRICS_SAVE_SECONDS, on a timer thread rather than the caller's.
+    """
+    global _save_timer
+    BEST_MATCH_ACCURACY.set(accuracy, modality=modality)
+    RECALL_TIME.set(recall_time, modality=modality)
+    F1_SCORE.set(f1_score, modality=modality)
+    path = METRICS_FILE if path is None else path
+    if not path:
+        return
+    if METRICS_SAVE_SECONDS <= 0:
+        REGISTRY.save(path)
+        return
+    with _pending_lock:
+        _pending_saves.add(path)
+        if _save_timer is None:
+            _save_timer = threading.Timer(METRICS_SAVE_SECONDS, flush_metrics)
+            _save_timer.daemon = True
+            _save_timer.start()
+
+
+def load_snapshot(path: Optional[str] = None) -> Dict[str, Any]:
+    """Read a JSON snapshot written by MetricsRegistry.save (METRICS_FILE by default); missing files give an empty snapshot."""
+    path = METRICS_FILE if path is None else path
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _snapshot_value(snapshot: Dict[str, Any], name: str, modality: str) -> float:
+    for sample in snapshot.get(name, {}).get("samples", []):
+        if sample["labels"].get("modality") == modality:
+            return sample["value"]
+    return 0
+
+
+def summary_metrics(modality: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """Return {accuracy, recall_time, f1_score} of the last run for 'face' or 'fingerprint'."""
+    snapshot = load_snapshot(path)
+    return {
+        "accuracy": _snapshot_value(snapshot, BEST_MATCH_ACCURACY.name, modality),
+        "recall_time": _snapshot_value(snapshot, RECALL_TIME.name, modality),
+        "f1_score": _snapshot_value(snapshot, F1_SCORE.name, modality),
+    }
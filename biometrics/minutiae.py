@@ -0,0 +1,221 @@
+"""
+biometrics/minutiae.py
+Minutiae extraction and a geometric-hashing index for sublinear 1:N fingerprint identification.
+
+Extraction binarises the print, thins ridges to one pixel and finds ridge endings
+(crossing number 1) and bifurcations (crossing number 3) with their local ridge
+orientation. Every minutia is joined with its nearest neighbours into triangles
+whose side lengths and vertex-relative angles do not change under rotation or
+translation. Those quantised triangle keys go into an inverted index, so a probe
+only votes for templates that share keys with it instead of scanning all of them.
+The index is saved as flat arrays in one .npz file (keys, bucket offsets, template ids).
+"""
+import logging
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Tuple
+import cv2
+import numpy as np
+from skimage.morphology import skeletonize
+from .config import MINUTIAE_NEIGHBOURS, MINUTIAE_LENGTH_BIN, MINUTIAE_ANGLE_BINS
+from .parallel import parallel_map
+from .metrics import STAGE_SECONDS
+from .tracing import span
+from .catalog import get_catalog
+
+MINUTIAE_IMAGE_SIZE = (192, 192)
+ENDING, BIFURCATION = 1, 3
+_MIN_SEPARATION = 6
+# Triangle key: three side-length bins, then (relative angle bin, minutia type) per vertex
+_KEY_WIDTH = 9
+_BORDER = 10
+
+# Neighbour offsets in circular order, used by the crossing number.
+_RING = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+
+def _orientation_field(img: np.ndarray) -> np.ndarray:
+    gx = cv2.Sobel(img, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(img, cv2.CV_32F, 0, 1, ksize=3)
+    gxx = cv2.GaussianBlur(gx * gx, (15, 15), 4)
+    gyy = cv2.GaussianBlur(gy * gy, (15, 15), 4)
+    gxy = cv2.GaussianBlur(gx * gy, (15, 15), 4)
+    # Ridges run perpendicular to the dominant gradient.
+    return (0.5 * np.arctan2(2 * gxy, gxx - gyy) + np.pi / 2) % np.pi
+
+
+def _foreground_mask(img: np.ndarray) -> np.ndarray:
+    img = img.astype(np.float32)
+    mean = cv2.blur(img, (16, 16))
+    variance = cv2.blur(img * img, (16, 16)) - mean * mean
+    mask = (variance > 0.1 * variance.max()).astype(np.uint8)
+    return cv2.erode(mask, np.ones((9, 9), np.uint8)) > 0
+
+
+def _crossing_numbers(skeleton: np.ndarray) -> np.ndarray:
+    padded = np.pad(skeleton.astype(np.int8), 1)
+    h, w = skeleton.shape
+    ring = [padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w] for dy, dx in _RING]
+    return sum(np.abs(ring[i] - ring[(i + 1) % 8]) for i in range(8)) // 2
+
+
+def _thin_out(points: np.ndarray) -> np.ndarray:
+    """Drop minutiae closer than _MIN_SEPARATION to one already kept (broken-ridge noise)."""
+    kept = []
+    for point in points:
+        if all(np.hypot(point[0] - k[0], point[1] - k[1]) >= _MIN_SEPARATION for k in kept):
+            kept.append(point)
+    return np.array(kept, dtype=np.float32).reshape(-1, 4)
+
+
+def extract_minutiae(img: np.ndarray) -> np.ndarray:
+    """Return an (n, 4) array of [x, y, orientation, type] for a grayscale print."""
+    img = cv2.equalizeHist(cv2.resize(img, MINUTIAE_IMAGE_SIZE))
+    blurred = cv2.GaussianBlur(img, (5, 5), 0)
+    ridges = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 15, 2) > 0
+    mask = _foreground_mask(img)
+    skeleton = skeletonize(ridges & mask)
+    crossing = _crossing_numbers(skeleton)
+    inner = np.zeros_like(mask)
+    inner[_BORDER:-_BORDER, _BORDER:-_BORDER] = True
+    candidates = skeleton & mask & inner & ((crossing == ENDING) | (crossing == BIFURCATION))
+    ys, xs = np.nonzero(candidates)
+    orientation = _orientation_field(blurred)
+    points = np.stack([xs, ys, orientation[ys, xs], crossing[ys, xs]], axis=1).astype(np.float32)
+    return _thin_out(points)
+
+
+def extract_minutiae_from_path(image_path: str) -> np.ndarray:
+    with STAGE_SECONDS.time(stage="decode", modality="fingerprint"), span("fingerprint.decode"):
+        img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise ValueError(f"Unable to load image: {image_path}")
+    with STAGE_SECONDS.time(stage="extract", modality="fingerprint"), span("fingerprint.extract", engine="minutiae"):
+        return extract_minutiae(img)
+
+
+def _triangle_key(minutiae: np.ndarray, vertices: Tuple[int, int, int]) -> Tuple:
+    pts = minutiae[list(vertices), :2]
+    # Vertex i is opposite side i; ordering vertices by opposite side length is rotation invariant.
+    sides = np.array([np.linalg.norm(pts[1] - pts[2]), np.linalg.norm(pts[0] - pts[2]), np.linalg.norm(pts[0] - pts[1])])
+    order = np.argsort(sides)
+    key = [int(sides[i] // MINUTIAE_LENGTH_BIN) for i in order]
+    for position, i in enumerate(order):
+        nxt = order[(position + 1) % 3]
+        dx, dy = pts[nxt] - pts[i]
+        relative = (minutiae[vertices[i], 2] - np.arctan2(dy, dx)) % np.pi
+        key.append(int(relative / np.pi * MINUTIAE_ANGLE_BINS) % MINUTIAE_ANGLE_BINS)
+        key.append(int(minutiae[vertices[i], 3]))
+    return tuple(key)
+
+
+def triplet_keys(minutiae: np.ndarray, neighbours: int = MINUTIAE_NEIGHBOURS) -> List[Tuple]:
+    """Invariant keys for triangles formed by each minutia and pairs of its nearest neighbours."""
+    if len(minutiae) < 3:
+        return []
+    xy = minutiae[:, :2]
+    distances = np.linalg.norm(xy[:, None, :] - xy[None, :, :], axis=-1)
+    nearest = np.argsort(distances, axis=1)[:, 1:neighbours + 1]
+    triangles = set()
+    for i, row in enumerate(nearest):
+        for j, k in combinations(row, 2):
+            triangles.add(tuple(sorted((i, int(j), int(k)))))
+    return [_triangle_key(minutiae, t) for t in sorted(triangles)]
+
+
+def _template_keys(path):
+    try:
+        return triplet_keys(extract_minutiae_from_path(path))
+    except Exception as e:
+        logging.error(f"Skipping {path}: {e}")
+        return None
+
+
+class MinutiaeIndex:
+    """Inverted index from triangle keys to the templates that contain them."""
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.key_counts: List[int] = []
+        self.postings: Dict[Tuple, List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def add(self, path: str, keys: List[Tuple]) -> int:
+        template_id = len(self.paths)
+        keys = set(keys)
+        self.paths.append(path)
+        # Votes count distinct shared keys, so scores are normalised by distinct keys too
+        self.key_counts.append(len(keys))
+        for key in keys:
+            self.postings[key].append(template_id)
+        return template_id
+
+    def remove(self, path: str):
+        """Drop a template, compacting the buckets and renumbering later templates; raises KeyError if absent."""
+        try:
+            removed = self.paths.index(path)
+        except ValueError:
+            raise KeyError(path) from None
+        del self.paths[removed]
+        del self.key_counts[removed]
+        for key in list(self.postings):
+            ids = [tid - (tid > removed) for tid in self.postings[key] if tid != removed]
+            if ids:
+                self.postings[key] = ids
+            else:
+                del self.postings[key]
+
+    @classmethod
+    def build(cls, dataset_path: str, parallel: bool = True, max_workers: int = 4) -> "MinutiaeIndex":
+        index = cls()
+        paths = get_catalog().files(dataset_path, (".bmp",))
+        with span("gallery.build", engine="minutiae", size=len(paths)):
+            if parallel:
+                all_keys = parallel_map(_template_keys, paths, max_workers=max_workers)
+            else:
+                all_keys = [_template_keys(p) for p in paths]
+        for path, keys in zip(paths, all_keys):
+            if keys is not None:
+                index.add(path, keys)
+        logging.info(f"[OK] Minutiae index of {len(index)} templates, {len(index.postings)} distinct keys")
+        return index
+
+    def query(self, keys: List[Tuple], top_k: int = 5) -> List[Tuple[str, float]]:
+        """Vote over templates sharing keys with the probe; score is votes / sqrt(probe_keys * template_keys),
+        counting distinct keys throughout."""
+        with STAGE_SECONDS.time(stage="score", modality="fingerprint"), span("minutiae.query", keys=len(keys)):
+            keys = set(keys)
+            votes = defaultdict(int)
+            for key in keys:
+                for template_id in self.postings.get(key, ()):
+                    votes[template_id] += 1
+            if not votes:
+                return []
+            scored = [(tid, count / np.sqrt(len(keys) * max(self.key_counts[tid], 1))) for tid, count in votes.items()]
+        scored.sort(key=lambda item: -item[1])
+        return [(self.paths[tid], float(score)) for tid, score in scored[:top_k]]
+
+    def query_image(self, image_path: str, top_k: int = 5) -> List[Tuple[str, float]]:
+        return self.query(triplet_keys(extract_minutiae_from_path(image_path)), top_k)
+
+    def save(self, path: str):
+        """Persist the index as arrays in one .npz file (np.savez adds the suffix if missing)."""
+        keys = list(self.postings)
+        sizes = [len(self.postings[key]) for key in keys]
+        np.savez(path, paths=np.array(self.paths, dtype=str), key_counts=np.array(self.key_counts, dtype=np.int32),
+                 keys=np.array(keys, dtype=np.int32).reshape(len(keys), _KEY_WIDTH),
+                 offsets=np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64),
+                 ids=np.array([tid for key in keys for tid in self.postings[key]], dtype=np.int32))
+
+    @classmethod
+    def load(cls, path: str) -> "MinutiaeIndex":
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            index.paths = [str(p) for p in data["paths"]]
+            index.key_counts = data["key_counts"].tolist()
+            offsets, ids = data["offsets"], data["ids"].tolist()
+            for row, key in enumerate(data["keys"].tolist()):
+                index.postings[tuple(key)] = ids[offsets[row]:offsets[row + 1]]
+        return index
@@ -0,0 +1,98 @@
+"""
+biometrics/neighbors.py
+k-nearest-neighbour classifier with optional PCA/whitening and explicit search backends.
+
+The face KNN used to run sklearn defaults on raw 2048-d ResNet50 features. ProjectedKNN
+first projects onto n_components principal axes (biometrics/projection.py), storing the
+training set as float32 in the reduced space. Neighbours are then found either by
+blocked brute force, with squared distances computed one block of queries at a time
+through a single GEMM, or by a ball tree. Which one wins depends on the data (ball
+trees degrade quickly with dimension), so facefingerdev.py picks one by
+cross-validated accuracy and latency (biometrics/evaluation.py). partial_fit appends
+newly enrolled samples, new identities included, to a fitted index in place of a retrain.
+"""
+from typing import Optional
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.neighbors import BallTree
+from .projection import PCAProjection
+
+BACKENDS = ("brute", "ball_tree")
+# Distance block held per query batch in brute-force search, in float32 entries (64 MB)
+BRUTE_BLOCK_ENTRIES = 1 << 24
+
+
+class ProjectedKNN(ClassifierMixin, BaseEstimator):
+    """Uniform-vote KNN; n_components=None searches the raw features."""
+
+    def __init__(self, n_neighbors: int = 3, n_components: Optional[int] = None, whiten: bool = False,
+                 backend: str = "brute", leaf_size: int = 40):
+        self.n_neighbors = n_neighbors
+        self.n_components = n_components
+        self.whiten = whiten
+        self.backend = backend
+        self.leaf_size = leaf_size
+
+    def _project(self, X) -> np.ndarray:
+        if self.projection_ is None:
+            return np.asarray(X, dtype=np.float32)
+        return self.projection_.transform(X)
+
+    def fit(self, X, y) -> "ProjectedKNN":
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown neighbour backend '{self.backend}'; expected one of {BACKENDS}")
+        X = np.asarray(X, dtype=np.float32)
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        self.projection_ = PCAProjection.fit(X, self.n_components, self.whiten) if self.n_components else None
+        self._fit_X = np.ascontiguousarray(self._project(X))
+        if self.backend == "ball_tree":
+            self.tree_ = BallTree(self._fit_X, leaf_size=self.leaf_size)
+        else:
+            self.tree_ = None
+            self._fit_norms = np.einsum("ij,ij->i", self._fit_X, self._fit_X)
+        return self
+
+    def partial_fit(self, X, y) -> "ProjectedKNN":
+        """Add samples, including ones of new classes, to a fitted index without refitting the projection.
+
+        The brute backend only appends the projected rows. The ball-tree backend rebuilds its
+        tree over every projected row, which costs as much as the indexing step of a fit.
+        """
+        if not hasattr(self, "_fit_X"):
+            return self.fit(X, y)
+        y = np.asarray(y)
+        classes = np.union1d(self.classes_, y)
+        # Class codes follow sorted order, so existing codes move when a new label sorts before them
+        self._y = np.concatenate([np.searchsorted(classes, self.classes_)[self._y], np.searchsorted(classes, y)])
+        self.classes_ = classes
+        new = np.ascontiguousarray(self._project(X))
+        self._fit_X = np.concatenate([self._fit_X, new])
+        if self.tree_ is not None:
+            self.tree_ = BallTree(self._fit_X, leaf_size=self.leaf_size)
+        else:
+            self._fit_norms = np.concatenate([self._fit_norms, np.einsum("ij,ij->i", new, new)])
+        return self
+
+    def kneighbors(self, X) -> np.ndarray:
+        """Indices of the n_neighbors closest training rows for each query row."""
+        queries = self._project(X)
+        k = min(self.n_neighbors, len(self._fit_X))
+        if self.tree_ is not None:
+            return self.tree_.query(queries, k=k, return_distance=False)
+        neighbours = np.empty((len(queries), k), dtype=np.intp)
+        block = max(1, BRUTE_BLOCK_ENTRIES // max(len(self._fit_X), 1))
+        for start in range(0, len(queries), block):
+            q = queries[start:start + block]
+            # |q - x|^2 without the |q|^2 term, which does not change the ranking per query
+            distances = self._fit_norms - 2 * (q @ self._fit_X.T)
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1)
+            neighbours[start:start + len(q)] = np.take_along_axis(nearest, order, axis=1)
+        return neighbours
+
+    def predict(self, X) -> np.ndarray:
+        votes = self._y[self.kneighbors(X)]
+        counts = np.zeros((len(votes), len(self.classes_)), dtype=np.int32)
+        np.add.at(counts, (np.arange(len(votes))[:, None], votes), 1)
+        # Ties go to the first class in sorted order, as with sklearn's KNeighborsClassifier
+        return self.classes_[counts.argmax(axis=1)]
@@ -2,15 +2,39 @@
 biometrics/parallel.py
 Parallelization utilities for biometrics processing.
 """
+import asyncio
+import contextvars
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, List, Any
+from typing import Callable, List, Any, Optional
 import logging
+from .budget import get_thread_budget
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor used by the async matching APIs."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(max_workers=get_thread_budget()["workers"],
+                                                  thread_name_prefix="biometrics")
+        return _shared_executor
+
 
 def parallel_map(func: Callable, items: List[Any], max_workers: int = 4) -> List[Any]:
-    """Run func on items in parallel and return results as a list."""
+    """Run func on items in parallel and return results as a list.
+
+    max_workers is capped by the thread budget so library pools are not oversubscribed.
+    """
+    max_workers = max(1, min(max_workers, get_thread_budget()["workers"]))
     results = [None] * len(items)
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_idx = {executor.submit(func, item): idx for idx, item in enumerate(items)}
+        # Each task runs in a copy of the caller's context so tracing spans nest under the caller.
+        future_to_idx = {executor.submit(contextvars.copy_context().run, func, item): idx
+                         for idx, item in enumerate(items)}
         for future in as_completed(future_to_idx):
             idx = future_to_idx[future]
             try:
@@ -19,3 +43,31 @@ def parallel_map(func: Callable, items: List[Any], max_workers: int = 4) -> List
                 logging.error(f"Parallel task failed: {e}")
                 results[idx] = None
     return results
+
+
+async def parallel_map_async(func: Callable, items: List[Any], executor: Optional[ThreadPoolExecutor] = None) -> List[Any]:
+    """Awaitable parallel_map on the shared executor.
+
+    Cancelling the awaiting task cancels every item that has not started yet.
+    """
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = get_shared_executor()
+    futures = [loop.run_in_executor(executor, contextvars.copy_context().run, func, item) for item in items]
+    outcomes = await asyncio.gather(*futures, return_exceptions=True)
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            logging.error(f"Parallel task failed: {outcome}")
+            results.append(None)
+        else:
+            results.append(outcome)
+    return results
+
+
+async def run_async(func: Callable, *args: Any, executor: Optional[ThreadPoolExecutor] = None) -> Any:
+    """Run a blocking call on the shared executor and await its result."""
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = get_shared_executor()
+    return await loop.run_in_executor(executor, contextvars.copy_context().run, func, *args)
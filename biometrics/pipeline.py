@@ -0,0 +1,177 @@
+"""
+biometrics/pipeline.py
+Staged image pipeline: reader threads decode ahead, compute workers extract, the caller writes.
+
+    items -> [readers: decode] -> decoded queue -> [workers: compute] -> results queue -> writer
+
+Both queues are bounded, so memory stays flat and a slow stage applies back-pressure.
+Queue fill is sampled on every take into biometrics_pipeline_queue_fill: a decoded queue
+that sits full means compute is the bottleneck, one that sits empty means the readers
+(disk/decode) are. Results reach the writer in input order. An exception raised by
+the items iterable itself stops every stage and is re-raised to the caller.
+"""
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from .config import PIPELINE_READERS, PIPELINE_QUEUE_SIZE
+from .budget import get_thread_budget
+from .metrics import REGISTRY
+
+QUEUE_FILL = REGISTRY.histogram("biometrics_pipeline_queue_fill", "Fill fraction of pipeline queues, sampled on each take",
+                                buckets=(0.0, 0.25, 0.5, 0.75, 1.0))
+QUEUE_DEPTH = REGISTRY.gauge("biometrics_pipeline_queue_depth", "Items waiting in each pipeline queue")
+
+_DONE = object()
+
+
+def _start(target: Callable, name: str) -> threading.Thread:
+    # Every stage thread gets its own copy of the caller's context so spans nest under it.
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+class Pipeline:
+    """decode(item) on reader threads, compute(decoded) on worker threads, results in order.
+
+    Items whose decode or compute raises (or returns None) yield None.
+    """
+
+    def __init__(self, decode: Callable[[Any], Any], compute: Callable[[Any], Any], readers: int = PIPELINE_READERS,
+                 workers: Optional[int] = None, queue_size: int = PIPELINE_QUEUE_SIZE, name: str = "pipeline"):
+        self.decode = decode
+        self.compute = compute
+        self.readers = max(1, readers)
+        # Compute workers are capped by the thread budget, like parallel_map; readers mostly wait on I/O.
+        budget = get_thread_budget()["workers"]
+        self.workers = max(1, min(workers or budget, budget))
+        self.queue_size = queue_size
+        self.name = name
+        self.occupancy: Dict[str, float] = {}
+
+    def _sample(self, q: queue.Queue, label: str, fills: List[float]):
+        fill = q.qsize() / q.maxsize
+        fills.append(fill)
+        QUEUE_FILL.observe(fill, pipeline=self.name, queue=label)
+        QUEUE_DEPTH.set(q.qsize(), pipeline=self.name, queue=label)
+
+    def run(self, items: Iterable[Any], sink: Callable[[Any, Any], None]) -> int:
+        """Feed items through the stages and call sink(item, result) in input order for each success.
+
+        Returns the number of successful items. An exception from sink or from iterating items
+        stops the stages and propagates.
+        """
+        return self._run(items, lambda index, item, result: sink(item, result))
+
+    def map(self, items: Iterable[Any]) -> List[Any]:
+        """Results for every item in input order, None where decode or compute failed."""
+        items = list(items)
+        out: List[Any] = [None] * len(items)
+        self._run(items, lambda index, item, result: out.__setitem__(index, result))
+        return out
+
+    def _run(self, items: Iterable[Any], sink: Callable[[int, Any, Any], None]) -> int:
+        source = iter(enumerate(items))
+        source_lock = threading.Lock()
+        decoded: queue.Queue = queue.Queue(self.queue_size)
+        results: queue.Queue = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        readers_left = [self.readers]
+        failures: List[BaseException] = []
+        decoded_fills: List[float] = []
+        result_fills: List[float] = []
+
+        def put(q: queue.Queue, entry) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read():
+            try:
+                while not stop.is_set():
+                    with source_lock:
+                        entry = next(source, None)
+                    if entry is None:
+                        break
+                    index, item = entry
+                    try:
+                        value = self.decode(item)
+                    except Exception as e:
+                        logging.error(f"Skipping {item}: {e}")
+                        value = None
+                    if not put(decoded, (index, item, value)):
+                        return
+            except BaseException as e:
+                # The items iterable failed: nothing more can be read, so the writer raises it.
+                failures.append(e)
+                stop.set()
+                return
+            with source_lock:
+                readers_left[0] -= 1
+                last = readers_left[0] == 0
+            if last:
+                for _ in range(self.workers):
+                    put(decoded, _DONE)
+
+        def work():
+            while True:
+                try:
+                    entry = decoded.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return
+                    continue
+                self._sample(decoded, "decoded", decoded_fills)
+                if entry is _DONE:
+                    put(results, _DONE)
+                    return
+                index, item, value = entry
+                result = None
+                if value is not None:
+                    try:
+                        result = self.compute(value)
+                    except Exception as e:
+                        logging.error(f"Skipping {item}: {e}")
+                if not put(results, (index, item, result)):
+                    return
+
+        threads = [_start(read, f"{self.name}-reader-{i}") for i in range(self.readers)]
+        threads += [_start(work, f"{self.name}-worker-{i}") for i in range(self.workers)]
+        pending: Dict[int, tuple] = {}
+        next_index = 0
+        finished = 0
+        written = 0
+        try:
+            while finished < self.workers:
+                try:
+                    entry = results.get(timeout=0.1)
+                except queue.Empty:
+                    if failures:
+                        raise failures[0]
+                    continue
+                self._sample(results, "results", result_fills)
+                if entry is _DONE:
+                    finished += 1
+                    continue
+                pending[entry[0]] = entry
+                while next_index in pending:
+                    _, item, result = pending.pop(next_index)
+                    if result is not None:
+                        sink(next_index, item, result)
+                        written += 1
+                    next_index += 1
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            self.occupancy = {
+                "decoded": sum(decoded_fills) / len(decoded_fills) if decoded_fills else 0.0,
+                "results": sum(result_fills) / len(result_fills) if result_fills else 0.0,
+            }
+        return written
@@ -0,0 +1,85 @@
+"""
+biometrics/projection.py
+Learned (PCA) or data-independent (Gaussian random) projections for compressing HOG templates.
+
+A projection is fitted once on a gallery, applied to every template before storage
+and to every probe before search, and saved as plain arrays alongside the gallery.
+"""
+import numpy as np
+from typing import Dict
+
+
+class PCAProjection:
+    """Principal components of the gallery, optionally whitened."""
+    method = "pca"
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, scale: np.ndarray):
+        self.mean = mean.astype(np.float32)
+        self.components = components.astype(np.float32)
+        self.scale = scale.astype(np.float32)
+
+    @classmethod
+    def fit(cls, matrix: np.ndarray, n_components: int = 256, whiten: bool = False) -> "PCAProjection":
+        matrix = np.asarray(matrix, dtype=np.float32)
+        n_components = min(n_components, matrix.shape[0], matrix.shape[1])
+        mean = matrix.mean(axis=0)
+        # Economy SVD of the centred data; rows of vt are the principal axes.
+        _, singular, vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        components = vt[:n_components]
+        if whiten:
+            std = singular[:n_components] / np.sqrt(max(len(matrix) - 1, 1))
+            scale = 1.0 / np.maximum(std, 1e-6)
+        else:
+            scale = np.ones(n_components)
+        return cls(mean, components, scale)
+
+    @property
+    def n_components(self) -> int:
+        return self.components.shape[0]
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        return ((np.asarray(x, dtype=np.float32) - self.mean) @ self.components.T) * self.scale
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"mean": self.mean, "components": self.components, "scale": self.scale}
+
+
+class RandomProjection:
+    """Gaussian random projection (Johnson-Lindenstrauss); needs no fitting data."""
+    method = "random"
+
+    def __init__(self, components: np.ndarray):
+        self.components = components.astype(np.float32)
+
+    @classmethod
+    def fit(cls, matrix: np.ndarray, n_components: int = 256, seed: int = 0) -> "RandomProjection":
+        dims = np.asarray(matrix).shape[1]
+        rng = np.random.default_rng(seed)
+        return cls(rng.standard_normal((n_components, dims)) / np.sqrt(n_components))
+
+    @property
+    def n_components(self) -> int:
+        return self.components.shape[0]
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        return np.asarray(x, dtype=np.float32) @ self.components.T
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"components": self.components}
+
+
+PROJECTIONS = {"pca": PCAProjection, "random": RandomProjection}
+
+
+def fit_projection(matrix: np.ndarray, method: str = "pca", n_components: int = 256, **kwargs):
+    if method not in PROJECTIONS:
+        raise ValueError(f"Unknown projection '{method}'. Choose from: {', '.join(PROJECTIONS)}")
+    return PROJECTIONS[method].fit(matrix, n_components=n_components, **kwargs)
+
+
+def projection_from_arrays(method: str, arrays: Dict[str, np.ndarray]):
+    if method == "pca":
+        return PCAProjection(arrays["mean"], arrays["components"], arrays["scale"])
+    if method == "random":
+        return RandomProjection(arrays["components"])
+    raise ValueError(f"Unknown projection '{method}'")
@@ -0,0 +1,149 @@
+"""
+biometrics/reload.py
+Double-buffered reload of search structures (FingerprintGallery, CascadeGallery, MinutiaeIndex).
+
+A LiveGallery holds the version currently served. reload() builds and validates a new
+version off to the side and then swaps it in under a lock, so matching never stops.
+Searches pin the version they started on; a retired version is released (close() called
+if it has one, references dropped) once its last in-flight search finishes.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+from .parallel import get_shared_executor
+from .metrics import REGISTRY
+
+RELOADS = REGISTRY.counter("biometrics_gallery_reloads_total", "Gallery reloads by outcome (swapped, rejected, failed)")
+LIVE_VERSIONS = REGISTRY.gauge("biometrics_gallery_live_versions", "Gallery versions held in memory (serving plus draining)")
+
+
+def require_nonempty(gallery: Any):
+    """Default validation: refuse to swap in an empty gallery."""
+    if len(gallery) == 0:
+        raise ValueError("New gallery is empty")
+
+
+class _Version:
+    def __init__(self, gallery: Any, number: int):
+        self.gallery = gallery
+        self.number = number
+        self.refs = 0
+        self.retired = False
+
+
+class LiveGallery:
+    """Serves one gallery version at a time and swaps in rebuilt versions atomically."""
+
+    def __init__(self, loader: Callable[[], Any], validate: Optional[Callable[[Any], None]] = require_nonempty, name: str = "fingerprint"):
+        self.loader = loader
+        self.validate = validate
+        self.name = name
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._live = 0
+        self._current = self._admit(self._build(loader), 1)
+        self._stop: Optional[threading.Event] = None
+
+    def _build(self, loader: Callable[[], Any]) -> Any:
+        gallery = loader()
+        if self.validate:
+            self.validate(gallery)
+        return gallery
+
+    def _admit(self, gallery: Any, number: int) -> _Version:
+        with self._lock:
+            self._live += 1
+            LIVE_VERSIONS.set(self._live, gallery=self.name)
+        return _Version(gallery, number)
+
+    def _release(self, version: _Version):
+        # Called with self._lock held once a retired version has no readers left.
+        close = getattr(version.gallery, "close", None)
+        if callable(close):
+            close()
+        version.gallery = None
+        self._live -= 1
+        LIVE_VERSIONS.set(self._live, gallery=self.name)
+        logging.info(f"[OK] {self.name} gallery v{version.number} released")
+
+    @property
+    def version(self) -> int:
+        """Number of the version new searches run on; starts at 1 and grows by one per swap."""
+        return self._current.number
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Pin the current version for the duration of the block."""
+        with self._lock:
+            version = self._current
+            version.refs += 1
+        try:
+            yield version.gallery
+        finally:
+            with self._lock:
+                version.refs -= 1
+                if version.retired and version.refs == 0:
+                    self._release(version)
+
+    def search(self, *args, **kwargs):
+        with self.acquire() as gallery:
+            return gallery.search(*args, **kwargs)
+
+    def search_image(self, *args, **kwargs):
+        with self.acquire() as gallery:
+            return gallery.search_image(*args, **kwargs)
+
+    def query_image(self, *args, **kwargs):
+        """MinutiaeIndex lookups."""
+        with self.acquire() as gallery:
+            return gallery.query_image(*args, **kwargs)
+
+    def reload(self, loader: Optional[Callable[[], Any]] = None) -> bool:
+        """Build, validate and swap in a new version; the old one keeps serving on failure.
+
+        Returns True when the new version was swapped in. Concurrent reloads are serialised.
+        """
+        with self._reload_lock:
+            start = time.time()
+            try:
+                gallery = self._build(loader or self.loader)
+            except ValueError as e:
+                logging.error(f"[ERROR] {self.name} gallery reload rejected: {e}")
+                RELOADS.inc(gallery=self.name, outcome="rejected")
+                return False
+            except Exception as e:
+                logging.error(f"[ERROR] {self.name} gallery reload failed: {e}")
+                RELOADS.inc(gallery=self.name, outcome="failed")
+                return False
+            new = self._admit(gallery, self._current.number + 1)
+            with self._lock:
+                old, self._current = self._current, new
+                old.retired = True
+                if old.refs == 0:
+                    self._release(old)
+            RELOADS.inc(gallery=self.name, outcome="swapped")
+            logging.info(f"[OK] {self.name} gallery v{new.number} swapped in after {time.time() - start:.2f}s")
+            return True
+
+    def reload_async(self, loader: Optional[Callable[[], Any]] = None) -> Future:
+        """reload() on the shared executor; the future resolves to its return value."""
+        return get_shared_executor().submit(self.reload, loader)
+
+    def start_periodic(self, interval: float):
+        """Reload every `interval` seconds from a daemon thread until stop_periodic()."""
+        self.stop_periodic()
+        stop = self._stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                self.reload()
+
+        threading.Thread(target=loop, name=f"{self.name}-gallery-reload", daemon=True).start()
+
+    def stop_periodic(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
@@ -0,0 +1,227 @@
+"""
+biometrics/shards.py
+Scatter-gather fingerprint search over a gallery partitioned across shard workers.
+
+Each shard worker serves one FingerprintGallery over a small JSON/HTTP protocol:
+
+    GET  /health  -> {"ok": true, "engine": ..., "size": n, "version": ...}
+    POST /search  {"probe": <base64>, "dtype": ..., "shape": [...], "top_k": k}
+                  -> {"results": [[path, score], ...]}
+
+Workers can be local processes (python -m biometrics.shards serve gallery.npz --port N)
+or remote hosts. ShardCoordinator fans a probe out to every shard, waits up to its
+timeout, and merges the per-shard top-k; shards that time out or fail are left out
+of the answer, returned with it, and counted in biometrics_shard_requests_total. Shards that failed the
+last health() check are not asked at all until a later check finds them ok, so a dead
+host does not cost every request the full timeout.
+"""
+import base64
+import json
+import logging
+import subprocess
+import sys
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .config import SHARD_TIMEOUT, SHARD_HEALTH_TIMEOUT, SHARD_CONCURRENCY
+from .budget import apply_thread_budget
+from .gallery import FingerprintGallery
+from .fingerprint import get_engine
+from .quality import check_probe_quality
+from .metrics import REGISTRY, STAGE_SECONDS
+from .tracing import span
+
+SHARD_REQUESTS = REGISTRY.counter("biometrics_shard_requests_total", "Shard search requests by outcome (ok, timeout, error, skipped)")
+
+
+def split_gallery(gallery: FingerprintGallery, shards: int) -> List[FingerprintGallery]:
+    """Partition a gallery round-robin into `shards` galleries sharing its projection."""
+    parts = [FingerprintGallery(gallery.engine.name) for _ in range(shards)]
+    for i, (path, template) in enumerate(zip(gallery.paths, gallery.templates)):
+        parts[i % shards].add(path, template)
+    for part in parts:
+        # Templates are already in stored form; set the projection after adding them.
+        part.projection = gallery.projection
+    return parts
+
+
+def encode_probe(probe: np.ndarray) -> Dict[str, Any]:
+    probe = np.ascontiguousarray(probe)
+    return {"probe": base64.b64encode(probe.tobytes()).decode("ascii"), "dtype": probe.dtype.str, "shape": list(probe.shape)}
+
+
+def decode_probe(payload: Dict[str, Any]) -> np.ndarray:
+    data = base64.b64decode(payload["probe"])
+    return np.frombuffer(data, dtype=np.dtype(payload["dtype"])).reshape(payload["shape"])
+
+
+class _ShardHandler(BaseHTTPRequestHandler):
+    server_version = "BiometricsShard/1.0"
+
+    def _reply(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._reply(404, {"error": "not found"})
+        gallery = self.server.gallery
+        self._reply(200, {"ok": True, "engine": gallery.engine.name, "size": len(gallery), "version": gallery.version})
+
+    def do_POST(self):
+        if self.path != "/search":
+            return self._reply(404, {"error": "not found"})
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            results = self.server.gallery.search(decode_probe(payload), int(payload.get("top_k", 5)))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {"error": str(e)})
+        self._reply(200, {"results": results})
+
+    def log_message(self, format, *args):
+        logging.debug(f"shard {self.server.server_address[1]}: {format % args}")
+
+
+class ShardServer(ThreadingHTTPServer):
+    """HTTP server answering health and search requests for one gallery shard."""
+
+    daemon_threads = True
+
+    def __init__(self, gallery: FingerprintGallery, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _ShardHandler)
+        self.gallery = gallery
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ShardServer":
+        """Serve from a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, name=f"shard-{self.server_address[1]}", daemon=True).start()
+        return self
+
+
+def start_local_shards(gallery: FingerprintGallery, shards: int, workdir: str) -> Tuple[List[str], List[subprocess.Popen]]:
+    """Split gallery, save each part under workdir and serve it from its own process.
+
+    Returns the shard URLs and processes; terminate the processes and close their stdout when done.
+    """
+    urls, procs = [], []
+    for i, part in enumerate(split_gallery(gallery, shards)):
+        path = f"{workdir}/shard_{i}.npz"
+        part.save(path)
+        proc = subprocess.Popen([sys.executable, "-m", "biometrics.shards", "serve", path, "--port", "0"],
+                                stdout=subprocess.PIPE, text=True)
+        # The worker announces its URL once it is listening.
+        urls.append(proc.stdout.readline().strip())
+        procs.append(proc)
+    return urls, procs
+
+
+class ShardCoordinator:
+    """Fans probes out to shard workers and merges their top-k results."""
+
+    def __init__(self, urls: List[str], engine: Optional[str] = None, timeout: float = SHARD_TIMEOUT,
+                 concurrency: int = SHARD_CONCURRENCY):
+        self.urls = list(urls)
+        self.engine = get_engine(engine)
+        self.timeout = timeout
+        # One client thread per shard for each of `concurrency` simultaneous searches, so concurrent
+        # callers do not wait behind each other's (or a slow shard's) calls and miss their deadline
+        workers = max(1, len(self.urls)) * max(1, concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard-client")
+        # Shards whose last health check failed; search skips them
+        self.unhealthy: set = set()
+
+    def _call(self, url: str, path: str, payload: Optional[Dict[str, Any]], timeout: float) -> Dict[str, Any]:
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(url + path, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return json.loads(resp.read())
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Health of every shard; unreachable ones report ok=False with the error."""
+        status = {}
+        futures = {url: self._executor.submit(self._call, url, "/health", None, SHARD_HEALTH_TIMEOUT) for url in self.urls}
+        for url, future in futures.items():
+            try:
+                status[url] = future.result()
+                if status[url].get("engine") != self.engine.name:
+                    status[url] = {**status[url], "ok": False, "error": f"shard serves {status[url].get('engine')} templates"}
+            except Exception as e:
+                status[url] = {"ok": False, "error": str(e)}
+        self.unhealthy = {url for url, shard in status.items() if not shard.get("ok")}
+        return status
+
+    def healthy_urls(self) -> List[str]:
+        return [url for url, status in self.health().items() if status.get("ok")]
+
+    def search(self, probe: np.ndarray, top_k: int = 5,
+               timeout: Optional[float] = None) -> Tuple[List[Tuple[str, float]], List[str]]:
+        """(merged top_k over the healthy shards that answered within timeout, sorted URLs of the rest)."""
+        timeout = self.timeout if timeout is None else timeout
+        payload = {**encode_probe(probe), "top_k": top_k}
+        skipped = [url for url in self.urls if url in self.unhealthy]
+        if skipped:
+            SHARD_REQUESTS.inc(len(skipped), outcome="skipped")
+        with STAGE_SECONDS.time(stage="score", modality="fingerprint"), span("shards.search", shards=len(self.urls) - len(skipped)):
+            futures = {self._executor.submit(self._call, url, "/search", payload, timeout): url
+                       for url in self.urls if url not in self.unhealthy}
+            done, pending = wait(futures, timeout=timeout)
+        merged, missing = [], list(skipped)
+        for future in pending:
+            SHARD_REQUESTS.inc(outcome="timeout")
+            missing.append(futures[future])
+        for future in done:
+            try:
+                merged.extend((path, float(score)) for path, score in future.result()["results"])
+                SHARD_REQUESTS.inc(outcome="ok")
+            except Exception as e:
+                logging.warning(f"Shard {futures[future]} failed: {e}")
+                SHARD_REQUESTS.inc(outcome="error")
+                missing.append(futures[future])
+        if missing:
+            logging.warning(f"Partial result: {len(missing)} of {len(self.urls)} shards missing")
+        merged.sort(key=lambda r: -r[1])
+        return merged[:top_k], sorted(missing)
+
+    def search_image(self, image_path: str, top_k: int = 5,
+                     quality_floor: Optional[float] = None) -> Tuple[List[Tuple[str, float]], List[str]]:
+        """Extract the probe locally and search all shards, as search(); raises LowQualityError below the quality floor."""
+        check_probe_quality(image_path, quality_floor)
+        return self.search(self.engine.extract(image_path), top_k)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def _serve(gallery_path: str, host: str, port: int):
+    server = ShardServer(FingerprintGallery.load(gallery_path), host, port)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Fingerprint gallery shard worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Serve a saved gallery (.npz) as one shard")
+    serve.add_argument("gallery")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    apply_thread_budget()
+    _serve(args.gallery, args.host, args.port)
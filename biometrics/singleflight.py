@@ -0,0 +1,64 @@
+"""
+biometrics/singleflight.py
+Coalesces concurrent identical calls so only one of them does the work.
+
+While a call for a key is in flight, later callers with the same key block until it
+finishes and receive its result (or its exception) instead of starting their own run.
+Nothing is remembered once the call returns; repeated results come from the result
+cache, not from here.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable
+from .metrics import REGISTRY
+
+FLIGHT_CALLS = REGISTRY.counter("biometrics_singleflight_calls_total", "Single-flight calls by role (leader ran the work, shared waited on it)")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent calls."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) unless a call with key is already running; then share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            FLIGHT_CALLS.inc(group=self.name, role="shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        FLIGHT_CALLS.inc(group=self.name, role="leader")
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Shared by face and fingerprint matching; keys are result-cache keys, so they
+# already separate modality, engine parameters, probe content and gallery version.
+MATCH_FLIGHTS = SingleFlight("match")
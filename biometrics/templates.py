@@ -0,0 +1,129 @@
+"""
+biometrics/templates.py
+Tiered cache of enrolled templates for 1:1 verification.
+
+Verification traffic concentrates on a few active users, so their templates are kept:
+  hot  - in a size-bounded in-memory LRU,
+  warm - as .npy files under TEMPLATE_CACHE_DIR, opened memory-mapped on demand,
+  cold - extracted from the enrolled image by the engine and written to the warm tier.
+Entries are keyed by engine, image path, mtime and size, so re-enrolling a user
+(rewriting their image) can never serve an outdated template. The warm tier is only
+used when a directory is configured and is bounded in bytes: writing past the bound
+deletes the least recently used files. Real-valued templates are kept as float32 in
+every tier.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from .cache import prune_directory
+from .config import TEMPLATE_CACHE_SIZE, TEMPLATE_CACHE_DIR, TEMPLATE_CACHE_DISK_BYTES
+from .metrics import REGISTRY
+
+TEMPLATE_LOOKUPS = REGISTRY.counter("biometrics_template_cache_total", "Enrolled-template lookups by tier served (hot, warm, cold)")
+TEMPLATE_EVICTIONS = REGISTRY.counter("biometrics_template_cache_evictions_total", "Templates evicted by tier (hot, warm)")
+TEMPLATE_HOT_ENTRIES = REGISTRY.gauge("biometrics_template_cache_hot_entries", "Templates held in the hot tier")
+
+
+class TemplateCache:
+    """Hot/warm/cold template store for one engine (anything with .name and .extract(path))."""
+
+    def __init__(self, engine: Any, max_entries: int = TEMPLATE_CACHE_SIZE, warm_dir: Optional[str] = TEMPLATE_CACHE_DIR,
+                 max_warm_bytes: int = TEMPLATE_CACHE_DISK_BYTES):
+        self.engine = engine
+        self.max_entries = max_entries
+        self.warm_dir = os.path.join(warm_dir, engine.name) if warm_dir else None
+        self.max_warm_bytes = max_warm_bytes
+        # Bytes in the warm tier, measured on the first write and re-measured whenever it is pruned
+        self._warm_bytes: Optional[int] = None
+        self._hot: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, path: str) -> Tuple:
+        stat = os.stat(path)
+        return os.path.realpath(path), stat.st_mtime_ns, stat.st_size
+
+    def _warm_path(self, key: Tuple) -> str:
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.warm_dir, name[:2], f"{name}.npy")
+
+    def _promote(self, key: Tuple, template: np.ndarray):
+        with self._lock:
+            self._hot[key] = template
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.max_entries:
+                self._hot.popitem(last=False)
+                TEMPLATE_EVICTIONS.inc(engine=self.engine.name, tier="hot")
+            TEMPLATE_HOT_ENTRIES.set(len(self._hot), engine=self.engine.name)
+
+    def _load_warm(self, key: Tuple) -> Optional[np.ndarray]:
+        if not self.warm_dir:
+            return None
+        path = self._warm_path(key)
+        try:
+            template = np.load(path, mmap_mode="r")
+            os.utime(path)
+            return template
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Discarding unreadable template {self._warm_path(key)}: {e}")
+            return None
+
+    def _store_warm(self, key: Tuple, template: np.ndarray):
+        path = self._warm_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp.npy"
+            np.save(tmp_path, template)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Template cache not written for {key[0]}: {e}")
+            return
+        with self._lock:
+            if self._warm_bytes is None:
+                self._warm_bytes = prune_directory(self.warm_dir, self.max_warm_bytes, ".npy")[0]
+            else:
+                self._warm_bytes += size
+            if self._warm_bytes > self.max_warm_bytes:
+                self._warm_bytes, deleted = prune_directory(self.warm_dir, int(self.max_warm_bytes * 0.9), ".npy")
+                TEMPLATE_EVICTIONS.inc(deleted, engine=self.engine.name, tier="warm")
+
+    def get(self, path: str) -> np.ndarray:
+        """Template for an enrolled image; raises like engine.extract when the image cannot be read."""
+        key = self._key(path)
+        with self._lock:
+            template = self._hot.get(key)
+            if template is not None:
+                self._hot.move_to_end(key)
+        if template is not None:
+            TEMPLATE_LOOKUPS.inc(engine=self.engine.name, tier="hot")
+            return template
+        template = self._load_warm(key)
+        if template is not None:
+            TEMPLATE_LOOKUPS.inc(engine=self.engine.name, tier="warm")
+        else:
+            TEMPLATE_LOOKUPS.inc(engine=self.engine.name, tier="cold")
+            template = self.engine.extract(path)
+            if np.issubdtype(template.dtype, np.floating):
+                template = template.astype(np.float32, copy=False)
+            if self.warm_dir:
+                self._store_warm(key, template)
+        self._promote(key, template)
+        return template
+
+    def get_many(self, paths: List[str]) -> List[np.ndarray]:
+        return [self.get(p) for p in paths]
+
+    def clear(self):
+        """Drop the hot tier; warm files stay for the next process."""
+        with self._lock:
+            self._hot.clear()
+            TEMPLATE_HOT_ENTRIES.set(0, engine=self.engine.name)
+
+    def __len__(self) -> int:
+        return len(self._hot)
@@ -0,0 +1,117 @@
+"""
+biometrics/texture.py
+Compact fingerprint texture features: Gabor-enhanced LBP histogram plus corner count.
+
+These are the features FingerprintProcessor trains on. At ten values per print (nine
+uniform-LBP bins and the corner count) they are also cheap enough to compare against
+a whole gallery as a prefilter.
+
+The Gabor kernel is built once and applied with cv2.filter2D, and uniform LBP codes
+are computed for a whole stack of images with NumPy. Both reproduce skimage's
+`gabor` and `local_binary_pattern(P=8, R=1, method='uniform')` exactly.
+"""
+import cv2
+import numpy as np
+from skimage.filters import gabor_kernel
+from scipy.ndimage import gaussian_filter
+
+COMPACT_IMAGE_SIZE = (100, 100)
+MAX_CORNERS = 10
+COMPACT_WIDTH = 10
+# Bump when compact_features output changes so cached training features are rebuilt
+FEATURE_VERSION = 1
+GABOR_FREQUENCY = 0.6
+LBP_POINTS = 8
+LBP_BINS = LBP_POINTS + 1
+
+# skimage convolves with the real part of the kernel; filter2D correlates, so flip it.
+GABOR_KERNEL = np.ascontiguousarray(np.real(gabor_kernel(GABOR_FREQUENCY))[::-1, ::-1])
+
+# Sampling offsets on the radius-1 circle, rounded the way skimage rounds them.
+_LBP_ROWS = np.round(-np.sin(2 * np.pi * np.arange(LBP_POINTS) / LBP_POINTS), 5)
+_LBP_COLS = np.round(np.cos(2 * np.pi * np.arange(LBP_POINTS) / LBP_POINTS), 5)
+
+
+def _uniform_codes() -> np.ndarray:
+    """Map each 8-bit neighbour pattern to its uniform LBP code (skimage's transition rule)."""
+    lut = np.empty(1 << LBP_POINTS, dtype=np.uint8)
+    for pattern in range(1 << LBP_POINTS):
+        bits = [(pattern >> i) & 1 for i in range(LBP_POINTS)]
+        changes = sum(bits[i] != bits[i + 1] for i in range(LBP_POINTS - 1))
+        lut[pattern] = sum(bits) if changes <= 2 else LBP_POINTS + 1
+    return lut
+
+
+_UNIFORM_CODES = _uniform_codes()
+
+
+def _bilinear_weights(n: int, offset: float) -> tuple:
+    coords = np.arange(n, dtype=np.float64) + offset
+    frac = coords - np.floor(coords)
+    return 1 - frac, frac
+
+
+def gabor_enhance(img: np.ndarray) -> np.ndarray:
+    real = cv2.filter2D(img / 255.0, cv2.CV_64F, GABOR_KERNEL, borderType=cv2.BORDER_REFLECT)
+    return (real * 255).astype(np.uint8)
+
+
+def lbp_codes(images: np.ndarray) -> np.ndarray:
+    """Uniform LBP codes (P=8, R=1) for an (n, h, w) stack of grayscale images."""
+    n, h, w = images.shape
+    centre = images.astype(np.float64)
+    padded = np.zeros((n, h + 2, w + 2))
+    padded[:, 1:-1, 1:-1] = centre
+    pattern = np.zeros((n, h, w), dtype=np.uint8)
+    bit = np.empty((n, h, w), dtype=bool)
+    rows_by_col = {}
+    for i, (dr, dc) in enumerate(zip(_LBP_ROWS, _LBP_COLS)):
+        r0, c0 = int(np.floor(dr)), int(np.floor(dc))
+        if dr == r0 and dc == c0:
+            np.greater_equal(padded[:, 1 + r0:1 + r0 + h, 1 + c0:1 + c0 + w], centre, out=bit)
+        else:
+            # Diagonal neighbours sharing a column offset reuse the same horizontal pass.
+            if dc not in rows_by_col:
+                left, right = _bilinear_weights(w, dc)
+                rows_by_col[dc] = left * padded[:, :, 1 + c0:1 + c0 + w] + right * padded[:, :, 2 + c0:2 + c0 + w]
+            horizontal = rows_by_col[dc]
+            top, bottom = _bilinear_weights(h, dr)
+            sample = top[:, None] * horizontal[:, 1 + r0:1 + r0 + h] + bottom[:, None] * horizontal[:, 2 + r0:2 + r0 + h]
+            np.greater_equal(sample, centre, out=bit)
+        pattern |= bit.view(np.uint8) << i
+    return _UNIFORM_CODES[pattern]
+
+
+def lbp_histograms(images: np.ndarray) -> np.ndarray:
+    """Normalised nine-bin uniform-LBP histograms, one row per image in the stack."""
+    codes = np.minimum(lbp_codes(images), LBP_BINS - 1).reshape(len(images), -1)
+    offsets = np.arange(len(images))[:, None] * LBP_BINS
+    hist = np.bincount((codes + offsets).ravel(), minlength=len(images) * LBP_BINS)
+    hist = hist.reshape(len(images), LBP_BINS).astype("float")
+    hist /= (hist.sum(axis=1, keepdims=True) + 1e-6)
+    return hist
+
+
+def extract_lbp(img: np.ndarray) -> np.ndarray:
+    return lbp_histograms(img[None])[0]
+
+
+def corner_count(img: np.ndarray) -> int:
+    blurred = gaussian_filter(img, sigma=1)
+    corners = cv2.goodFeaturesToTrack(blurred, maxCorners=MAX_CORNERS, qualityLevel=0.01, minDistance=5)
+    return corners.shape[0] if corners is not None else 0
+
+
+def compact_features(img: np.ndarray) -> np.ndarray:
+    """LBP histogram followed by the corner count for a grayscale image."""
+    img = cv2.resize(img, COMPACT_IMAGE_SIZE)
+    img = cv2.equalizeHist(img)
+    enhanced = gabor_enhance(img)
+    return np.append(extract_lbp(enhanced), corner_count(enhanced))
+
+
+def compact_features_from_path(image_path: str) -> np.ndarray:
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        raise ValueError(f"Unable to load image: {image_path}")
+    return compact_features(img)
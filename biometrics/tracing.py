@@ -0,0 +1,135 @@
+"""
+biometrics/tracing.py
+Lightweight stage tracing: context-manager spans with trace/parent ids.
+
+Finished spans are kept in a bounded in-memory buffer and, when TRACE_FILE is set
+(BIOMETRICS_TRACE_FILE), appended to it as JSON lines. Each line is a Chrome trace
+"complete" event, so ``export_chrome_trace`` (or ``python -m biometrics.tracing
+trace.jsonl trace.json``) produces a file that chrome://tracing or Perfetto can open.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from .config import TRACE_FILE, TRACE_BUFFER_SIZE
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("biometrics_span", default=None)
+_finished = deque(maxlen=TRACE_BUFFER_SIZE)
+_sink_lock = threading.Lock()
+_trace_file = TRACE_FILE
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start", "duration")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.time()
+        self.duration = 0.0
+
+    def set(self, **attrs):
+        """Attach attributes discovered while the span is open (scores, counts, errors)."""
+        self.attrs.update(attrs)
+
+    def to_event(self) -> Dict[str, Any]:
+        """Chrome trace 'complete' event; ids travel in args."""
+        return {
+            "name": self.name,
+            "ph": "X",
+            "ts": int(self.start * 1e6),
+            "dur": int(self.duration * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {"trace_id": self.trace_id, "span_id": self.span_id,
+                     "parent_id": self.parent_id, **self.attrs},
+        }
+
+
+def set_trace_file(path: Optional[str]):
+    """Enable (or with None/"" disable) the JSON lines sink at runtime."""
+    global _trace_file
+    _trace_file = path or ""
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Open a span as a child of the current one; exceptions are recorded and re-raised."""
+    parent = _current_span.get()
+    current = Span(name, parent, attrs)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        _record(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span for whole functions (e.g. Flask routes)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(finished: Span):
+    event = finished.to_event()
+    _finished.append(event)
+    if _trace_file:
+        line = json.dumps(event, default=str)
+        with _sink_lock:
+            with open(_trace_file, "a") as f:
+                f.write(line + "\n")
+
+
+def finished_spans() -> List[Dict[str, Any]]:
+    """Return the buffered events, oldest first."""
+    return list(_finished)
+
+
+def clear():
+    _finished.clear()
+
+
+def export_chrome_trace(path: str, events: Optional[List[Dict[str, Any]]] = None):
+    """Write events (default: the in-memory buffer) as a Chrome trace JSON file."""
+    if events is None:
+        events = finished_spans()
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+
+def load_trace_lines(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m biometrics.tracing <trace.jsonl> <chrome_trace.json>")
+        sys.exit(1)
+    export_chrome_trace(sys.argv[2], load_trace_lines(sys.argv[1]))
+    print(f"Chrome trace written to {sys.argv[2]}")
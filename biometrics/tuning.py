@@ -0,0 +1,117 @@
+"""
+biometrics/tuning.py
+Successive-halving search over classifier and hyperparameter choices.
+
+Every candidate is first cross-validated on a small random subset of identities. Only
+the best 1/eta (by accuracy) move on to a round with eta times as many identities,
+until the last round uses the whole dataset. Identities rather than samples are the
+budget, so each subset keeps whole classes and stays valid for stratified CV. All
+folds of all candidates in a round run in one parallel batch (biometrics/evaluation.py),
+and each round records which candidates lie on the accuracy / training time /
+inference latency Pareto frontier. The winner (the fastest final-round candidate
+within MODEL_SELECTION_TOLERANCE of the best accuracy) is saved as JSON together with a
+version string describing the training data, so later runs on the same data can rebuild
+it without searching again.
+"""
+import importlib
+import itertools
+import json
+import logging
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sklearn.base import clone
+from .config import MODEL_SELECTION_TOLERANCE
+from .evaluation import cross_validate_many, default_cv, select_cheapest, summarize
+
+HISTORY_COLUMNS = ["round", "classes", "samples", "candidate", "accuracy", "fit_seconds", "latency_ms", "model_mb", "pareto"]
+
+
+def grid(prefix: str, estimator, **param_values) -> Dict[str, object]:
+    """Named clones of estimator for every combination of the given parameter values."""
+    names = list(param_values)
+    candidates = {}
+    for values in itertools.product(*(param_values[name] for name in names)):
+        label = " ".join(f"{name}={value}" for name, value in zip(names, values))
+        candidates[f"{prefix} {label}".strip()] = clone(estimator).set_params(**dict(zip(names, values)))
+    return candidates
+
+
+def pareto_frontier(summaries: Dict[str, Dict[str, float]]) -> List[str]:
+    """Candidates not beaten on accuracy, fit time and latency at once by any other candidate."""
+    def dominates(a, b):
+        better_or_equal = a["accuracy"] >= b["accuracy"] and a["fit_seconds"] <= b["fit_seconds"] and a["latency_ms"] <= b["latency_ms"]
+        strictly = a["accuracy"] > b["accuracy"] or a["fit_seconds"] < b["fit_seconds"] or a["latency_ms"] < b["latency_ms"]
+        return better_or_equal and strictly
+    return [name for name, summary in summaries.items()
+            if not any(dominates(other, summary) for other_name, other in summaries.items() if other_name != name)]
+
+
+def successive_halving(candidates: Dict[str, object], X, y, eta: int = 3, min_classes: int = 10,
+                       tolerance: float = MODEL_SELECTION_TOLERANCE, n_jobs: Optional[int] = None,
+                       seed: int = 0) -> Tuple[str, List[Dict[str, object]], List[Dict[str, float]]]:
+    """Search candidates; returns (winning candidate name, one history row per candidate and
+    round, the winner's CV folds from the final round, which uses the whole dataset).
+
+    The first round uses at least min_classes identities, which caps the number of rounds
+    on small datasets (down to a single full-data round).
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    classes = np.random.default_rng(seed).permutation(np.unique(y))
+    # Enough rounds to halve down to one candidate, as long as the first still gets min_classes
+    rounds = 1
+    while eta ** rounds < len(candidates) and len(classes) >= min_classes * eta ** rounds:
+        rounds += 1
+    survivors = dict(candidates)
+    history = []
+    for round_index in range(rounds):
+        n_classes = math.ceil(len(classes) / eta ** (rounds - 1 - round_index))
+        subset = np.isin(y, classes[:n_classes])
+        X_round, y_round = X[subset], y[subset]
+        # Only the final round's folds are reported (model_costs.csv), so only it pays for memory tracing
+        folds = cross_validate_many(survivors, X_round, y_round, default_cv(y_round), n_jobs,
+                                    measure_memory=round_index == rounds - 1)
+        summaries = {name: summarize(model_folds) for name, model_folds in folds.items()}
+        frontier = set(pareto_frontier(summaries))
+        for name, summary in summaries.items():
+            history.append({"round": round_index, "classes": n_classes, "samples": len(y_round),
+                            "candidate": name, **{column: summary[column] for column in HISTORY_COLUMNS[4:8]},
+                            "pareto": name in frontier})
+        logging.info(f"Search round {round_index + 1}/{rounds}: {len(survivors)} candidates on {len(y_round)} samples; "
+                     f"Pareto frontier: {sorted(frontier)}")
+        if round_index < rounds - 1:
+            keep = math.ceil(len(survivors) / eta)
+            ranked = sorted(summaries, key=lambda name: (-summaries[name]["accuracy"], summaries[name]["latency_ms"]))
+            survivors = {name: survivors[name] for name in ranked[:keep]}
+    winner = select_cheapest(folds, tolerance)
+    logging.info(f"Search winner: {winner} ({summaries[winner]['accuracy']:.4f} accuracy)")
+    return winner, history, folds[winner]
+
+
+def save_config(path: str, name: str, model, version: str = ""):
+    """Persist a candidate as its name, estimator class and constructor parameters, plus the
+    version of the data it was chosen on."""
+    config = {"name": name, "estimator": f"{type(model).__module__}.{type(model).__name__}",
+              "params": model.get_params(deep=False), "version": version}
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_config(path: str, version: Optional[str] = None) -> Optional[Tuple[str, object]]:
+    """(name, unfitted estimator) from a file written by save_config, or None if there is no
+    such file or, when version is given, it was saved for a different version."""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return None
+    if version is not None and config.get("version") != version:
+        return None
+    module_name, class_name = config["estimator"].rsplit(".", 1)
+    estimator = getattr(importlib.import_module(module_name), class_name)
+    return config["name"], estimator(**config["params"])
@@ -17,6 +17,10 @@ def setup_logging(level: str = "INFO"):
 
 
 def extract_metrics(file_path: str) -> Dict[str, Any]:
+    """Parse a legacy ``Accuracy/Recall Time/F1-Score`` text results file.
+
+    New runs record into biometrics.metrics; use metrics.summary_metrics instead.
+    """
     metrics = {"accuracy": 0, "recall_time": 0, "f1_score": 0}
     if not os.path.exists(file_path):
         logging.warning(f"File not found: {file_path}")
@@ -1,17 +1,15 @@
 import os
 import cv2
+import hashlib
 import pickle
 import numpy as np
 import matplotlib.pyplot as plt
 from tensorflow.keras.applications import ResNet50
 from tensorflow.keras.models import Model
 from tensorflow.keras.preprocessing import image
-from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.model_selection import StratifiedKFold
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.svm import SVC
-from skimage.feature import local_binary_pattern
-from skimage.filters import gabor
-from scipy.ndimage import gaussian_filter
 import pandas as pd
 from collections import Counter
 from sklearn.metrics.pairwise import cosine_similarity
@@ -19,163 +17,303 @@ import sys
 import threading
 import subprocess
 import tkinter as tk
-from biometrics.config import KNN_MODEL_PATH, SVM_MODEL_PATH, MIN_CLASS_SAMPLES
+from biometrics.config import KNN_MODEL_PATH, SVM_MODEL_PATH, MIN_CLASS_SAMPLES, FEATURE_CACHE_DIR
+from biometrics.config import FACE_MODEL_CONFIG, FINGERPRINT_MODEL_CONFIG, FACE_STORE_DIR, FINGERPRINT_STORE_DIR
+from biometrics.enrollment import enroll
 from biometrics.utils import setup_logging
+from biometrics.budget import apply_thread_budget
+from biometrics import texture
+from biometrics.checkpoint import CheckpointedBuild
+from biometrics.pipeline import Pipeline
+from biometrics.imagepack import ImagePack, is_pack
+from biometrics.catalog import get_catalog
+from biometrics.featurecache import FeatureCache, dataset_version
+from biometrics.featurestore import FeatureStore
+from biometrics.evaluation import cross_validate_timed, summarize, FOLD_COLUMNS
+from biometrics.tuning import grid, successive_halving, save_config, load_config, HISTORY_COLUMNS
+from biometrics.neighbors import ProjectedKNN, BACKENDS
 import logging
 
 setup_logging()
 
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+# Extractor ids key checkpoints and cached features; bump the version when the features change
+FACE_EXTRACTOR = "face:resnet50:v1"
+FINGERPRINT_EXTRACTOR = f"fingerprint:compact:v{texture.FEATURE_VERSION}"
+
+
+def training_version(extractor: str, *dataset_paths: str) -> str:
+    """Version of a training set: the extractor id plus each dataset's version; a saved model config
+    is only reused while this is unchanged."""
+    return ":".join([extractor, *(dataset_version(path) for path in dataset_paths)])
+
+
+def checkpoint_tag(extractor: str, dataset_path: str) -> str:
+    """Checkpoint tag for a dataset; a .pack's version is part of it since its members are not files."""
+    return f"{extractor}:{dataset_version(dataset_path)}" if is_pack(dataset_path) else extractor
+
+
+def extract_items(items: list, decode, compute, checkpoint_dir: str = None, tag: str = "", workers: int = None) -> tuple:
+    """Run compute(decode(path)) over (path, label) items, skipping unreadable images.
+
+    Returns (X, y): a float32 feature matrix and the label of each row.
+
+    Reads and decodes are prefetched on reader threads while `workers` threads compute
+    (see biometrics/pipeline.py). With checkpoint_dir the run is chunked and resumable
+    (see biometrics/checkpoint.py).
+    """
+    pipeline = Pipeline(decode, compute, workers=workers, name=tag or "load_data")
+    # Sized for every item up front so the matrix is never regrown
+    store = FeatureStore(capacity=len(items))
+    if checkpoint_dir:
+        def extract_one(path):
+            try:
+                return compute(decode(path))
+            except Exception as e:
+                logging.error(f"Skipping {path}: {e}")
+                return None
+
+        X, y, _ = CheckpointedBuild(checkpoint_dir, tag=tag).run(
+            items, extract_one, mapper=lambda _, paths: pipeline.map(paths))
+        store.extend(X, y)
+        return store.X, store.labels
+    labels = dict(items)
+    pipeline.run([img_path for img_path, _ in items], lambda img_path, features: store.append(features, labels[img_path]))
+    logging.info(f"Pipeline queue fill: {pipeline.occupancy}")
+    return store.X, store.labels
+
 
 class FaceProcessor:
     def __init__(self, dataset_path: str):
         self.dataset_path = dataset_path
+        # A .pack dataset holds pre-decoded images (see biometrics/imagepack.py)
+        self.pack = ImagePack(dataset_path) if is_pack(dataset_path) else None
         self.resnet = ResNet50(weights="imagenet", include_top=False, pooling='avg')
         self.face_model = Model(inputs=self.resnet.input, outputs=self.resnet.output)
-        self.X: list = []
-        self.y: list = []
+        self.features = FeatureStore()
 
-    def extract_features(self, img_path: str) -> np.ndarray:
-        img = cv2.imread(img_path)
+    @property
+    def X(self) -> np.ndarray:
+        return self.features.X
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.features.labels
+
+    def decode_image(self, img_path: str) -> np.ndarray:
+        if self.pack is not None:
+            img = self.pack.image(img_path)
+            if img.ndim == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        else:
+            img = cv2.imread(img_path)
         if img is None:
             logging.warning(f"Could not read image: {img_path}")
             return None
         img = cv2.resize(img, (224, 224))
         img = image.img_to_array(img)
-        img = np.expand_dims(img, axis=0) / 255.0
+        return np.expand_dims(img, axis=0) / 255.0
+
+    def features_from_image(self, img: np.ndarray) -> np.ndarray:
         features = self.face_model.predict(img, verbose=0)
         return features.flatten()
 
-    def load_data(self):
+    def extract_features(self, img_path: str) -> np.ndarray:
+        img = self.decode_image(img_path)
+        if img is None:
+            return None
+        return self.features_from_image(img)
+
+    def _extract(self, checkpoint_dir: str = None) -> tuple:
         logging.info("Extracting face features...")
-        for class_name in os.listdir(self.dataset_path):
-            class_dir = os.path.join(self.dataset_path, class_name)
-            if not os.path.isdir(class_dir):
-                continue
-            for img_file in os.listdir(class_dir):
-                if not img_file.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")):
-                    continue
-                img_path = os.path.join(class_dir, img_file)
-                features = self.extract_features(img_path)
-                if features is not None:
-                    self.X.append(features)
-                    self.y.append(class_name)
+        # One compute worker: the Keras model is not shared across threads and TF parallelises internally.
+        items = self.pack.items() if self.pack is not None else get_catalog().items(self.dataset_path, IMAGE_EXTENSIONS, "classes")
+        return extract_items(items, self.decode_image, self.features_from_image,
+                             checkpoint_dir, tag=checkpoint_tag(FACE_EXTRACTOR, self.dataset_path), workers=1)
+
+    def load_data(self, checkpoint_dir: str = None, cache_dir: str = None):
+        """Extract features for the dataset; with cache_dir, reuse them while the dataset is unchanged."""
+        if cache_dir:
+            X, y = FeatureCache(cache_dir).fetch(FACE_EXTRACTOR, self.dataset_path, lambda: self._extract(checkpoint_dir))
+        else:
+            X, y = self._extract(checkpoint_dir)
+        self.features.extend(X, y)
         logging.info(f"[OK] {len(self.X)} face samples collected.")
 
     def filter_classes(self, min_samples: int = MIN_CLASS_SAMPLES):
-        counts = Counter(self.y)
-        valid_labels = {label for label, count in counts.items() if count >= min_samples}
-        self.X = [x for x, y in zip(self.X, self.y) if y in valid_labels]
-        self.y = [y for y in self.y if y in valid_labels]
-        if not self.y:
+        if not self.features.filter_classes(min_samples):
             raise ValueError("No classes in the face dataset have at least 2 samples. Please check your dataset.")
 
 
 class FingerprintProcessor:
     def __init__(self, dataset_path: str):
         self.dataset_path = dataset_path
-        self.X: list = []
-        self.y: list = []
+        self.pack = ImagePack(dataset_path) if is_pack(dataset_path) else None
+        self.features = FeatureStore()
+
+    @property
+    def X(self) -> np.ndarray:
+        return self.features.X
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.features.labels
 
     def gabor_enhance(self, img: np.ndarray) -> np.ndarray:
-        img = img / 255.0
-        real, _ = gabor(img, frequency=0.6)
-        return (real * 255).astype(np.uint8)
+        return texture.gabor_enhance(img)
 
     def extract_lbp(self, img: np.ndarray) -> np.ndarray:
-        lbp = local_binary_pattern(img, P=8, R=1, method='uniform')
-        hist, _ = np.histogram(lbp.ravel(), bins=np.arange(0, 10), range=(0, 9))
-        hist = hist.astype("float")
-        hist /= (hist.sum() + 1e-6)
-        return hist
+        return texture.extract_lbp(img)
 
     def fake_minutiae_features(self, img: np.ndarray) -> int:
-        blurred = gaussian_filter(img, sigma=1)
-        corners = cv2.goodFeaturesToTrack(blurred, maxCorners=10, qualityLevel=0.01, minDistance=5)
-        return corners.shape[0] if corners is not None else 0
+        return texture.corner_count(img)
 
-    def extract_features(self, img_path: str) -> np.ndarray:
+    def decode_image(self, img_path: str) -> np.ndarray:
+        if self.pack is not None:
+            return self.pack.gray(img_path)
         img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
         if img is None:
             logging.warning(f"Could not read image: {img_path}")
+        return img
+
+    def extract_features(self, img_path: str) -> np.ndarray:
+        img = self.decode_image(img_path)
+        if img is None:
             return None
-        img = cv2.resize(img, (100, 100))
-        img = cv2.equalizeHist(img)
-        enhanced = self.gabor_enhance(img)
-        lbp = self.extract_lbp(enhanced)
-        minutiae = self.fake_minutiae_features(enhanced)
-        return np.append(lbp, minutiae)
-
-    def load_data(self):
+        return texture.compact_features(img)
+
+    def _extract(self, checkpoint_dir: str = None) -> tuple:
         logging.info("Extracting fingerprint features...")
+        # Class folders when present, otherwise '<label>_*' files (labels come from the catalog)
+        items = self.pack.items() if self.pack is not None else get_catalog().items(self.dataset_path, IMAGE_EXTENSIONS)
+        return extract_items(items, self.decode_image, texture.compact_features, checkpoint_dir,
+                             tag=checkpoint_tag(FINGERPRINT_EXTRACTOR, self.dataset_path))
+
+    def load_data(self, checkpoint_dir: str = None, cache_dir: str = None):
+        """Extract features for the dataset; with cache_dir, reuse them while the dataset is unchanged."""
         if not os.path.exists(self.dataset_path):
             raise FileNotFoundError(f"Dataset path '{self.dataset_path}' does not exist.")
-        has_subdirs = any(os.path.isdir(os.path.join(self.dataset_path, item)) for item in os.listdir(self.dataset_path))
-        if has_subdirs:
-            for class_name in os.listdir(self.dataset_path):
-                class_dir = os.path.join(self.dataset_path, class_name)
-                if not os.path.isdir(class_dir):
-                    continue
-                for img_file in os.listdir(class_dir):
-                    if not img_file.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")):
-                        continue
-                    img_path = os.path.join(class_dir, img_file)
-                    features = self.extract_features(img_path)
-                    if features is not None:
-                        self.X.append(features)
-                        self.y.append(class_name)
+        if cache_dir:
+            X, y = FeatureCache(cache_dir).fetch(FINGERPRINT_EXTRACTOR, self.dataset_path, lambda: self._extract(checkpoint_dir))
         else:
-            for img_file in os.listdir(self.dataset_path):
-                if not img_file.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")):
-                    continue
-                label = os.path.splitext(img_file)[0].split('_')[0]
-                img_path = os.path.join(self.dataset_path, img_file)
-                features = self.extract_features(img_path)
-                if features is not None:
-                    self.X.append(features)
-                    self.y.append(label)
+            X, y = self._extract(checkpoint_dir)
+        self.features.extend(X, y)
         logging.info(f"[OK] {len(self.X)} fingerprint samples collected from {self.dataset_path}.")
 
     def filter_classes(self, min_samples: int = MIN_CLASS_SAMPLES):
-        counts = Counter(self.y)
-        valid_labels = {label for label, count in counts.items() if count >= min_samples}
-        self.X = [x for x, y in zip(self.X, self.y) if y in valid_labels]
-        self.y = [y for y in self.y if y in valid_labels]
-        if not self.y:
+        if not self.features.filter_classes(min_samples):
             raise ValueError("No classes in the fingerprint dataset have at least 2 samples. Please check your dataset.")
 
 
+def face_knn_candidates(n_neighbors: int = 3) -> dict:
+    """Face KNN variants: raw or PCA-reduced features, brute force or ball tree.
+
+    A ball tree over the raw 2048-wide ResNet features degrades to a slow full scan,
+    so it is only offered on the PCA-reduced ones.
+    """
+    prefix = f"knn{n_neighbors}"
+    candidates = {prefix: KNeighborsClassifier(n_neighbors=n_neighbors)}
+    for n_components in (None, 256, 128):
+        for backend in BACKENDS if n_components else ("brute",):
+            candidates[f"{prefix} {backend} pca{n_components or 0}"] = ProjectedKNN(n_neighbors, n_components, backend=backend)
+    candidates[f"{prefix} brute pca128 whiten"] = ProjectedKNN(n_neighbors, 128, whiten=True)
+    return candidates
+
+
+# SVC(probability=True) would fit an extra internal 5-fold Platt calibration per model,
+# several times the training cost for no change in predicted labels, so the search leaves it off.
+def face_search_space() -> dict:
+    candidates = {}
+    for n_neighbors in (1, 3, 5):
+        candidates.update(face_knn_candidates(n_neighbors))
+    candidates.update(grid("svc", SVC(kernel="linear"), C=[0.1, 1, 10]))
+    return candidates
+
+
+def fingerprint_search_space() -> dict:
+    candidates = grid("svc", SVC(), kernel=["linear", "rbf"], C=[0.1, 1, 10])
+    candidates.update(grid("knn", KNeighborsClassifier(), n_neighbors=[1, 3, 5], weights=["uniform", "distance"]))
+    return candidates
+
+
 class ModelEvaluator:
-    def __init__(self, X, y, model, name):
+    def __init__(self, X, y, model, name, label: str = ""):
         self.X = X
         self.y = y
         self.model = model
         self.name = name
+        # Candidate name of the selected estimator, shown in the accuracy plot
+        self.label = label or type(model).__name__
+        self.folds: list = []
 
     def evaluate(self):
+        if self.folds:
+            # Folds from the final (full-data) search round; no need to cross-validate again
+            scores = np.array([fold["accuracy"] for fold in self.folds])
+            logging.info(f"{self.name} CV Scores: {scores}")
+            return scores
         class_counts = Counter(self.y)
         min_class_samples = min(class_counts.values())
         if min_class_samples < 2:
             raise ValueError(f"Each class in the {self.name} dataset must have at least 2 samples for StratifiedKFold.")
         n_splits = max(min(min_class_samples, 3), 2)
         skf = StratifiedKFold(n_splits=n_splits)
-        scores = cross_val_score(self.model, self.X, self.y, cv=skf)
+        # Folds run in parallel within the thread budget and record fit/predict cost
+        self.folds = cross_validate_timed(self.model, self.X, self.y, skf, name=self.name)
+        scores = np.array([fold["accuracy"] for fold in self.folds])
         logging.info(f"{self.name} CV Scores: {scores}")
         return scores
 
+    @staticmethod
+    def search(X, y, candidates: dict, name: str, config_path: str, results_dir: str, version: str = "") -> "ModelEvaluator":
+        """Evaluator for the model saved at config_path, or for the successive-halving winner over candidates.
+
+        The saved model is reused only while version (see training_version) and the candidate
+        names match the ones it was chosen with. A search writes its per-round history (with
+        Pareto frontier flags) to <results_dir>/<name>_model_search.csv, saves the winner to
+        config_path and hands the winner's final-round folds to the evaluator.
+        """
+        names = "\n".join(sorted(candidates))
+        version = f"{version}:{hashlib.sha256(names.encode()).hexdigest()[:16]}"
+        saved = load_config(config_path, version)
+        if saved is not None:
+            label, model = saved
+            logging.info(f"Using {name} model '{label}' from {config_path}; the training data and candidates are unchanged.")
+            return ModelEvaluator(X, y, model, name, label)
+        winner, history, folds = successive_halving(candidates, X, y)
+        os.makedirs(results_dir, exist_ok=True)
+        pd.DataFrame(history, columns=HISTORY_COLUMNS).to_csv(os.path.join(results_dir, f"{name}_model_search.csv"), index=False)
+        save_config(config_path, winner, candidates[winner], version)
+        evaluator = ModelEvaluator(X, y, candidates[winner], name, winner)
+        evaluator.folds = [{**fold, "model": name} for fold in folds]
+        return evaluator
+
     def save_model(self, filename):
+        """Fit the model on every sample and pickle it; enroll_identity updates this fitted model."""
+        self.model.fit(self.X, self.y)
         with open(filename, "wb") as f:
             pickle.dump(self.model, f)
 
     @staticmethod
-    def plot_results(face_scores, fp_scores, results_dir):
-        results_df = pd.DataFrame({
-            'Face KNN Accuracy': [np.mean(face_scores)],
-            'Fingerprint SVM Accuracy': [np.mean(fp_scores)]
-        })
+    def save_costs(evaluators, results_dir):
+        """Write per-fold costs (model_costs.csv) and a per-model summary (model_cost_summary.csv)."""
+        os.makedirs(results_dir, exist_ok=True)
+        folds = [fold for evaluator in evaluators for fold in evaluator.folds]
+        pd.DataFrame(folds, columns=FOLD_COLUMNS).to_csv(os.path.join(results_dir, "model_costs.csv"), index=False)
+        summary = pd.DataFrame([{"model": evaluator.name, **summarize(evaluator.folds)} for evaluator in evaluators if evaluator.folds])
+        summary.to_csv(os.path.join(results_dir, "model_cost_summary.csv"), index=False)
+        logging.info(f"Model cost summary:\n{summary.to_string(index=False)}")
+
+    @staticmethod
+    def plot_results(evaluators, scores, results_dir):
+        """Mean CV accuracy per evaluator, labelled with its modality and selected estimator."""
+        titles = [f"{evaluator.name.capitalize()} {evaluator.label}" for evaluator in evaluators]
+        means = [np.mean(fold_scores) for fold_scores in scores]
+        results_df = pd.DataFrame({f"{title} Accuracy": [mean] for title, mean in zip(titles, means)})
         os.makedirs(results_dir, exist_ok=True)
         results_df.to_csv(os.path.join(results_dir, "model_accuracy.csv"), index=False)
         plt.figure(figsize=(8, 6))
-        plt.bar(["Face KNN", "Fingerprint SVM"], [np.mean(face_scores), np.mean(fp_scores)], color=['blue', 'green'])
+        plt.bar(titles, means, color=['blue', 'green'])
         plt.ylabel("Accuracy")
         plt.title("Model Accuracy")
         plt.ylim(0, 1)
@@ -197,13 +335,11 @@ def compare_single_image_with_faces(input_image_path, faces_folder, face_model):
     best_score = -1
     best_match = None
 
-    for face_file in os.listdir(faces_folder):
-        if not face_file.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
-            continue
+    for face_path in get_catalog().files(faces_folder, IMAGE_EXTENSIONS):
+        face_file = os.path.basename(face_path)
         # Only compare with files that have the same prefix
         if not face_file.startswith(input_prefix):
             continue
-        face_path = os.path.join(faces_folder, face_file)
         print(f"Comparing with: {face_file}")
         features = face_model.extract_features(face_path)
         if features is None:
@@ -220,6 +356,20 @@ def compare_single_image_with_faces(input_image_path, faces_folder, face_model):
         print("[ERROR] No valid face images found for comparison with the same prefix.")
 
 
+def enroll_identity(modality: str, label: str, image_paths: list) -> dict:
+    """Add one identity to the trained face or fingerprint model without re-extracting or retraining everything."""
+    if modality == "face":
+        processor, store_dir, model_path = FaceProcessor(""), FACE_STORE_DIR, KNN_MODEL_PATH
+    elif modality == "fingerprint":
+        processor, store_dir, model_path = FingerprintProcessor(""), FINGERPRINT_STORE_DIR, SVM_MODEL_PATH
+    else:
+        raise ValueError(f"Unknown modality '{modality}'; expected 'face' or 'fingerprint'")
+    features = [f for f in (processor.extract_features(path) for path in image_paths) if f is not None]
+    if not features:
+        raise ValueError(f"No readable images to enroll for '{label}'")
+    return enroll(store_dir, model_path, np.vstack(features), [label] * len(features))
+
+
 def run_fingerprint_dev(self):
     """Run facefingerdev.py and show its output in the fingerprint log panel."""
     self.fingerprint_logs_text.delete(1.0, tk.END)
@@ -248,45 +398,68 @@ def run_fingerprint_dev(self):
 
 
 if __name__ == "__main__":
+    # Before TensorFlow, OpenCV or BLAS start their thread pools
+    apply_thread_budget()
+
+    # Incremental mode: python facefingerdev.py --enroll face|fingerprint <label> <image> [<image> ...]
+    if len(sys.argv) > 1 and sys.argv[1] == "--enroll":
+        import argparse
+        parser = argparse.ArgumentParser(prog="facefingerdev.py --enroll",
+                                         description="Enroll one identity into the trained face or fingerprint model")
+        parser.add_argument("modality", choices=["face", "fingerprint"])
+        parser.add_argument("label")
+        parser.add_argument("images", nargs="+")
+        args = parser.parse_args(sys.argv[2:])
+        result = enroll_identity(args.modality, args.label, args.images)
+        print(f"[OK] Enrolled '{args.label}' ({result['method']}); the {args.modality} model now knows {result['classes']} identities.")
+        sys.exit(0)
+
     # === Paths ===
     FACIAL_FOLDER_1 = os.path.join(os.getcwd(), "archive", "Original Images")
     FACIAL_FOLDER_2 = os.path.join(os.getcwd(), "archive", "Faces")
     FINGERPRINT_DATASET = os.path.join(os.getcwd(), "fingerprtintDataset", "real")
+    # Feature extraction resumes from here after a crash
+    CHECKPOINT_DIR = os.path.join(os.getcwd(), "results", "checkpoints")
 
     # === Face: Original Images ===
+    # Features are reused from FEATURE_CACHE_DIR while a dataset is unchanged
     face_proc1 = FaceProcessor(FACIAL_FOLDER_1)
-    face_proc1.load_data()
+    face_proc1.load_data(os.path.join(CHECKPOINT_DIR, "faces_original"), FEATURE_CACHE_DIR)
 
     # === Face: Flat Folder (Faces) ===
     face_proc2 = FaceProcessor(FACIAL_FOLDER_2)
-    face_proc2.load_data()
+    face_proc2.load_data(os.path.join(CHECKPOINT_DIR, "faces_flat"), FEATURE_CACHE_DIR)
 
     # Combine face data
-    face_proc1.X.extend(face_proc2.X)
-    face_proc1.y.extend(face_proc2.y)
+    face_proc1.features.extend(face_proc2.X, face_proc2.y)
     face_proc1.filter_classes()
 
     # === Fingerprint ===
     fp_proc = FingerprintProcessor(FINGERPRINT_DATASET)
-    fp_proc.load_data()
+    fp_proc.load_data(os.path.join(CHECKPOINT_DIR, "fingerprint"), FEATURE_CACHE_DIR)
     fp_proc.filter_classes()
 
     # === Models ===
-    knn_model = KNeighborsClassifier(n_neighbors=3)
-    svm_model = SVC(kernel='linear', probability=True)
+    # Classifier and hyperparameters come from a successive-halving search on this data,
+    # kept in FACE_MODEL_CONFIG / FINGERPRINT_MODEL_CONFIG for later runs on the same data
+    results_dir = os.path.join(os.getcwd(), "results", "devop")
+    face_eval = ModelEvaluator.search(face_proc1.X, face_proc1.y, face_search_space(), "face", FACE_MODEL_CONFIG, results_dir,
+                                      training_version(FACE_EXTRACTOR, FACIAL_FOLDER_1, FACIAL_FOLDER_2))
+    fp_eval = ModelEvaluator.search(fp_proc.X, fp_proc.y, fingerprint_search_space(), "fingerprint", FINGERPRINT_MODEL_CONFIG, results_dir,
+                                    training_version(FINGERPRINT_EXTRACTOR, FINGERPRINT_DATASET))
 
     # === Evaluation ===
-    face_eval = ModelEvaluator(face_proc1.X, face_proc1.y, knn_model, "face")
-    fp_eval = ModelEvaluator(fp_proc.X, fp_proc.y, svm_model, "fingerprint")
-
     face_scores = face_eval.evaluate()
     fp_scores = fp_eval.evaluate()
 
     face_eval.save_model(KNN_MODEL_PATH)
     fp_eval.save_model(SVM_MODEL_PATH)
+    # Training features, kept so new identities can be enrolled incrementally (--enroll)
+    face_proc1.features.save(FACE_STORE_DIR)
+    fp_proc.features.save(FINGERPRINT_STORE_DIR)
 
-    results_dir = os.path.join(os.getcwd(), "results", "devop")
-    ModelEvaluator.plot_results(face_scores, fp_scores, results_dir)
+    ModelEvaluator.plot_results([face_eval, fp_eval], [face_scores, fp_scores], results_dir)
+    ModelEvaluator.save_costs([face_eval, fp_eval], results_dir)
 
     # === Face Comparison ===
     # Get input image path from command-line argument if provided
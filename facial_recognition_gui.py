@@ -1,5 +1,6 @@
 from tkinter import Tk, Label, Button, filedialog, Text, Scrollbar, END, Frame
 from biometrics.face import find_most_similar
+from biometrics.budget import apply_thread_budget
 import os
 import threading  # Import threading for background processing
 
@@ -73,6 +74,7 @@ class FacialRecognitionGUI:
 
 # Run the GUI
 if __name__ == "__main__":
+    apply_thread_budget()
     root = Tk()
     app = FacialRecognitionGUI(root)
     root.mainloop()
\ No newline at end of file
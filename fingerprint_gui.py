@@ -4,6 +4,7 @@ import threading
 import time
 from biometrics.face import find_most_similar
 from biometrics.fingerprint import compare_fingerprints
+from biometrics.budget import apply_thread_budget
 import os
 import subprocess
 
@@ -268,6 +269,7 @@ class CombinedGUI:
 # Run the GUI
 
 if __name__ == "__main__":
+    apply_thread_budget()
     root = tk.Tk()
     app = CombinedGUI(root)
     root.mainloop()
@@ -1,32 +1,13 @@
 import os
 import matplotlib.pyplot as plt
+from biometrics.metrics import summary_metrics
 
 # Define paths
 RESULTS_FOLDER = os.path.join(os.getcwd(), "results")
-FACIAL_RESULTS_FILE = os.path.join(RESULTS_FOLDER, "facial_results.txt")
-FINGERPRINT_RESULTS_FILE = os.path.join(RESULTS_FOLDER, "fingerprint_results.txt")
-
-# Function to extract metrics from results file
-def extract_metrics(file_path):
-    metrics = {"accuracy": 0, "recall_time": 0, "f1_score": 0}
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
-        return metrics
-
-    with open(file_path, "r") as file:
-        for line in file:
-            line = line.strip().lower()
-            if "accuracy" in line:
-                metrics["accuracy"] = float(line.split(":")[1].strip().replace("%", ""))
-            elif "recall" in line:
-                metrics["recall_time"] = float(line.split(":")[1].strip().replace("s", ""))
-            elif "f1-score" in line:
-                metrics["f1_score"] = float(line.split(":")[1].strip())
-    return metrics
 
 # Extract metrics for facial and fingerprint recognition
-facial_metrics = extract_metrics(FACIAL_RESULTS_FILE)
-fingerprint_metrics = extract_metrics(FINGERPRINT_RESULTS_FILE)
+facial_metrics = summary_metrics("face")
+fingerprint_metrics = summary_metrics("fingerprint")
 
 # Generate comparison graphs
 def generate_comparison_graphs(facial_metrics, fingerprint_metrics):
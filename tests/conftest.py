@@ -0,0 +1,60 @@
+"""
+tests/conftest.py
+Shared fixtures: keep the process-wide caches, dataset catalog and metrics snapshot out of the repository's results/ folder,
+and build synthetic ridge prints for the fingerprint tests
+"""
+import cv2
+import numpy as np
+import pytest
+from biometrics import catalog, metrics
+from biometrics.cache import RESULT_CACHE
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(RESULT_CACHE, "disk_dir", str(tmp_path / "result-cache"))
+    monkeypatch.setattr(RESULT_CACHE, "_disk_bytes", None)
+    RESULT_CACHE.clear()
+    # get_catalog() builds a fresh catalog here; the env var covers shard worker subprocesses
+    db_path = str(tmp_path / "catalog.sqlite3")
+    monkeypatch.setenv("BIOMETRICS_CATALOG_DB", db_path)
+    monkeypatch.setattr(catalog, "CATALOG_DB", db_path)
+    monkeypatch.setattr(catalog, "_catalog", None)
+    monkeypatch.setattr(metrics, "METRICS_FILE", str(tmp_path / "metrics.json"))
+    yield
+    # Scheduled snapshot saves land in this test's tmp_path, not in a later test's
+    metrics.flush_metrics()
+    if catalog._catalog is not None:
+        catalog._catalog.close()
+
+
+def _ridge_print(index=0, count=1, shape=(160, 160), freq=0.15, noise=10.0, warp=0.0, seed=0):
+    """Sinusoidal ridges at angle pi*index/count and frequency freq*(1 + index/count), so every
+    print of a set differs in both; warp bends them into curves. Gaussian noise is seeded per print."""
+    rng = np.random.default_rng([seed, index])
+    yy, xx = np.mgrid[0:shape[0], 0:shape[1]].astype(float)
+    angle = np.pi * index / count
+    bend = warp * (np.sin(xx / 30) + np.cos(yy / 25))
+    img = 127 + 120 * np.sin(freq * (1 + index / count) * (xx * np.cos(angle) + yy * np.sin(angle) + bend))
+    return np.clip(img + rng.normal(0, noise, img.shape), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def ridge_print():
+    """The synthetic print generator: ridge_print(index=0, count=1, shape, freq, noise, warp, seed)."""
+    return _ridge_print
+
+
+@pytest.fixture
+def ridge_dataset(tmp_path):
+    """Factory writing `count` prints as <i>_a.bmp into folder (default tmp_path); returns the folder.
+
+    Keyword arguments go to the print generator.
+    """
+    def write(count=4, folder=None, **kwargs):
+        folder = tmp_path if folder is None else folder
+        folder.mkdir(parents=True, exist_ok=True)
+        for i in range(count):
+            cv2.imwrite(str(folder / f"{i}_a.bmp"), _ridge_print(i, count, **kwargs))
+        return folder
+    return write
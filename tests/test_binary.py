@@ -0,0 +1,31 @@
+"""
+tests/test_binary.py
+Unit tests for biometrics.binary and the fingerprint engine selection
+"""
+import numpy as np
+import pytest
+from biometrics import binary, fingerprint
+
+def test_popcount_matches_python_bit_count():
+    words = np.array([0, 1, 0xFF, 2 ** 63 + 5], dtype=np.uint64)
+    assert list(binary.popcount(words)) == [bin(int(w)).count("1") for w in words]
+
+
+def test_brief_code_is_packed_fixed_length(ridge_print):
+    code = binary.brief_code(ridge_print())
+    assert code.dtype == np.uint64
+    assert code.shape == (binary.CODE_WORDS,)
+
+
+def test_brief_scores_same_print_above_different_print(ridge_print):
+    probe = binary.brief_code(ridge_print(0, 2, warp=20))
+    same = binary.brief_code(ridge_print(0, 2, warp=20, noise=15, seed=1))
+    other = binary.brief_code(ridge_print(1, 2, warp=20))
+    scores = fingerprint.get_engine("brief").score_many(probe, np.vstack([same, other]))
+    assert scores[0] > scores[1]
+    assert fingerprint.get_engine("brief").score(probe, probe) == 1.0
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError):
+        fingerprint.get_engine("sift")
@@ -0,0 +1,49 @@
+"""
+tests/test_budget.py
+Unit tests for biometrics.budget
+"""
+import os
+import cv2
+from biometrics import budget
+
+
+def test_plan_splits_cores_between_workers():
+    plan = budget.plan_thread_budget(cores=16, workers=4)
+    assert plan["workers"] == 4
+    assert plan["threads_per_worker"] == 4
+    assert plan["workers"] * plan["opencv"] <= 16
+    assert plan["tf_inter_op"] == 1
+
+
+def test_plan_never_exceeds_cores():
+    plan = budget.plan_thread_budget(cores=2, workers=8)
+    assert plan["workers"] == 2
+    assert plan["threads_per_worker"] == 1
+
+
+def test_apply_sets_library_env_vars(monkeypatch):
+    # Route every process-wide setting through monkeypatch so later tests see the originals
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("MKL_NUM_THREADS", "3")
+    monkeypatch.setattr(budget, "_budget_env", set())
+    monkeypatch.setattr(budget, "_applied_budget", None)
+    monkeypatch.setattr(budget, "_blas_limiter", budget._blas_limiter)
+    assert budget.get_thread_budget() == budget.plan_thread_budget()
+    assert budget._applied_budget is None and "OMP_NUM_THREADS" not in os.environ
+    opencv_threads = cv2.getNumThreads()
+    plan = budget.plan_thread_budget(cores=4, workers=2)
+    try:
+        applied = budget.apply_thread_budget(plan)
+        assert applied == plan
+        assert budget.get_thread_budget() == plan
+        assert os.environ["TF_NUM_INTRAOP_THREADS"] == "2"
+        # The user's own setting wins, and a later budget updates only what a budget set
+        assert os.environ["OMP_NUM_THREADS"] == "2" and os.environ["MKL_NUM_THREADS"] == "3"
+        budget.apply_thread_budget(budget.plan_thread_budget(cores=4, workers=4))
+        assert os.environ["OMP_NUM_THREADS"] == "1" and os.environ["MKL_NUM_THREADS"] == "3"
+    finally:
+        if budget._blas_limiter is not None:
+            budget._blas_limiter.restore_original_limits()
+        cv2.setNumThreads(opencv_threads)
@@ -0,0 +1,77 @@
+"""
+tests/test_cache.py
+Unit tests for biometrics.cache
+"""
+import os
+import pickle
+import numpy as np
+from biometrics import cache
+from biometrics.cache import ResultCache, directory_version, result_key
+from biometrics.gallery import FingerprintGallery
+
+def test_result_key_depends_on_probe_params_and_version():
+    base = result_key("a", {"engine": "hog"}, "v1")
+    assert base == result_key("a", {"engine": "hog"}, "v1")
+    assert base != result_key("b", {"engine": "hog"}, "v1")
+    assert base != result_key("a", {"engine": "brief"}, "v1")
+    assert base != result_key("a", {"engine": "hog"}, "v2")
+
+
+def test_directory_version_changes_with_gallery(tmp_path):
+    (tmp_path / "1.bmp").write_bytes(b"one")
+    before = directory_version(str(tmp_path), (".bmp",), max_age=0)
+    (tmp_path / "notes.txt").write_text("ignored")
+    assert directory_version(str(tmp_path), (".bmp",), max_age=0) == before
+    (tmp_path / "2.bmp").write_bytes(b"two")
+    # Within max_age the previous catalog scan is reused
+    assert directory_version(str(tmp_path), (".bmp",), max_age=60) == before
+    assert directory_version(str(tmp_path), (".bmp",), max_age=0) != before
+
+
+def test_result_cache_evicts_and_reloads_from_disk(tmp_path):
+    store = ResultCache(max_entries=2, disk_dir=str(tmp_path))
+    for key in ("k1", "k2", "k3"):
+        store.put(key, [key])
+    assert len(store) == 2
+    assert store.get("k1") == ["k1"]
+    assert ResultCache(disk_dir=str(tmp_path)).get("k3") == ["k3"]
+    store.clear(disk=True)
+    assert store.get("k1") is None
+
+
+def test_disk_tier_deletes_least_recently_used_entries_past_its_bound(tmp_path):
+    entry_bytes = len(pickle.dumps(b"x" * 1000))
+    store = ResultCache(max_entries=1, disk_dir=str(tmp_path), max_disk_bytes=3 * entry_bytes)
+    for i, key in enumerate(("k1", "k2", "k3")):
+        store.put(key, b"x" * 1000)
+        os.utime(store._disk_path(key), ns=(i, i))
+    assert store.get("k1") == b"x" * 1000
+    store.put("k4", b"x" * 1000)
+    # k2 was least recently used: k1 was just read back from disk
+    assert not os.path.exists(store._disk_path("k2"))
+    assert all(os.path.exists(store._disk_path(key)) for key in ("k1", "k4"))
+    assert store._disk_bytes <= 3 * entry_bytes
+
+
+def test_gallery_search_image_served_from_cache_until_gallery_changes(ridge_dataset, monkeypatch):
+    monkeypatch.setattr(cache, "RESULT_CACHE", ResultCache(disk_dir=None))
+    monkeypatch.setattr("biometrics.gallery.RESULT_CACHE", cache.RESULT_CACHE)
+    dataset = ridge_dataset(noise=0)
+    gallery = FingerprintGallery.build(str(dataset), engine="brief", parallel=False)
+    probe = str(dataset / "1_a.bmp")
+    first = gallery.search_image(probe, top_k=2)
+    calls = []
+    monkeypatch.setattr(gallery.engine, "extract", lambda path: calls.append(path))
+    assert gallery.search_image(probe, top_k=2) == first
+    assert not calls
+    version = gallery.version
+    gallery.remove(first[0][0])
+    assert gallery.version != version
+    assert first[0][0] not in gallery.paths
+
+
+def test_gallery_version_survives_save_and_load(tmp_path):
+    gallery = FingerprintGallery(engine="hog")
+    gallery.add("a.bmp", np.ones(4, dtype=np.float32))
+    gallery.save(str(tmp_path / "g.npz"))
+    assert FingerprintGallery.load(str(tmp_path / "g.npz")).version == gallery.version
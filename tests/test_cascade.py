@@ -0,0 +1,48 @@
+"""
+tests/test_cascade.py
+Unit tests for biometrics.cascade and biometrics.texture
+"""
+import numpy as np
+from biometrics import texture
+from biometrics.cascade import CascadeGallery
+from biometrics.metrics import STAGE_SECONDS, _label_key
+
+def test_compact_features_layout():
+    img = np.random.default_rng(1).integers(0, 256, (120, 120), dtype=np.uint8)
+    features = texture.compact_features(img)
+    assert features.shape == (texture.COMPACT_WIDTH,)
+    assert abs(features[:-1].sum() - 1) < 1e-3
+    assert 0 <= features[-1] <= texture.MAX_CORNERS
+
+
+def test_cascade_prunes_to_candidate_budget_and_keeps_exact_match(ridge_dataset):
+    dataset = ridge_dataset(12, freq=0.1)
+    cascade = CascadeGallery.build(str(dataset), engine="hog", parallel=False, keep_fraction=0.25, min_candidates=2)
+    assert cascade.candidate_count() == 3
+    probe = str(dataset / "5_a.bmp")
+    assert len(cascade.prefilter(texture.compact_features_from_path(probe))) == 3
+    assert cascade.search_image(probe, top_k=1)[0][0] == probe
+
+
+def test_tradeoff_reports_recall_and_speedup(ridge_dataset):
+    dataset = ridge_dataset(12, freq=0.1)
+    cascade = CascadeGallery.build(str(dataset), engine="brief", parallel=False, min_candidates=1)
+    rows = cascade.tradeoff([str(dataset / "1_a.bmp"), str(dataset / "7_a.bmp")], keep_fractions=(0.1, 1.0))
+    assert [r["keep_fraction"] for r in rows] == [0.1, 1.0]
+    assert rows[1]["recall"] == 1.0
+    assert all(r["speedup"] > 0 for r in rows)
+
+
+def test_prints_without_compact_features_are_dropped(ridge_dataset):
+    dataset = ridge_dataset(12, freq=0.1)
+    cascade = CascadeGallery.build(str(dataset), engine="brief", parallel=False, keep_fraction=0.25, min_candidates=2)
+    probe = str(dataset / "5_a.bmp")
+    failed = [i for i, path in enumerate(cascade.full.paths) if path != probe]
+    cascade.compact[failed] = np.inf
+    assert list(cascade.prefilter(texture.compact_features_from_path(probe))) == [cascade.full.paths.index(probe)]
+    cascade.compact[:] = np.inf
+    key = _label_key({"stage": "cascade", "modality": "fingerprint"})
+    searches = STAGE_SECONDS.samples().get(key, {"count": 0})["count"]
+    assert cascade.search_image(probe) == []
+    assert STAGE_SECONDS.samples()[key]["count"] == searches + 1
+    assert cascade.tradeoff([probe], keep_fractions=(0.5,))[0]["recall"] == 0.0
@@ -0,0 +1,91 @@
+"""
+tests/test_catalog.py
+Unit tests for biometrics.catalog
+"""
+import hashlib
+import os
+import pytest
+from biometrics import catalog as catalog_module
+from biometrics.catalog import DatasetCatalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = DatasetCatalog(str(tmp_path / "catalog.sqlite3"))
+    yield catalog
+    catalog.close()
+
+
+def test_flat_layout_labels_from_prefix(tmp_path, catalog):
+    root = tmp_path / "prints"
+    root.mkdir()
+    for name in ("12_1.bmp", "12_2.bmp", "7_1.bmp", "readme.txt"):
+        (root / name).write_bytes(name.encode())
+    items = catalog.items(str(root), (".bmp",))
+    assert items == [(str(root / "12_1.bmp"), "12"), (str(root / "12_2.bmp"), "12"), (str(root / "7_1.bmp"), "7")]
+    assert catalog.digest(str(root / "7_1.bmp")) == hashlib.sha256(b"7_1.bmp").hexdigest()
+
+
+def test_class_layout_labels_from_folder(tmp_path, catalog):
+    for cls in ("alice", "bob"):
+        (tmp_path / "faces" / cls).mkdir(parents=True)
+        (tmp_path / "faces" / cls / "1.png").write_bytes(cls.encode())
+    (tmp_path / "faces" / "stray.png").write_bytes(b"top level")
+    root = str(tmp_path / "faces")
+    assert [label for _, label in catalog.items(root, (".png",))] == ["alice", "bob"]
+    assert catalog.files(root, (".png",)) == [os.path.join(root, "stray.png")]
+
+
+def test_rescan_only_touches_changed_files(tmp_path, catalog):
+    root = tmp_path / "prints"
+    root.mkdir()
+    for i in range(3):
+        (root / f"{i}_a.bmp").write_bytes(b"v1")
+    assert catalog.scan(str(root))["added"] == 3
+    assert catalog.scan(str(root)) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 3}
+    (root / "0_a.bmp").write_bytes(b"version 2")
+    (root / "1_a.bmp").unlink()
+    (root / "3_a.bmp").write_bytes(b"new")
+    assert catalog.scan(str(root)) == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+    assert catalog.digest(str(root / "0_a.bmp")) == hashlib.sha256(b"version 2").hexdigest()
+    assert len(catalog.files(str(root))) == 3
+
+
+def test_refresh_reuses_recent_scan_and_hashes_lazily(tmp_path, catalog, monkeypatch):
+    root = tmp_path / "prints"
+    root.mkdir()
+    (root / "1_a.bmp").write_bytes(b"one")
+    hashed = []
+    real_sha256 = catalog_module._sha256
+    monkeypatch.setattr(catalog_module, "_sha256", lambda path: hashed.append(path) or real_sha256(path))
+    assert catalog.refresh(str(root), max_age=60)
+    (root / "2_a.bmp").write_bytes(b"two")
+    assert not catalog.refresh(str(root), max_age=60)
+    assert len(catalog.files(str(root), max_age=60)) == 1
+    assert len(catalog.files(str(root))) == 2
+    assert not hashed
+    assert catalog.digest(str(root / "2_a.bmp")) == hashlib.sha256(b"two").hexdigest()
+    catalog.digest(str(root / "2_a.bmp"))
+    assert hashed == [str(root / "2_a.bmp")]
+
+
+def test_missing_root_raises(tmp_path, catalog):
+    with pytest.raises(FileNotFoundError):
+        catalog.scan(str(tmp_path / "missing"))
+
+
+def test_rows_of_deleted_roots_are_pruned(tmp_path):
+    db_path = str(tmp_path / "catalog.sqlite3")
+    kept, gone = tmp_path / "kept", tmp_path / "gone"
+    for root in (kept, gone):
+        root.mkdir()
+        (root / "1_a.bmp").write_bytes(b"x")
+        writer = DatasetCatalog(db_path)
+        writer.scan(str(root))
+        writer.close()
+    (gone / "1_a.bmp").unlink()
+    gone.rmdir()
+    reopened = DatasetCatalog(db_path)
+    roots = {root for (root,) in reopened._conn().execute("SELECT DISTINCT root FROM files")}
+    reopened.close()
+    assert roots == {str(kept)}
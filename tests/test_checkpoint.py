@@ -0,0 +1,78 @@
+"""
+tests/test_checkpoint.py
+Unit tests for biometrics.checkpoint
+"""
+import numpy as np
+import pytest
+from biometrics.checkpoint import CheckpointedBuild
+from biometrics.gallery import FingerprintGallery
+
+ITEMS = [(f"img_{i}.png", f"class_{i % 3}") for i in range(10)]
+
+
+def _feature(path):
+    return np.array([float(path.split("_")[1].split(".")[0])])
+
+
+def test_build_resumes_after_crash(tmp_path):
+    calls = []
+
+    def crashing(path):
+        calls.append(path)
+        if len(calls) == 8:
+            raise RuntimeError("killed")
+        return _feature(path)
+
+    with pytest.raises(RuntimeError):
+        CheckpointedBuild(str(tmp_path), chunk_size=3).run(ITEMS, crashing)
+    calls.clear()
+    X, y, paths = CheckpointedBuild(str(tmp_path), chunk_size=3).run(ITEMS, crashing)
+    # Chunks 0 and 1 were saved before the crash; only chunks 2 and 3 run again.
+    assert calls == [p for p, _ in ITEMS[6:]]
+    assert [float(x[0]) for x in X] == list(range(10))
+    assert y == [label for _, label in ITEMS]
+
+
+def test_changed_chunk_is_rebuilt_and_unreadable_images_skipped(tmp_path):
+    CheckpointedBuild(str(tmp_path), chunk_size=5).run(ITEMS, _feature)
+    calls = []
+
+    def extract(path):
+        calls.append(path)
+        return None if path == "img_12.png" else _feature(path)
+
+    items = ITEMS + [("img_10.png", "class_1"), ("img_11.png", "class_2"), ("img_12.png", "class_0")]
+    X, _, paths = CheckpointedBuild(str(tmp_path), chunk_size=5).run(items, extract)
+    assert calls == ["img_10.png", "img_11.png", "img_12.png"]
+    assert len(X) == 12 and "img_12.png" not in paths
+
+
+def test_image_rewritten_in_place_invalidates_its_chunk(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    items = [(str(images / f"img_{i}.png"), "a") for i in range(4)]
+    for path, _ in items:
+        with open(path, "wb") as f:
+            f.write(b"v1")
+    CheckpointedBuild(str(tmp_path / "ckpt"), chunk_size=2).run(items, lambda path: np.array([1.0]))
+    with open(items[3][0], "wb") as f:
+        f.write(b"version 2")
+    calls = []
+    X, _, _ = CheckpointedBuild(str(tmp_path / "ckpt"), chunk_size=2).run(items, lambda path: calls.append(path) or np.array([2.0]))
+    assert calls == [items[2][0], items[3][0]]
+    assert [float(x[0]) for x in X] == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_progress_reports_throughput_and_eta(tmp_path):
+    reports = []
+    CheckpointedBuild(str(tmp_path), chunk_size=4).run(ITEMS, _feature, progress=lambda *r: reports.append(r))
+    assert [done for done, total, _, _ in reports] == [4, 8, 10]
+    assert reports[-1][3] == 0
+
+
+def test_checkpointed_gallery_build_matches_plain_build(tmp_path, ridge_dataset):
+    dataset = ridge_dataset(5, folder=tmp_path / "prints", shape=(96, 96), noise=0)
+    plain = FingerprintGallery.build(str(dataset), engine="brief", parallel=False)
+    resumed = FingerprintGallery.build(str(dataset), engine="brief", checkpoint_dir=str(tmp_path / "ckpt"))
+    assert resumed.paths == plain.paths
+    assert np.array_equal(resumed.matrix(), plain.matrix())
@@ -0,0 +1,49 @@
+"""
+tests/test_enrollment.py
+Unit tests for biometrics.enrollment and incremental ProjectedKNN
+"""
+import pickle
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from biometrics.enrollment import enroll
+from biometrics.featurestore import FeatureStore
+from biometrics.neighbors import ProjectedKNN
+
+
+def _identities(labels, per_identity=4, dims=16, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.vstack([rng.normal(i * 3, 0.5, (per_identity, dims)) for i in range(len(labels))]).astype(np.float32)
+    return X, np.repeat(labels, per_identity)
+
+
+def test_partial_fit_adds_new_identities_like_a_full_fit():
+    X, y = _identities(["m", "n", "p", "a", "b"])
+    base = ProjectedKNN(n_neighbors=1, n_components=8).fit(X[:12], y[:12])
+    # "a" and "b" sort before the enrolled classes, so existing codes must be remapped
+    base.partial_fit(X[12:], y[12:])
+    assert base.classes_.tolist() == ["a", "b", "m", "n", "p"]
+    assert np.array_equal(base.predict(X), y)
+    for backend in ("brute", "ball_tree"):
+        model = ProjectedKNN(n_neighbors=1, backend=backend).fit(X[:8], y[:8]).partial_fit(X[8:], y[8:])
+        assert np.array_equal(model.predict(X), y)
+
+
+def test_enroll_updates_store_and_model(tmp_path):
+    X, y = _identities([f"id{i}" for i in range(6)])
+    for i, (model, method) in enumerate(((ProjectedKNN(n_neighbors=1), "partial_fit"),
+                                         (ProjectedKNN(n_neighbors=1, backend="ball_tree"), "index"),
+                                         (KNeighborsClassifier(n_neighbors=1), "index"),
+                                         (SVC(kernel="linear"), "refit"))):
+        store_dir, model_path = tmp_path / f"store{i}", tmp_path / f"model{i}.pkl"
+        store = FeatureStore()
+        store.extend(X[:20], y[:20])
+        store.save(str(store_dir))
+        with open(model_path, "wb") as f:
+            pickle.dump(model.fit(store.X, store.labels), f)
+
+        result = enroll(str(store_dir), str(model_path), X[20:], y[20:])
+        assert result["method"] == method and result["classes"] == 6
+        assert FeatureStore.load(str(store_dir)).labels.tolist() == y.tolist()
+        with open(model_path, "rb") as f:
+            assert np.array_equal(pickle.load(f).predict(X[20:]), y[20:])
@@ -0,0 +1,66 @@
+"""
+tests/test_evaluation.py
+Unit tests for biometrics.evaluation
+"""
+import math
+import tracemalloc
+import numpy as np
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from biometrics.evaluation import cross_validate_many, cross_validate_timed, select_cheapest, summarize, FOLD_COLUMNS
+
+
+def _dataset():
+    rng = np.random.default_rng(0)
+    X = np.vstack([rng.normal(i, 0.8, (20, 4)) for i in range(3)]).astype(np.float32)
+    y = np.repeat(["a", "b", "c"], 20)
+    return X, y
+
+
+def test_folds_match_cross_val_score_and_record_costs():
+    X, y = _dataset()
+    cv = StratifiedKFold(n_splits=3)
+    model = KNeighborsClassifier(n_neighbors=3)
+    expected = cross_val_score(model, X, y, cv=cv)
+    for n_jobs in (1, 2):
+        folds = cross_validate_timed(model, X, y, cv, name="knn", n_jobs=n_jobs)
+        assert [fold["fold"] for fold in folds] == [0, 1, 2]
+        assert np.allclose([fold["accuracy"] for fold in folds], expected)
+        for fold in folds:
+            assert set(FOLD_COLUMNS) <= set(fold)
+            assert fold["fit_seconds"] > 0 and fold["latency_ms"] > 0 and fold["peak_memory_mb"] > 0
+            assert fold["test_size"] == 20 and fold["train_size"] == 40
+    summary = summarize(folds)
+    assert summary["accuracy"] == np.mean(expected)
+    assert summary["peak_memory_mb"] == max(fold["peak_memory_mb"] for fold in folds)
+
+
+def test_select_cheapest_prefers_fast_models_within_tolerance():
+    def folds(accuracy, latency):
+        return [{"accuracy": accuracy, "fit_seconds": 1.0, "predict_seconds": 1.0, "latency_ms": latency,
+                 "model_mb": 1.0, "peak_memory_mb": 1.0}]
+    candidates = {"exact": folds(0.95, 1.0), "fast": folds(0.945, 0.1), "fastest": folds(0.80, 0.01)}
+    assert select_cheapest(candidates, tolerance=0.01) == "fast"
+    assert select_cheapest(candidates, tolerance=0.0) == "exact"
+
+
+class _TracingProbe(KNeighborsClassifier):
+    traced_fits = []
+
+    def fit(self, X, y):
+        self.traced_fits.append(tracemalloc.is_tracing())
+        return super().fit(X, y)
+
+
+def test_timings_are_measured_without_allocation_tracing():
+    X, y = _dataset()
+    cv = StratifiedKFold(n_splits=3)
+    folds = cross_validate_timed(_TracingProbe(n_neighbors=3), X, y, cv, n_jobs=1)
+    # Each fold: one untraced (timed) fit, then one traced fit for peak memory
+    assert _TracingProbe.traced_fits == [False, True] * 3
+    assert all(fold["peak_memory_mb"] > 0 for fold in folds)
+    _TracingProbe.traced_fits.clear()
+    untraced = cross_validate_many({"knn": _TracingProbe(n_neighbors=3)}, X, y, cv, n_jobs=1, measure_memory=False)["knn"]
+    assert _TracingProbe.traced_fits == [False] * 3
+    assert all(math.isnan(fold["peak_memory_mb"]) for fold in untraced)
+    assert math.isnan(summarize(untraced)["peak_memory_mb"])
@@ -2,6 +2,7 @@
 tests/test_face.py
 Unit tests for biometrics.face
 """
+import asyncio
 import os
 import pytest
 from biometrics import face
@@ -23,3 +24,10 @@ def test_find_most_similar_handles_invalid_image(tmp_path):
     result, elapsed = face.find_most_similar(str(dummy), str(dataset))
     assert result is None or isinstance(result, dict)
     assert isinstance(elapsed, float)
+
+def test_find_most_similar_async_empty_dataset(tmp_path):
+    dataset = tmp_path / "faces"
+    dataset.mkdir()
+    result, elapsed = asyncio.run(face.find_most_similar_async("nonexistent.jpg", str(dataset)))
+    assert result is None
+    assert isinstance(elapsed, float)
@@ -0,0 +1,72 @@
+"""
+tests/test_featurecache.py
+Unit tests for biometrics.featurecache
+"""
+import os
+import cv2
+import numpy as np
+from biometrics.featurecache import FeatureCache
+from biometrics.imagepack import pack_folder
+
+
+def _write_dataset(folder, count=4):
+    folder.mkdir()
+    for i in range(count):
+        (folder / f"{i % 2}_{i}.bmp").write_bytes(bytes([i]) * 16)
+    return folder
+
+
+def _builder(calls):
+    def build():
+        calls.append(1)
+        return [np.full(3, float(len(calls)))], ["0"]
+    return build
+
+
+def test_fetch_reuses_features_until_dataset_or_extractor_changes(tmp_path):
+    dataset = _write_dataset(tmp_path / "prints")
+    cache = FeatureCache(str(tmp_path / "features"))
+    calls = []
+    X, y = cache.fetch("fp:v1", str(dataset), _builder(calls))
+    X2, y2 = cache.fetch("fp:v1", str(dataset), _builder(calls))
+    assert len(calls) == 1
+    assert np.array_equal(X2[0], X[0]) and y2 == y == ["0"]
+
+    cache.fetch("fp:v2", str(dataset), _builder(calls))
+    assert len(calls) == 2
+    (dataset / "0_0.bmp").write_bytes(b"rewritten")
+    cache.fetch("fp:v1", str(dataset), _builder(calls))
+    assert len(calls) == 3
+    os.remove(dataset / "1_3.bmp")
+    cache.fetch("fp:v1", str(dataset), _builder(calls))
+    assert len(calls) == 4
+
+
+def test_pack_datasets_keyed_by_pack_file(tmp_path):
+    folder = tmp_path / "prints"
+    folder.mkdir()
+    cv2.imwrite(str(folder / "0_a.bmp"), np.zeros((8, 8), np.uint8))
+    pack = str(tmp_path / "prints.pack")
+    pack_folder(str(folder), pack)
+    cache = FeatureCache(str(tmp_path / "features"))
+    key = cache.key("fp:v1", pack)
+    assert cache.key("fp:v1", pack) == key
+    os.utime(pack, ns=(0, 0))
+    assert cache.key("fp:v1", pack) != key
+    assert cache.load(key) is None
+
+
+def test_save_drops_older_versions_of_the_same_dataset(tmp_path):
+    dataset = _write_dataset(tmp_path / "prints")
+    other = _write_dataset(tmp_path / "others")
+    cache = FeatureCache(str(tmp_path / "features"))
+    calls = []
+    cache.fetch("fp:v1", str(dataset), _builder(calls))
+    cache.fetch("fp:v1", str(other), _builder(calls))
+    cache.fetch("fp:v2", str(dataset), _builder(calls))
+    old_key, v2_key = cache.key("fp:v1", str(dataset)), cache.key("fp:v2", str(dataset))
+    (dataset / "0_0.bmp").write_bytes(b"rewritten")
+    cache.fetch("fp:v1", str(dataset), _builder(calls))
+    assert cache.load(old_key) is None
+    kept = [cache.key("fp:v1", str(dataset)), cache.key("fp:v1", str(other)), v2_key]
+    assert sorted(os.listdir(tmp_path / "features")) == sorted(f"{key}.npz" for key in kept)
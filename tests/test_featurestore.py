@@ -0,0 +1,62 @@
+"""
+tests/test_featurestore.py
+Unit tests for biometrics.featurestore
+"""
+import os
+import numpy as np
+import pytest
+from biometrics.featurestore import FeatureStore
+
+
+def test_append_and_extend_grow_past_capacity():
+    store = FeatureStore(capacity=2)
+    for i in range(5):
+        store.append(np.full(3, i, dtype=np.float64), f"c{i % 2}")
+    store.extend([np.full(3, 5.0), np.full(3, 6.0)], ["c1", "c2"])
+    store.extend(np.full((3, 3), 7.0), ["c2"] * 3)
+    assert len(store) == 10 and store.X.dtype == np.float32
+    assert store.X[:, 0].tolist() == [0, 1, 2, 3, 4, 5, 6, 7, 7, 7]
+    assert store.classes == ["c0", "c1", "c2"]
+    assert store.labels.tolist() == ["c0", "c1", "c0", "c1", "c0", "c1", "c2", "c2", "c2", "c2"]
+    with pytest.raises(ValueError):
+        store.append(np.zeros(4), "c0")
+
+
+def test_extend_into_empty_store_copies_the_callers_array():
+    X = np.ones((4, 2), dtype=np.float32)
+    store = FeatureStore()
+    store.extend(X, ["a", "b", "a", "b"])
+    assert not np.shares_memory(store.X, X)
+    X[:] = 0
+    store.keep(store.labels == "a")
+    assert store.X.tolist() == [[1, 1], [1, 1]] and X.sum() == 0
+
+
+def test_filter_classes_compacts_in_place():
+    store = FeatureStore(width=2)
+    labels = ["a", "b", "a", "c", "b", "a"] * 2000 + ["lonely"]
+    store.extend(np.arange(len(labels) * 2, dtype=np.float32).reshape(-1, 2), labels)
+    buffer = store.X.base
+    assert store.filter_classes(min_samples=2) == len(labels) - 1
+    assert "lonely" not in store.labels and store.X.base is buffer
+    store.keep(store.labels != "b")
+    expected = [i for i, label in enumerate(labels) if label in ("a", "c")]
+    assert store.X[:, 0].tolist() == [2.0 * i for i in expected]
+    assert store.class_counts().tolist() == [6000, 0, 2000, 0]
+    assert FeatureStore().filter_classes(2) == 0
+
+
+def test_save_appends_segments_and_rewrites_after_filter(tmp_path):
+    directory = str(tmp_path / "store")
+    store = FeatureStore()
+    store.extend(np.ones((4, 3), dtype=np.float32), ["a", "a", "b", "c"])
+    assert store.save(directory) == 4 and store.save(directory) == 0
+    store.append(np.full(3, 2.0), "d")
+    assert store.save(directory) == 1
+    loaded = FeatureStore.load(directory)
+    assert loaded.labels.tolist() == ["a", "a", "b", "c", "d"] and loaded.X[-1, 0] == 2.0
+    assert sorted(os.listdir(directory)) == ["manifest.json", "segment_00000.npz", "segment_00001.npz"]
+    loaded.filter_classes(2)
+    assert loaded.save(directory) == 2
+    assert sorted(os.listdir(directory)) == ["manifest.json", "segment_00002.npz"]
+    assert FeatureStore.load(directory).labels.tolist() == ["a", "a"]
@@ -2,6 +2,7 @@
 tests/test_fingerprint.py
 Unit tests for biometrics.fingerprint
 """
+import asyncio
 import os
 import pytest
 from biometrics import fingerprint
@@ -17,3 +18,9 @@ def test_compare_fingerprints_empty_dataset(tmp_path):
     # Should not raise, but return None
     result = fingerprint.compare_fingerprints("nonexistent.bmp", str(dataset), None)
     assert result is None or result is None
+
+def test_compare_fingerprints_async_invalid_probe(tmp_path):
+    dataset = tmp_path / "prints"
+    dataset.mkdir()
+    result = asyncio.run(fingerprint.compare_fingerprints_async("nonexistent.bmp", str(dataset)))
+    assert result is None
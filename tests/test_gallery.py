@@ -0,0 +1,38 @@
+"""
+tests/test_gallery.py
+Unit tests for biometrics.gallery
+"""
+import pytest
+from biometrics import gallery as gallery_module
+from biometrics.config import FINGERPRINT_QUALITY_FLOOR
+from biometrics.gallery import FingerprintGallery
+from biometrics.quality import LowQualityError
+
+@pytest.mark.parametrize("engine", ["hog", "brief"])
+def test_gallery_search_finds_probe_first(ridge_dataset, engine):
+    dataset = ridge_dataset()
+    gallery = FingerprintGallery.build(str(dataset), engine=engine, parallel=False)
+    assert len(gallery) == 4
+    results = gallery.search_image(str(dataset / "2_a.bmp"), top_k=2)
+    assert results[0][0].endswith("2_a.bmp")
+    assert results[0][1] >= results[1][1]
+
+
+def test_gallery_matrix_refreshes_after_add(ridge_dataset):
+    gallery = FingerprintGallery.build(str(ridge_dataset(2)), engine="brief", parallel=False)
+    assert gallery.matrix().shape[0] == 2
+    gallery.add("extra.bmp", gallery.templates[0])
+    assert gallery.matrix().shape[0] == 3
+
+
+def test_search_image_cache_key_uses_the_effective_quality_floor(ridge_dataset, monkeypatch):
+    dataset = ridge_dataset()
+    gallery = FingerprintGallery.build(str(dataset), engine="brief", parallel=False)
+    probe = str(dataset / "1_a.bmp")
+    expected = gallery.search_image(probe)
+    # The explicit default floor hits the entry cached with quality_floor=None
+    assert gallery.search_image(probe, quality_floor=FINGERPRINT_QUALITY_FLOOR) == expected
+    # Raising the configured floor misses it and re-checks the probe
+    monkeypatch.setattr(gallery_module, "FINGERPRINT_QUALITY_FLOOR", 1.1)
+    with pytest.raises(LowQualityError):
+        gallery.search_image(probe)
@@ -0,0 +1,59 @@
+"""
+tests/test_imagepack.py
+Unit tests for biometrics.imagepack
+"""
+import cv2
+import numpy as np
+import pytest
+from biometrics.gallery import FingerprintGallery
+from biometrics.imagepack import ImagePack, is_pack, pack_folder
+
+def test_pack_round_trips_flat_folder(tmp_path, ridge_dataset):
+    folder = ridge_dataset(folder=tmp_path / "prints", shape=(96, 80), noise=0)
+    (folder / "notes.txt").write_text("skip me")
+    out = str(tmp_path / "prints.pack")
+    assert pack_folder(str(folder), out) == 4
+    pack = ImagePack(out)
+    assert is_pack(out) and len(pack) == 4
+    assert pack.items()[1] == ("1_a.bmp", "1")
+    expected = cv2.imread(str(folder / "2_a.bmp"), cv2.IMREAD_GRAYSCALE)
+    assert np.array_equal(pack.image("2_a.bmp"), expected)
+    assert pack.source_path("2_a.bmp") == str(folder / "2_a.bmp")
+
+
+def test_pack_class_folders_resized_and_colour(tmp_path):
+    for cls in ("alice", "bob"):
+        (tmp_path / "faces" / cls).mkdir(parents=True)
+        cv2.imwrite(str(tmp_path / "faces" / cls / "1.png"), np.full((50, 40, 3), 200, np.uint8))
+    out = str(tmp_path / "faces.pack")
+    pack_folder(str(tmp_path / "faces"), out, size=(32, 32), color=True)
+    pack = ImagePack(out)
+    assert pack.labels == ["alice", "bob"]
+    assert pack.image(0).shape == (32, 32, 3)
+
+
+def test_rejects_non_pack_files(tmp_path):
+    path = tmp_path / "bad.pack"
+    path.write_bytes(b"not a pack at all")
+    with pytest.raises(ValueError):
+        ImagePack(str(path))
+
+
+def test_gallery_built_from_pack_matches_folder_build(tmp_path, ridge_dataset):
+    folder = ridge_dataset(folder=tmp_path / "prints", shape=(96, 80), noise=0)
+    pack_folder(str(folder), str(tmp_path / "prints.pack"))
+    plain = FingerprintGallery.build(str(folder), engine="hog", parallel=False)
+    packed = FingerprintGallery.build(str(tmp_path / "prints.pack"), engine="hog")
+    assert packed.paths == plain.paths
+    assert np.allclose(packed.matrix(), plain.matrix())
+
+
+def test_gallery_from_colour_pack_uses_fingerprint_extensions_only(tmp_path, ridge_dataset):
+    folder = ridge_dataset(folder=tmp_path / "prints", shape=(96, 80), noise=0)
+    cv2.imwrite(str(folder / "9_a.png"), cv2.imread(str(folder / "0_a.bmp")))
+    pack_folder(str(folder), str(tmp_path / "prints.pack"), color=True)
+    plain = FingerprintGallery.build(str(folder), engine="hog", parallel=False)
+    packed = FingerprintGallery.build(str(tmp_path / "prints.pack"), engine="hog")
+    assert len(plain) == 4
+    assert packed.paths == plain.paths
+    assert np.allclose(packed.matrix(), plain.matrix())
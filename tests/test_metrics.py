@@ -0,0 +1,60 @@
+"""
+tests/test_metrics.py
+Unit tests for biometrics.metrics
+"""
+import json
+from biometrics import metrics
+
+
+def test_histogram_prometheus_export_is_cumulative():
+    registry = metrics.MetricsRegistry()
+    hist = registry.histogram("stage_seconds", "Stage latency", buckets=(0.1, 1.0))
+    hist.observe(0.05, stage="decode")
+    hist.observe(0.5, stage="decode")
+    text = registry.to_prometheus()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+    assert 'stage_seconds_count{stage="decode"} 2' in text
+
+
+def test_counter_and_gauge_json_export():
+    registry = metrics.MetricsRegistry()
+    registry.counter("comparisons_total").inc(outcome="ok")
+    registry.counter("comparisons_total").inc(2, outcome="ok")
+    registry.gauge("recall_time_seconds").set(1.5, modality="face")
+    data = json.loads(registry.to_json())
+    assert data["comparisons_total"]["samples"] == [{"labels": {"outcome": "ok"}, "value": 3.0}]
+    assert data["recall_time_seconds"]["samples"][0]["value"] == 1.5
+
+
+def test_summary_metrics_merges_runs_from_separate_processes(tmp_path):
+    path = str(tmp_path / "metrics.json")
+    face_registry = metrics.MetricsRegistry()
+    face_registry.gauge(metrics.RECALL_TIME.name).set(2.0, modality="face")
+    face_registry.save(path)
+    fp_registry = metrics.MetricsRegistry()
+    fp_registry.gauge(metrics.RECALL_TIME.name).set(0.5, modality="fingerprint")
+    fp_registry.save(path)
+    assert metrics.summary_metrics("face", path)["recall_time"] == 2.0
+    assert metrics.summary_metrics("fingerprint", path)["recall_time"] == 0.5
+
+
+def test_summary_metrics_missing_file(tmp_path):
+    summary = metrics.summary_metrics("face", str(tmp_path / "missing.json"))
+    assert summary == {"accuracy": 0, "recall_time": 0, "f1_score": 0}
+
+
+def test_record_run_saves_off_the_request_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_SAVE_SECONDS", 60)
+    path = str(tmp_path / "metrics.json")
+    metrics.record_run("face", 90.0, 1.25, 0.9, path)
+    metrics.record_run("fingerprint", 80.0, 0.5, 0.8, path)
+    assert metrics.load_snapshot(path) == {}
+    metrics.flush_metrics()
+    assert metrics.summary_metrics("face", path)["recall_time"] == 1.25
+    assert metrics.summary_metrics("fingerprint", path)["accuracy"] == 80.0
+    # Defaults follow METRICS_FILE, which tests/conftest.py points at tmp_path
+    metrics.record_run("face", 70.0, 2.0, 0.7)
+    metrics.flush_metrics()
+    assert metrics.summary_metrics("face")["accuracy"] == 70.0
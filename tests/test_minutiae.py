@@ -0,0 +1,77 @@
+"""
+tests/test_minutiae.py
+Unit tests for biometrics.minutiae
+"""
+import cv2
+import numpy as np
+from biometrics import minutiae
+
+
+def _minutiae_print(ridge_print, seed):
+    # Binarised curved ridges, with blobs that break and join them into endings and bifurcations
+    img = ((ridge_print(seed, 8, shape=(200, 200), freq=0.35, noise=0, warp=6) > 127) * 255).astype(np.uint8)
+    rng = np.random.default_rng(seed)
+    for _ in range(30):
+        x, y = rng.integers(20, 180, 2)
+        cv2.circle(img, (int(x), int(y)), 2, int(rng.choice([0, 255])), -1)
+    return cv2.GaussianBlur(img, (3, 3), 0.8)
+
+
+def _rotated(img, degrees):
+    matrix = cv2.getRotationMatrix2D((100, 100), degrees, 1.0)
+    matrix[:, 2] += [4, -3]
+    return cv2.warpAffine(img, matrix, (200, 200), borderValue=0)
+
+
+def test_extracts_endings_and_bifurcations(ridge_print):
+    found = minutiae.extract_minutiae(_minutiae_print(ridge_print, 0))
+    assert found.shape[1] == 4
+    assert len(found) >= 5
+    assert set(np.unique(found[:, 3])) <= {minutiae.ENDING, minutiae.BIFURCATION}
+    assert np.all((found[:, 2] >= 0) & (found[:, 2] < np.pi))
+
+
+def test_triplet_keys_are_rotation_and_translation_invariant(ridge_print):
+    original = set(minutiae.triplet_keys(minutiae.extract_minutiae(_minutiae_print(ridge_print, 1))))
+    moved = set(minutiae.triplet_keys(minutiae.extract_minutiae(_rotated(_minutiae_print(ridge_print, 1), 15))))
+    unrelated = set(minutiae.triplet_keys(minutiae.extract_minutiae(_minutiae_print(ridge_print, 2))))
+    assert len(original & moved) > len(original & unrelated)
+
+
+def test_index_votes_for_rotated_probe_and_honours_remove(tmp_path, ridge_print):
+    for seed in range(8):
+        cv2.imwrite(str(tmp_path / f"{seed}_a.bmp"), _minutiae_print(ridge_print, seed))
+    index = minutiae.MinutiaeIndex.build(str(tmp_path), parallel=False)
+    probe_keys = minutiae.triplet_keys(minutiae.extract_minutiae(_rotated(_minutiae_print(ridge_print, 3), 10)))
+    assert index.query(probe_keys, top_k=1)[0][0].endswith("3_a.bmp")
+
+    saved = tmp_path / "index.npz"
+    index.remove(str(tmp_path / "3_a.bmp"))
+    # Buckets are compacted: no empty lists and no ids past the 7 remaining templates
+    assert all(index.postings.values())
+    assert max(tid for ids in index.postings.values() for tid in ids) == 6
+    index.save(str(saved))
+    reloaded = minutiae.MinutiaeIndex.load(str(saved))
+    assert len(reloaded) == 7
+    assert reloaded.postings == index.postings
+    assert all(not path.endswith("3_a.bmp") for path, _ in reloaded.query(probe_keys, top_k=8))
+    # Later templates were renumbered, so their own probes still find them
+    probe_keys = minutiae.triplet_keys(minutiae.extract_minutiae(_minutiae_print(ridge_print, 5)))
+    assert reloaded.query(probe_keys, top_k=1)[0][0].endswith("5_a.bmp")
+
+
+def test_empty_index_round_trips(tmp_path):
+    index = minutiae.MinutiaeIndex()
+    index.add("blank.bmp", [])
+    index.save(str(tmp_path / "empty.npz"))
+    reloaded = minutiae.MinutiaeIndex.load(str(tmp_path / "empty.npz"))
+    assert reloaded.paths == ["blank.bmp"] and reloaded.key_counts == [0]
+    assert not reloaded.postings and reloaded.query([(1,) * 9]) == []
+
+
+def test_scores_count_distinct_keys():
+    index = minutiae.MinutiaeIndex()
+    key = (1, 2, 3, 0, 1, 0, 1, 0, 3)
+    index.add("a.bmp", [key, key])
+    assert index.key_counts == [1]
+    assert index.query([key, key]) == [("a.bmp", 1.0)]
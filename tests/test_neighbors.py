@@ -0,0 +1,39 @@
+"""
+tests/test_neighbors.py
+Unit tests for biometrics.neighbors
+"""
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.neighbors import KNeighborsClassifier
+from biometrics.evaluation import model_size
+from biometrics.neighbors import ProjectedKNN
+
+
+def _dataset(dims=64):
+    rng = np.random.default_rng(0)
+    centres = rng.normal(0, 1, (5, dims))
+    X = np.vstack([c + rng.normal(0, 0.7, (30, dims)) for c in centres]).astype(np.float32)
+    return X, np.repeat([f"id{i}" for i in range(5)], 30)
+
+
+def test_backends_agree_with_sklearn_on_raw_features(monkeypatch):
+    X, y = _dataset()
+    train, test = np.arange(0, 150, 2), np.arange(1, 150, 2)
+    expected = KNeighborsClassifier(n_neighbors=3).fit(X[train], y[train]).predict(X[test])
+    # Force several query blocks in the brute-force path
+    monkeypatch.setattr("biometrics.neighbors.BRUTE_BLOCK_ENTRIES", 7 * len(train))
+    for backend in ("brute", "ball_tree"):
+        model = clone(ProjectedKNN(n_neighbors=3, backend=backend)).fit(X[train], y[train])
+        assert np.array_equal(model.predict(X[test]), expected)
+
+
+def test_pca_shrinks_model_and_keeps_accuracy():
+    X, y = _dataset(dims=256)
+    raw = ProjectedKNN(n_neighbors=3).fit(X[::2], y[::2])
+    reduced = ProjectedKNN(n_neighbors=3, n_components=16, whiten=True).fit(X[::2], y[::2])
+    assert reduced._fit_X.shape == (75, 16)
+    assert model_size(reduced) < model_size(raw) / 2
+    assert reduced.score(X[1::2], y[1::2]) >= raw.score(X[1::2], y[1::2]) - 0.02
+    with pytest.raises(ValueError):
+        ProjectedKNN(backend="kd").fit(X, y)
@@ -0,0 +1,51 @@
+"""
+tests/test_parallel.py
+Unit tests for biometrics.parallel
+"""
+import asyncio
+import threading
+import time
+import pytest
+from biometrics import parallel
+
+
+def _square(x):
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+def test_parallel_map_async_preserves_order_and_isolates_failures():
+    results = asyncio.run(parallel.parallel_map_async(_square, [3, -1, 2]))
+    assert results == [9, None, 4]
+
+
+def test_parallel_map_async_can_be_gathered():
+    async def both():
+        return await asyncio.gather(
+            parallel.parallel_map_async(_square, [1, 2]),
+            parallel.run_async(_square, 5),
+        )
+    assert asyncio.run(both()) == [[1, 4], 25]
+
+
+def test_parallel_map_async_cancel_skips_pending_items():
+    started = []
+    release = threading.Event()
+
+    def slow(x):
+        started.append(x)
+        release.wait(1)
+        return x
+
+    async def cancel_scan():
+        task = asyncio.ensure_future(parallel.parallel_map_async(slow, list(range(50))))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_scan())
+    release.set()
+    time.sleep(0.05)
+    assert len(started) < 50
@@ -0,0 +1,65 @@
+"""
+tests/test_pipeline.py
+Unit tests for biometrics.pipeline
+"""
+import random
+import time
+import pytest
+from biometrics.pipeline import Pipeline
+
+
+def _jitter(x):
+    time.sleep(random.random() * 0.002)
+    return x
+
+
+def test_results_arrive_in_input_order_and_failures_are_skipped():
+    def compute(x):
+        if x == 3:
+            raise ValueError("bad image")
+        return _jitter(x * 10)
+
+    pipeline = Pipeline(lambda x: None if x == 5 else _jitter(x), compute, readers=3, workers=3, queue_size=2)
+    seen = []
+    written = pipeline.run(range(8), lambda item, result: seen.append((item, result)))
+    assert seen == [(i, i * 10) for i in range(8) if i not in (3, 5)]
+    assert written == 6
+    assert pipeline.map(range(6)) == [0, 10, 20, None, 40, None]
+
+
+def test_reads_overlap_compute():
+    pipeline = Pipeline(lambda x: time.sleep(0.01) or x, lambda x: time.sleep(0.01) or x, readers=2, workers=1)
+    start = time.perf_counter()
+    assert pipeline.map(range(20)) == list(range(20))
+    # Sequential would take 20 * (10 + 10) ms; overlapped, compute alone bounds it.
+    assert time.perf_counter() - start < 0.35
+
+
+def test_occupancy_points_at_the_slow_stage():
+    slow_compute = Pipeline(lambda x: x, lambda x: time.sleep(0.005) or x, readers=1, workers=1, queue_size=4)
+    slow_compute.map(range(30))
+    slow_read = Pipeline(lambda x: time.sleep(0.005) or x, lambda x: x, readers=1, workers=1, queue_size=4)
+    slow_read.map(range(30))
+    assert slow_compute.occupancy["decoded"] > 0.5
+    assert slow_read.occupancy["decoded"] < 0.25
+
+
+def test_sink_error_stops_the_stages():
+    pipeline = Pipeline(lambda x: x, lambda x: x, queue_size=1)
+
+    def sink(item, result):
+        if item == 2:
+            raise RuntimeError("store full")
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(range(1000), sink)
+
+
+def test_failing_item_iterator_is_raised_instead_of_hanging():
+    def items():
+        yield from range(5)
+        raise OSError("dataset unmounted")
+
+    pipeline = Pipeline(lambda x: x, lambda x: x, readers=2, workers=2, queue_size=2)
+    with pytest.raises(OSError, match="unmounted"):
+        pipeline.run(items(), lambda item, result: None)
@@ -0,0 +1,55 @@
+"""
+tests/test_projection.py
+Unit tests for biometrics.projection and compressed galleries
+"""
+import numpy as np
+import pytest
+from biometrics import projection
+from biometrics.gallery import FingerprintGallery
+
+
+def _low_rank(n=60, dims=500, rank=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((n, rank)) @ rng.standard_normal((rank, dims))).astype(np.float32)
+
+
+def test_pca_keeps_distances_of_low_rank_data():
+    data = _low_rank()
+    pca = projection.fit_projection(data, "pca", n_components=8)
+    projected = pca.transform(data)
+    assert projected.shape == (60, 8)
+    original = np.linalg.norm(data[0] - data[1])
+    assert np.isclose(np.linalg.norm(projected[0] - projected[1]), original, rtol=1e-3)
+
+
+def test_random_projection_shape_and_unknown_method():
+    rp = projection.fit_projection(_low_rank(), "random", n_components=32)
+    assert rp.transform(_low_rank()[0]).shape == (32,)
+    with pytest.raises(ValueError):
+        projection.fit_projection(_low_rank(), "umap")
+
+
+def test_compressed_gallery_roundtrip(tmp_path):
+    gallery = FingerprintGallery(engine="hog")
+    data = _low_rank()
+    for i, row in enumerate(data):
+        gallery.add(f"{i}.bmp", row)
+    gallery.compress("pca", n_components=16)
+    assert gallery.matrix().shape == (60, 16)
+    # Probes are raw engine templates; the gallery projects them itself.
+    assert gallery.search(data[7], top_k=1)[0][0] == "7.bmp"
+
+    path = str(tmp_path / "gallery.npz")
+    gallery.save(path)
+    loaded = FingerprintGallery.load(path)
+    assert loaded.projection.method == "pca"
+    assert loaded.search(data[7], top_k=1)[0][0] == "7.bmp"
+    loaded.add("new.bmp", data[3])
+    assert loaded.matrix().shape == (61, 16)
+
+
+def test_binary_gallery_cannot_be_compressed():
+    gallery = FingerprintGallery(engine="brief")
+    gallery.add("a.bmp", np.zeros(4, dtype=np.uint64))
+    with pytest.raises(ValueError):
+        gallery.compress()
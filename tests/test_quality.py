@@ -0,0 +1,45 @@
+"""
+tests/test_quality.py
+Unit tests for biometrics.quality and the probe quality gate
+"""
+import cv2
+import numpy as np
+import pytest
+from biometrics import quality, fingerprint
+
+def _clean_print(ridge_print):
+    return ridge_print(shape=(200, 200), freq=0.45, noise=0)
+
+
+def test_ridged_print_scores_above_blank_smudged_and_noise(ridge_print):
+    good = quality.fingerprint_quality(_clean_print(ridge_print))["score"]
+    blank = quality.fingerprint_quality(np.full((200, 200), 200, np.uint8))["score"]
+    smudged = quality.fingerprint_quality(cv2.GaussianBlur(_clean_print(ridge_print), (31, 31), 12))["score"]
+    noise = quality.fingerprint_quality(np.random.default_rng(0).integers(0, 256, (200, 200)).astype(np.uint8))["score"]
+    assert good > 0.7
+    assert blank == 0.0
+    assert max(smudged, noise) < 0.2
+
+
+def test_gate_rejects_blank_probe_before_matching(tmp_path):
+    probe = tmp_path / "blank.bmp"
+    cv2.imwrite(str(probe), np.full((200, 200), 200, np.uint8))
+    with pytest.raises(quality.LowQualityError):
+        quality.check_probe_quality(str(probe), floor=0.2)
+    gallery = tmp_path / "prints"
+    gallery.mkdir()
+    messages = []
+    fingerprint.compare_fingerprints(str(probe), str(gallery), messages.append, parallel=False)
+    assert any("below the floor" in m for m in messages)
+
+
+def test_gate_uses_a_score_the_caller_already_computed(tmp_path, ridge_print, monkeypatch):
+    probe = tmp_path / "ridges.bmp"
+    cv2.imwrite(str(probe), _clean_print(ridge_print))
+    gallery = tmp_path / "prints"
+    gallery.mkdir()
+    monkeypatch.setattr(quality, "quality_from_path", lambda path: pytest.fail("probe quality recomputed"))
+    assert quality.check_probe_quality(str(probe), floor=0.2, score=0.9) == {"score": 0.9}
+    messages = []
+    fingerprint.compare_fingerprints(str(probe), str(gallery), messages.append, parallel=False, probe_quality=0.05)
+    assert any("below the floor" in m for m in messages)
@@ -0,0 +1,77 @@
+"""
+tests/test_reload.py
+Unit tests for biometrics.reload
+"""
+import threading
+from biometrics.reload import LiveGallery
+
+
+class _FakeGallery:
+    def __init__(self, label, size=1):
+        self.label = label
+        self.size = size
+        self.closed = False
+
+    def __len__(self):
+        return self.size
+
+    def search(self, probe, top_k=5):
+        return [(self.label, 1.0)]
+
+    def close(self):
+        self.closed = True
+
+
+def test_reload_swaps_new_version_in():
+    builds = iter(["v1", "v2"])
+    live = LiveGallery(lambda: _FakeGallery(next(builds)))
+    assert live.search(None) == [("v1", 1.0)]
+    assert live.reload()
+    assert live.version == 2
+    assert live.search(None) == [("v2", 1.0)]
+
+
+def test_in_flight_search_finishes_on_old_version_before_release():
+    old = _FakeGallery("old")
+    live = LiveGallery(lambda: old)
+    with live.acquire() as pinned:
+        assert live.reload(lambda: _FakeGallery("new"))
+        assert live.search(None) == [("new", 1.0)]
+        assert pinned is old and not old.closed
+    assert old.closed
+
+
+def test_invalid_or_failing_build_keeps_serving_old_version():
+    live = LiveGallery(lambda: _FakeGallery("v1"))
+    assert not live.reload(lambda: _FakeGallery("empty", size=0))
+
+    def broken():
+        raise OSError("dataset unavailable")
+
+    assert not live.reload(broken)
+    assert live.version == 1
+    assert live.search(None) == [("v1", 1.0)]
+
+
+def test_searches_never_fail_during_repeated_reloads():
+    live = LiveGallery(lambda: _FakeGallery("g"))
+    errors = []
+    stop = threading.Event()
+
+    def searcher():
+        while not stop.is_set():
+            try:
+                assert live.search(None)[0][0] == "g"
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=searcher) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(50):
+        live.reload()
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert live.version == 51
@@ -0,0 +1,111 @@
+"""
+tests/test_shards.py
+Unit tests for biometrics.shards
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from biometrics.gallery import FingerprintGallery
+from biometrics.shards import ShardCoordinator, ShardServer, split_gallery, start_local_shards
+
+@pytest.fixture
+def gallery(ridge_dataset):
+    return FingerprintGallery.build(str(ridge_dataset(6, noise=0)), engine="brief", parallel=False)
+
+
+def test_split_gallery_partitions_every_template(gallery):
+    parts = split_gallery(gallery, 4)
+    assert sorted(p for part in parts for p in part.paths) == sorted(gallery.paths)
+
+
+def test_coordinator_merges_shard_results_like_one_gallery(gallery):
+    servers = [ShardServer(part).start() for part in split_gallery(gallery, 3)]
+    coordinator = ShardCoordinator([s.url for s in servers], engine="brief")
+    try:
+        assert all(status["ok"] for status in coordinator.health().values())
+        probe = gallery.engine.extract(gallery.paths[2])
+        assert coordinator.search(probe, top_k=3) == (gallery.search(probe, top_k=3), [])
+    finally:
+        coordinator.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_straggling_and_dead_shards_are_left_out(gallery):
+    parts = split_gallery(gallery, 2)
+    slow = ShardServer(parts[1]).start()
+    real_search = parts[1].search
+    parts[1].search = lambda probe, top_k: time.sleep(1.0) or real_search(probe, top_k)
+    fast = ShardServer(parts[0]).start()
+    dead = "http://127.0.0.1:9"
+    coordinator = ShardCoordinator([fast.url, slow.url, dead], engine="brief", timeout=0.3)
+    try:
+        results, missing = coordinator.search(gallery.engine.extract(parts[0].paths[0]), top_k=2)
+        assert results[0][0] == parts[0].paths[0]
+        assert {path for path, _ in results} <= set(parts[0].paths)
+        assert missing == sorted([slow.url, dead])
+        assert not coordinator.health()[dead]["ok"]
+    finally:
+        coordinator.close()
+        for server in (fast, slow):
+            server.shutdown()
+            server.server_close()
+
+
+def test_concurrent_searches_do_not_queue_past_the_deadline(gallery):
+    parts = split_gallery(gallery, 2)
+    servers = [ShardServer(part).start() for part in parts]
+    for part in parts:
+        part.search = lambda probe, top_k, real=part.search: time.sleep(0.25) or real(probe, top_k)
+    coordinator = ShardCoordinator([s.url for s in servers], engine="brief", timeout=1.0, concurrency=6)
+    probe = gallery.engine.extract(gallery.paths[0])
+    try:
+        # Six searches at once: a pool of one thread per shard would serialise them past the deadline
+        with ThreadPoolExecutor(6) as callers:
+            answers = list(callers.map(lambda _: coordinator.search(probe, top_k=1), range(6)))
+        assert all(missing == [] and results[0][0] == gallery.paths[0] for results, missing in answers)
+    finally:
+        coordinator.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+def test_shards_failing_health_check_are_skipped_until_healthy_again(gallery):
+    parts = split_gallery(gallery, 2)
+    server = ShardServer(parts[0]).start()
+    dead = "http://127.0.0.1:9"
+    coordinator = ShardCoordinator([server.url, dead], engine="brief", timeout=0.3)
+    real_call, called = coordinator._call, []
+    coordinator._call = lambda url, *args: called.append(url) or real_call(url, *args)
+    try:
+        assert coordinator.healthy_urls() == [server.url]
+        called.clear()
+        probe = gallery.engine.extract(parts[0].paths[0])
+        results, missing = coordinator.search(probe, top_k=1)
+        assert results[0][0] == parts[0].paths[0]
+        assert called == [server.url]
+        assert missing == [dead]
+        coordinator.urls.remove(dead)
+        coordinator.health()
+        assert not coordinator.unhealthy
+    finally:
+        coordinator.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_local_shard_processes(gallery, tmp_path):
+    urls, procs = start_local_shards(gallery, 2, str(tmp_path))
+    coordinator = ShardCoordinator(urls, engine="brief", timeout=10)
+    try:
+        assert coordinator.healthy_urls() == urls
+        results, missing = coordinator.search_image(gallery.paths[4], top_k=1, quality_floor=0.0)
+        assert results[0][0] == gallery.paths[4] and missing == []
+    finally:
+        coordinator.close()
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+            proc.stdout.close()
@@ -0,0 +1,89 @@
+"""
+tests/test_singleflight.py
+Unit tests for biometrics.singleflight
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import pytest
+from biometrics import fingerprint
+from biometrics.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight("test")
+    runs = []
+    release = threading.Event()
+
+    def slow(x):
+        runs.append(x)
+        release.wait(5)
+        return x * 2
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flights.do, "k", slow, 21) for _ in range(5)]
+        while flights.in_flight() == 0:
+            time.sleep(0.001)
+        time.sleep(0.05)
+        release.set()
+        assert [f.result() for f in futures] == [42] * 5
+    assert runs == [21]
+    assert flights.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flights = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+
+    def boom():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("engine down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flights.do, "k", boom)
+        started.wait(5)
+        second = pool.submit(flights.do, "k", boom)
+        time.sleep(0.05)
+        release.set()
+        for future in (first, second):
+            with pytest.raises(RuntimeError):
+                future.result()
+    assert flights.do("k", lambda: "ok") == "ok"
+
+
+def test_identical_fingerprint_requests_scan_once(tmp_path, ridge_dataset, monkeypatch):
+    ridge_dataset(3, noise=0)
+    scans = []
+    real_scan = fingerprint._scan_fingerprints
+
+    def slow_scan(*args):
+        scans.append(args[0])
+        time.sleep(0.2)
+        return real_scan(*args)
+
+    monkeypatch.setattr(fingerprint, "_scan_fingerprints", slow_scan)
+    probe = str(tmp_path / "1_a.bmp")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: fingerprint.compare_fingerprints(probe, str(tmp_path), None, parallel=False, quality_floor=0.0, use_cache=False), range(4)))
+    assert len(scans) == 1
+
+
+def test_rejected_probe_is_reported_to_every_coalesced_caller(tmp_path, monkeypatch):
+    probe = tmp_path / "blank.bmp"
+    cv2.imwrite(str(probe), np.full((160, 160), 200, np.uint8))
+    real_scan = fingerprint._scan_fingerprints
+
+    def slow_scan(*args):
+        time.sleep(0.2)
+        return real_scan(*args)
+
+    monkeypatch.setattr(fingerprint, "_scan_fingerprints", slow_scan)
+    logs = [[] for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda log: fingerprint.compare_fingerprints(str(probe), str(tmp_path), log.append, parallel=False,
+                                                                   quality_floor=0.2, use_cache=False), logs))
+    assert all(any("below the floor" in message for message in log) for log in logs)
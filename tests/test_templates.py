@@ -0,0 +1,80 @@
+"""
+tests/test_templates.py
+Unit tests for biometrics.templates
+"""
+import os
+import numpy as np
+from biometrics.templates import TemplateCache
+
+
+class _CountingEngine:
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, path):
+        self.calls += 1
+        with open(path, "rb") as f:
+            return np.frombuffer(f.read(), dtype=np.uint8).astype(np.float32)
+
+
+def _enroll(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_hot_tier_serves_repeat_verifications(tmp_path):
+    engine = _CountingEngine()
+    cache = TemplateCache(engine, max_entries=4, warm_dir=None)
+    path = _enroll(tmp_path, "alice.bmp", b"\x01\x02")
+    assert cache.get(path).tolist() == [1.0, 2.0]
+    cache.get(path)
+    assert engine.calls == 1
+
+
+def test_evicted_templates_come_back_memory_mapped(tmp_path):
+    engine = _CountingEngine()
+    cache = TemplateCache(engine, max_entries=1, warm_dir=str(tmp_path / "warm"))
+    alice = _enroll(tmp_path, "alice.bmp", b"\x01")
+    bob = _enroll(tmp_path, "bob.bmp", b"\x02")
+    cache.get(alice)
+    cache.get(bob)
+    assert len(cache) == 1
+    warm = cache.get(alice)
+    assert isinstance(warm, np.memmap)
+    assert warm.tolist() == [1.0]
+    assert engine.calls == 2
+    # A fresh process finds the warm tier on disk.
+    assert TemplateCache(engine, warm_dir=str(tmp_path / "warm")).get(bob).tolist() == [2.0]
+    assert engine.calls == 2
+
+
+def test_reenrolled_image_is_extracted_again(tmp_path):
+    engine = _CountingEngine()
+    cache = TemplateCache(engine, warm_dir=str(tmp_path / "warm"))
+    path = _enroll(tmp_path, "alice.bmp", b"\x01")
+    cache.get(path)
+    _enroll(tmp_path, "alice.bmp", b"\x03\x04")
+    os.utime(path, ns=(1, 1))
+    assert cache.get(path).tolist() == [3.0, 4.0]
+    assert engine.calls == 2
+
+
+def test_warm_tier_stores_float32_and_stays_within_its_bound(tmp_path):
+    engine = _CountingEngine()
+    one_file = 128 + 4 * 1000  # .npy header plus 1000 float32 values
+    cache = TemplateCache(engine, max_entries=1, warm_dir=str(tmp_path / "warm"), max_warm_bytes=3 * one_file)
+    paths = [_enroll(tmp_path, f"{i}.bmp", bytes([i]) * 1000) for i in range(5)]
+    for path in paths:
+        assert cache.get(path).dtype == np.float32
+    warm_files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path / "warm") for name in names]
+    assert 0 < len(warm_files) <= 3
+    assert sum(os.path.getsize(f) for f in warm_files) <= 3 * one_file
+    # The most recent enrolments survive; the oldest was evicted and has to be extracted again
+    cache.clear()
+    cache.get(paths[-1])
+    assert engine.calls == 5
+    cache.get(paths[0])
+    assert engine.calls == 6
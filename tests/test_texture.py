@@ -0,0 +1,39 @@
+"""
+tests/test_texture.py
+Parity tests for the fast texture engine in biometrics.texture against skimage
+"""
+import cv2
+import numpy as np
+from skimage.feature import local_binary_pattern
+from skimage.filters import gabor
+from biometrics import texture
+
+def _reference_features(img):
+    img = cv2.equalizeHist(cv2.resize(img, texture.COMPACT_IMAGE_SIZE))
+    real, _ = gabor(img / 255.0, frequency=texture.GABOR_FREQUENCY)
+    enhanced = (real * 255).astype(np.uint8)
+    lbp = local_binary_pattern(enhanced, P=8, R=1, method='uniform')
+    hist, _ = np.histogram(lbp.ravel(), bins=np.arange(0, 10), range=(0, 9))
+    hist = hist.astype("float")
+    hist /= (hist.sum() + 1e-6)
+    return np.append(hist, texture.corner_count(enhanced))
+
+
+def _prints(ridge_print, count=6):
+    return [ridge_print(i, count, shape=(100, 100), freq=0.1, noise=25) for i in range(count)]
+
+
+def test_gabor_and_lbp_codes_match_skimage(ridge_print):
+    images = _prints(ridge_print)
+    for img in images:
+        real, _ = gabor(img / 255.0, frequency=texture.GABOR_FREQUENCY)
+        assert np.array_equal(texture.gabor_enhance(img), (real * 255).astype(np.uint8))
+    enhanced = np.stack([texture.gabor_enhance(img) for img in images])
+    expected = np.stack([local_binary_pattern(img, P=8, R=1, method='uniform') for img in enhanced])
+    assert np.array_equal(texture.lbp_codes(enhanced), expected)
+
+
+def test_compact_features_match_reference_pipeline(ridge_print):
+    images = _prints(ridge_print) + [np.random.default_rng(1).integers(0, 256, (120, 90), dtype=np.uint8)]
+    expected = np.stack([_reference_features(img) for img in images])
+    assert np.allclose(np.stack([texture.compact_features(img) for img in images]), expected)
@@ -0,0 +1,51 @@
+"""
+tests/test_tracing.py
+Unit tests for biometrics.tracing
+"""
+import json
+import pytest
+from biometrics import tracing
+from biometrics.parallel import parallel_map
+
+
+def _traced_child(x):
+    with tracing.span("child", item=x):
+        return x
+
+
+def test_nested_spans_share_trace_and_link_parent():
+    tracing.clear()
+    with tracing.span("root") as root:
+        with tracing.span("inner"):
+            pass
+    inner, outer = tracing.finished_spans()
+    assert inner["args"]["parent_id"] == root.span_id
+    assert inner["args"]["trace_id"] == outer["args"]["trace_id"]
+    assert outer["args"]["parent_id"] is None
+    assert outer["ph"] == "X" and outer["dur"] >= inner["dur"]
+
+
+def test_spans_propagate_into_parallel_map_workers():
+    tracing.clear()
+    with tracing.span("scan") as root:
+        parallel_map(_traced_child, [1, 2, 3], max_workers=2)
+    children = [e for e in tracing.finished_spans() if e["name"] == "child"]
+    assert len(children) == 3
+    assert all(e["args"]["parent_id"] == root.span_id for e in children)
+
+
+def test_errors_recorded_and_jsonl_exports_to_chrome_trace(tmp_path):
+    tracing.clear()
+    sink = tmp_path / "trace.jsonl"
+    tracing.set_trace_file(str(sink))
+    try:
+        with pytest.raises(ValueError):
+            with tracing.span("db.write"):
+                raise ValueError("boom")
+    finally:
+        tracing.set_trace_file(None)
+    events = tracing.load_trace_lines(str(sink))
+    assert events[0]["args"]["error"] == "ValueError: boom"
+    out = tmp_path / "trace.json"
+    tracing.export_chrome_trace(str(out), events)
+    assert json.loads(out.read_text())["traceEvents"][0]["name"] == "db.write"
@@ -0,0 +1,55 @@
+"""
+tests/test_tuning.py
+Unit tests for biometrics.tuning
+"""
+import numpy as np
+from sklearn.dummy import DummyClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from biometrics.tuning import grid, pareto_frontier, successive_halving, save_config, load_config
+
+
+def _dataset(classes=27, per_class=4):
+    rng = np.random.default_rng(0)
+    centres = rng.normal(0, 3, (classes, 8))
+    X = np.vstack([c + rng.normal(0, 0.5, (per_class, 8)) for c in centres]).astype(np.float32)
+    return X, np.repeat([f"id{i:02d}" for i in range(classes)], per_class)
+
+
+def test_grid_and_pareto_frontier():
+    candidates = grid("knn", KNeighborsClassifier(), n_neighbors=[1, 3], weights=["uniform", "distance"])
+    assert list(candidates)[0] == "knn n_neighbors=1 weights=uniform"
+    assert candidates["knn n_neighbors=3 weights=distance"].get_params()["weights"] == "distance"
+    summaries = {
+        "accurate": {"accuracy": 0.9, "fit_seconds": 2.0, "latency_ms": 2.0},
+        "fast": {"accuracy": 0.8, "fit_seconds": 0.1, "latency_ms": 0.1},
+        "dominated": {"accuracy": 0.8, "fit_seconds": 3.0, "latency_ms": 3.0},
+    }
+    assert sorted(pareto_frontier(summaries)) == ["accurate", "fast"]
+
+
+def test_successive_halving_keeps_good_models_and_persists_winner(tmp_path):
+    X, y = _dataset()
+    candidates = {"dummy": DummyClassifier(strategy="most_frequent"),
+                  **grid("knn", KNeighborsClassifier(), n_neighbors=[1, 3]),
+                  **grid("svc", SVC(kernel="linear"), C=[0.01, 1])}
+    winner, history, folds = successive_halving(candidates, X, y, eta=3, min_classes=9, n_jobs=1)
+    rounds = sorted({row["round"] for row in history})
+    assert rounds == [0, 1]
+    assert [row["classes"] for row in history if row["round"] == 0][0] == 9
+    assert {row["samples"] for row in history if row["round"] == 1} == {len(y)}
+    assert "dummy" not in {row["candidate"] for row in history if row["round"] == 1}
+    assert winner != "dummy" and any(row["pareto"] for row in history)
+    final = [row for row in history if row["round"] == 1 and row["candidate"] == winner][0]
+    assert folds and {fold["model"] for fold in folds} == {winner}
+    assert np.mean([fold["accuracy"] for fold in folds]) == final["accuracy"]
+    # Too few identities for a reduced first round: everything runs once on the full data
+    _, single, _ = successive_halving(candidates, X, y, eta=3, min_classes=20, n_jobs=1)
+    assert {row["samples"] for row in single} == {len(y)} and len(single) == len(candidates)
+
+    save_config(str(tmp_path / "model.json"), winner, candidates[winner], version="data:v1")
+    name, model = load_config(str(tmp_path / "model.json"), "data:v1")
+    assert name == winner and model.get_params() == candidates[winner].get_params()
+    assert load_config(str(tmp_path / "model.json"))[0] == winner
+    assert load_config(str(tmp_path / "model.json"), "data:v2") is None
+    assert load_config(str(tmp_path / "missing.json")) is None
@@ -41,13 +41,26 @@ from blockchain_client import (
     retrieve_metadata,
     get_total_logs,
 )
+from biometrics.tracing import span, traced
+
+# Chain writes are the slowest external call on the auth path; trace every one
+log_biometric_event = traced('blockchain.log_biometric_event')(log_biometric_event)
 
 # Import biometric modules
 try:
     from biometrics.face import find_most_similar
     from biometrics.fingerprint import compare_fingerprints
+    from biometrics.budget import apply_thread_budget
+    from biometrics.metrics import REGISTRY as METRICS_REGISTRY
+    from biometrics.quality import quality_from_path
+    from biometrics.catalog import get_catalog
+    from biometrics.config import FINGERPRINT_QUALITY_FLOOR
+    apply_thread_budget()
 except (ImportError, AttributeError) as e:
     print(f"Warning: Could not import biometric modules: {e}")
+    METRICS_REGISTRY = None
+    quality_from_path = get_catalog = None
+    FINGERPRINT_QUALITY_FLOOR = 0.0
     # Fallback functions for testing
     def find_most_similar(*args, **kwargs):
         return {'Confidence (%)': 85.0}, None
@@ -66,11 +79,14 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'your-super-secret-key-change-in-production
 JWT_SECRET = os.getenv('JWT_SECRET', 'jwt-secret-key-change-in-production')
 
 # Security Configuration
+# 'threshold' is the match score a login needs. 'fp_quality' is the fingerprint quality below
+# which a login is flagged, on the biometrics.quality scale (0 blank .. ~0.8 clean ridges,
+# probes under BIOMETRICS_FINGERPRINT_QUALITY_FLOOR are rejected outright)
 SECURITY_LEVELS = {
-    'LOW': {'threshold': 0.6, 'max_attempts': 10, 'lockout_time': 300},
-    'MEDIUM': {'threshold': 0.75, 'max_attempts': 5, 'lockout_time': 600},
-    'HIGH': {'threshold': 0.85, 'max_attempts': 3, 'lockout_time': 1800},
-    'MAXIMUM': {'threshold': 0.95, 'max_attempts': 2, 'lockout_time': 3600}
+    'LOW': {'threshold': 0.6, 'fp_quality': 0.25, 'max_attempts': 10, 'lockout_time': 300},
+    'MEDIUM': {'threshold': 0.75, 'fp_quality': 0.35, 'max_attempts': 5, 'lockout_time': 600},
+    'HIGH': {'threshold': 0.85, 'fp_quality': 0.45, 'max_attempts': 3, 'lockout_time': 1800},
+    'MAXIMUM': {'threshold': 0.95, 'fp_quality': 0.55, 'max_attempts': 2, 'lockout_time': 3600}
 }
 
 # Rate limiting configuration
@@ -294,6 +310,10 @@ def check_rate_limit(username: str, attempt_type: str) -> bool:
 def calculate_biometric_quality(file_path: str, biometric_type: str) -> float:
     """Calculate quality score for biometric data"""
     try:
+        if biometric_type == 'fingerprint' and quality_from_path is not None:
+            # Ridge coherence / contrast / foreground estimate
+            return quality_from_path(file_path)['score']
+        
         # Simulate quality calculation based on file size and type
         file_size = os.path.getsize(file_path)
         
@@ -503,6 +523,10 @@ def register():
             fp_encryption_key = hashlib.sha256(f"{username}:fingerprint".encode()).hexdigest()[:32]
             encrypt_file(fp_path, fp_encryption_key)
 
+        # Matching reuses catalog scans for a few seconds; make the new enrollment visible now
+        if get_catalog is not None:
+            get_catalog().scan(UPLOAD_FOLDER)
+
         # Calculate quality, but DO NOT check or reject based on it
         avg_face_quality = sum(face_qualities) / len(face_qualities)
         min_quality = SECURITY_LEVELS[security_level]['threshold']
@@ -590,6 +614,7 @@ def register():
 
 @app.route('/api/auth/face', methods=['POST'])
 @limiter.limit(RATE_LIMITS['auth'])
+@traced('auth.face')
 def auth_face():
     """Enhanced face authentication with advanced security"""
     start_time = time.time()
@@ -637,7 +662,8 @@ def auth_face():
         # Save temporary face image
         temp_filename = secure_filename(f"temp_{username}_face_{int(time.time())}.{face_file.filename.rsplit('.', 1)[1]}")
         temp_path = os.path.join(UPLOAD_FOLDER, temp_filename)
-        face_file.save(temp_path)
+        with span('upload.save', kind='face'):
+            face_file.save(temp_path)
         
         try:
             # Get user data
@@ -657,7 +683,8 @@ def auth_face():
                 return jsonify({'error': 'Authentication failed'}), 401
             
             # Calculate quality of submitted image
-            submitted_quality = calculate_biometric_quality(temp_path, 'face')
+            with span('quality.check', kind='face'):
+                submitted_quality = calculate_biometric_quality(temp_path, 'face')
             min_quality = SECURITY_LEVELS[user['security_level']]['threshold']
             
             # Skip rejecting on quality in development; log and continue
@@ -678,11 +705,12 @@ def auth_face():
                     try:
                         # Decrypt stored image for comparison (only if encryption is enabled)
                         # In production, decrypt temporarily in memory
-                        match, _ = find_most_similar(
-                            temp_path,
-                            dataset_folder=os.path.dirname(stored_face_path),
-                            parallel=True
-                        )
+                        with span('gallery.score', kind='face'):
+                            match, _ = find_most_similar(
+                                temp_path,
+                                dataset_folder=os.path.dirname(stored_face_path),
+                                parallel=True
+                            )
                         if match and match.get('Confidence (%)', 0) > best_confidence:
                             best_confidence = match['Confidence (%)']
                             best_match = match
@@ -696,14 +724,15 @@ def auth_face():
             user_record = cursor.fetchone()
             user_id = user_record[0] if user_record else None
             
-            cursor.execute('''INSERT INTO auth_attempts 
-                           (username, ip_address, attempt_type, success, confidence_score, 
-                            response_time, failure_reason) 
-                           VALUES (%s, %s, %s, %s, %s, %s, %s)''',
-                        (username, request.remote_addr, 'face', 
-                         best_confidence >= (min_quality * 100), best_confidence, 
-                         response_time, None if best_confidence >= (min_quality * 100) else 'Low confidence'))
-            conn.commit()
+            with span('db.write', table='auth_attempts'):
+                cursor.execute('''INSERT INTO auth_attempts 
+                               (username, ip_address, attempt_type, success, confidence_score, 
+                                response_time, failure_reason) 
+                               VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                            (username, request.remote_addr, 'face', 
+                             best_confidence >= (min_quality * 100), best_confidence, 
+                             response_time, None if best_confidence >= (min_quality * 100) else 'Low confidence'))
+                conn.commit()
             cursor.close()
             conn.close()
             
@@ -794,6 +823,7 @@ def auth_face():
 
 @app.route('/api/auth/fingerprint', methods=['POST'])
 @limiter.limit(RATE_LIMITS['auth'])
+@traced('auth.fingerprint')
 def auth_fingerprint():
     """Enhanced fingerprint authentication"""
     start_time = time.time()
@@ -856,7 +886,8 @@ def auth_fingerprint():
         # Save temporary fingerprint
         temp_filename = secure_filename(f"temp_{username}_fp_{int(time.time())}.{fingerprint_file.filename.rsplit('.', 1)[1]}")
         temp_path = os.path.join(UPLOAD_FOLDER, temp_filename)
-        fingerprint_file.save(temp_path)
+        with span('upload.save', kind='fingerprint'):
+            fingerprint_file.save(temp_path)
         
         try:
             # Get user data
@@ -876,15 +907,31 @@ def auth_fingerprint():
                 return jsonify({'error': 'Authentication failed'}), 401
             
             # Calculate quality of submitted fingerprint
-            submitted_quality = calculate_biometric_quality(temp_path, 'fingerprint')
+            with span('quality.check', kind='fingerprint'):
+                submitted_quality = calculate_biometric_quality(temp_path, 'fingerprint')
             min_quality = SECURITY_LEVELS[user['security_level']]['threshold']
+            min_fp_quality = SECURITY_LEVELS[user['security_level']]['fp_quality']
+            
+            # Reject hopeless probes (blank, smudged) before any matching work
+            if submitted_quality < FINGERPRINT_QUALITY_FLOOR:
+                log_security_event('AUTH_REJECTED', username, {
+                    'reason': 'Fingerprint quality below floor',
+                    'quality': submitted_quality,
+                    'floor': FINGERPRINT_QUALITY_FLOOR
+                }, 'warning')
+                return jsonify({
+                    'success': False,
+                    'error': 'Fingerprint image quality too low, please rescan',
+                    'quality': submitted_quality,
+                    'required': FINGERPRINT_QUALITY_FLOOR
+                }), 422
             
             # Skip rejecting on quality in development; log and continue
-            if submitted_quality < min_quality:
+            if submitted_quality < min_fp_quality:
                 log_security_event('AUTH_WARNING', username, {
                     'reason': 'Low fingerprint quality',
                     'quality': submitted_quality,
-                    'required': min_quality
+                    'required': min_fp_quality
                 }, 'warning')
             
             # Compare fingerprints
@@ -903,10 +950,12 @@ def auth_fingerprint():
                             match_result['match'] = True
             
             try:
-                compare_fingerprints(temp_path, 
-                                   dataset_path=os.path.dirname(user['fp_path']), 
-                                   log_callback=log_callback, 
-                                   parallel=True)
+                with span('gallery.score', kind='fingerprint'):
+                    compare_fingerprints(temp_path, 
+                                       dataset_path=os.path.dirname(user['fp_path']), 
+                                       log_callback=log_callback, 
+                                       parallel=True,
+                                       probe_quality=submitted_quality)
             except Exception as e:
                 logger.error(f"Fingerprint comparison error: {e}")
                 match_result['score'] = 0.5  # Fallback score
@@ -917,28 +966,30 @@ def auth_fingerprint():
             user_record = cursor.fetchone()
             user_id = user_record[0] if user_record else None
             
-            cursor.execute('''INSERT INTO auth_attempts 
-                           (username, ip_address, attempt_type, success, confidence_score, 
-                            response_time, failure_reason) 
-                           VALUES (%s, %s, %s, %s, %s, %s, %s)''',
-                        (username, request.remote_addr, 'fingerprint', 
-                         match_result['match'], match_result['score'], 
-                         response_time, None if match_result['match'] else 'Low confidence'))
+            with span('db.write', table='auth_attempts'):
+                cursor.execute('''INSERT INTO auth_attempts 
+                               (username, ip_address, attempt_type, success, confidence_score, 
+                                response_time, failure_reason) 
+                               VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+                            (username, request.remote_addr, 'fingerprint', 
+                             match_result['match'], match_result['score'], 
+                             response_time, None if match_result['match'] else 'Low confidence'))
             
             if match_result['match']:
-                cursor.execute('''UPDATE users 
-                               SET last_login = CURRENT_TIMESTAMP, login_count = login_count + 1 
-                               WHERE username = %s''', (username,))
-                
                 session_id = generate_session_token(username)
                 session_expires = datetime.now() + timedelta(hours=24)
                 
-                cursor.execute('''INSERT INTO user_sessions 
-                               (username, session_id, device_fingerprint, ip_address, expires_at) 
-                               VALUES (%s, %s, %s, %s, %s)''',
-                            (username, session_id, device_fingerprint, request.remote_addr, session_expires))
-                
-                conn.commit()
+                with span('db.write', table='user_sessions'):
+                    cursor.execute('''UPDATE users 
+                                   SET last_login = CURRENT_TIMESTAMP, login_count = login_count + 1 
+                                   WHERE username = %s''', (username,))
+                    
+                    cursor.execute('''INSERT INTO user_sessions 
+                                   (username, session_id, device_fingerprint, ip_address, expires_at) 
+                                   VALUES (%s, %s, %s, %s, %s)''',
+                                (username, session_id, device_fingerprint, request.remote_addr, session_expires))
+                    
+                    conn.commit()
                 
                 metadata = {
                     'score': match_result['score'],
@@ -1445,6 +1496,15 @@ def health_check():
 def health_check_alias():
     return health_check()
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose biometric pipeline metrics (Prometheus text, or JSON with ?format=json)"""
+    if METRICS_REGISTRY is None:
+        return jsonify({'error': 'Metrics unavailable'}), 503
+    if request.args.get('format') == 'json':
+        return jsonify(METRICS_REGISTRY.to_dict())
+    return app.response_class(METRICS_REGISTRY.to_prometheus(), mimetype='text/plain; version=0.0.4')
+
 # Error handlers
 @app.errorhandler(429)
 def ratelimit_handler(e):